@@ -11,6 +11,7 @@ from src.models import Base, Rating
 from src.photos.models import Photo
 from src.settings import settings
 from src.tags.models import Tag
+from src.uploads.models import UploadSession
 from src.user.models import User
 
 URI = settings.get_db_uri()
@@ -42,7 +42,7 @@ async def signup(body: UserSchema, db: AsyncSession = Depends(get_db)):
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT, detail="ACCOUNT EXIST"
         )
-    body.password = auth_service.get_password_hash(body.password)
+    body.password = await auth_service.get_password_hash(body.password)
     new_user = await users.create_user(body, db)
 
     return {"data": new_user}
@@ -76,10 +76,16 @@ async def login(
         )
     if user.blocked == True:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User is bloked")
-    if not auth_service.verify_password(body.password, user.password):
+    verified, new_hash = await auth_service.verify_and_update(
+        body.password, user.password
+    )
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid password"
         )
+    if new_hash:
+        # Saved together with the refresh token below
+        user.password = new_hash
     # Generate JWT
     access_token = await auth_service.create_access_token(data={"sub": user.email})
     refresh_token = await auth_service.create_refresh_token(data={"sub": user.email})
@@ -215,7 +221,7 @@ async def reset_password(
             raise HTTPException(status_code=400, detail="Invalid reset token")
         if body.new_password != body.confirm_password:
             raise HTTPException(status_code=400, detail="Passwords don't match")
-        hashed_password = auth_service.get_password_hash(body.new_password)
+        hashed_password = await auth_service.get_password_hash(body.new_password)
         await users.update_password(email, hashed_password, db)
         return {"message": "Password updated successfully"}
     except Exception as e:
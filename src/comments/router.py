@@ -1,4 +1,6 @@
-from fastapi import APIRouter, Depends, Response, status
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 import src.comments.service as comment_services
@@ -8,9 +10,10 @@ from src.comments.schemas import (
     CommentsResponseSchema,
 )
 
-from src.database import get_db
+from src.database import get_db, get_read_db
 from src.dependencies import allowed_delete_comments, get_current_user
 from src.logger import get_logger
+from src.pagination import decode_cursor
 from src.user.models import User
 
 logger = get_logger("Comments")
@@ -71,23 +74,42 @@ async def create_comment_handler(
     "/{photo_id}", status_code=status.HTTP_200_OK, response_model=CommentsResponseSchema
 )
 async def get_comments_handler(
-    photo_id: int, response: Response, db: AsyncSession = Depends(get_db)
+    photo_id: int,
+    response: Response,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
-    Get comments for a photo.
+    Get a page of comments for a photo, oldest first.
 
     :param photo_id: The ID of the photo.
     :type photo_id: int
     :param response: The response object.
     :type response: Response
+    :param limit: The page size.
+    :type limit: int
+    :param cursor: The cursor returned with the previous page.
+    :type cursor: str | None
     :param db: The database session.
     :type db: AsyncSession
     :return: The comments for the photo.
-    :rtype: CommentResponseSchema
+    :rtype: CommentsResponseSchema
     """
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            )
+
     try:
-        comments = await comment_services.get_comments(photo_id=photo_id, db=db)
-        return {"data": comments}
+        total = await comment_services.get_comments_count(photo_id=photo_id, db=db)
+        comments, next_cursor = await comment_services.get_comments(
+            photo_id=photo_id, db=db, limit=limit, cursor=cursor
+        )
+        return {"data": comments, "total": total, "next_cursor": next_cursor}
     except Exception as e:
         logger.error(e)
         response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
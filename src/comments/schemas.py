@@ -38,3 +38,4 @@ class CommentsResponseSchema(ResponseModel):
 
     data: List[CommentResponseSchema.Data] = []
     total: int = 0
+    next_cursor: str | None = None
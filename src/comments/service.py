@@ -1,9 +1,22 @@
-from sqlalchemy import and_, select
+from sqlalchemy import and_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.comments.models import Comment
 from src.comments.schemas import CommentSchema
+from src.pagination import next_cursor, paginate
+from src.photos.models import Photo
+from src.photos.services.photo_service import touch_photos
 from src.user.models import User
+from src.user.service import update_user_stats
+
+
+async def update_comments_count(photo_id: int, count: int, db: AsyncSession):
+    # Single UPDATE with a relative value, so concurrent comments don't overwrite each other
+    await db.execute(
+        update(Photo)
+        .where(Photo.id == photo_id)
+        .values(comments_count=Photo.comments_count + count)
+    )
 
 
 async def create_comment(
@@ -29,25 +42,53 @@ async def create_comment(
         comment=comment.comment, photo_id=comment.photo_id, user_id=current_user.id
     )
     db.add(db_comment)
+    await update_user_stats(current_user.id, db, comments=1)
+    await update_comments_count(comment.photo_id, 1, db)
     await db.commit()
     await db.refresh(db_comment)
 
     return db_comment
 
 
-async def get_comments(photo_id: int, db: AsyncSession) -> list[Comment]:
+async def get_comments(
+    photo_id: int, db: AsyncSession, limit: int = 50, cursor: str | None = None
+) -> tuple[list[Comment], str | None]:
     """
-    Retrieve all comments for a specific photo.
+    Retrieve a page of comments for a specific photo, oldest first.
 
     :param photo_id: ID of the photo whose comments are to be retrieved.
     :type photo_id: int
     :param db: Database session dependency.
     :type db: AsyncSession
-    :return: A CommentModel instance containing a list of comments for the specified photo.
-    :rtype: Comment
+    :param limit: Page size.
+    :type limit: int
+    :param cursor: Cursor returned with the previous page.
+    :type cursor: str | None
+    :return: Comments of the page and the cursor of the next page (None on the last page).
+    :rtype: tuple[list[Comment], str | None]
+    """
+    stmt = paginate(
+        select(Comment).filter(Comment.photo_id == photo_id), Comment, limit, cursor
+    )
+    result = await db.execute(stmt)
+    return next_cursor(list(result.scalars().all()), limit)
+
+
+async def get_comments_count(photo_id: int, db: AsyncSession) -> int:
+    """
+    Number of comments on a photo, read from the ``photos.comments_count`` counter.
+
+    :param photo_id: ID of the photo.
+    :type photo_id: int
+    :param db: Database session dependency.
+    :type db: AsyncSession
+    :return: Number of comments, 0 if the photo doesn't exist.
+    :rtype: int
     """
-    result = await db.execute(select(Comment).filter(Comment.photo_id == photo_id))
-    return list(result.scalars().all())
+    result = await db.execute(
+        select(Photo.comments_count).filter(Photo.id == photo_id)
+    )
+    return result.scalar() or 0
 
 
 async def update_comment(
@@ -78,6 +119,7 @@ async def update_comment(
     )
     db_comment = result.scalar_one_or_none()
     db_comment.comment = comment
+    await touch_photos([db_comment.photo_id], db)
     await db.commit()
     await db.refresh(db_comment)
 
@@ -100,6 +142,8 @@ async def delete_comment(comment_id: int, db: AsyncSession) -> Comment | None:
     result = await db.execute(select(Comment).filter(Comment.id == comment_id))
     db_comment = result.scalar_one_or_none()
 
+    await update_user_stats(db_comment.user_id, db, comments=-1)
+    await update_comments_count(db_comment.photo_id, -1, db)
     await db.delete(db_comment)
     await db.commit()
     return db_comment
@@ -0,0 +1,174 @@
+import asyncio
+import gzip
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+import brotli
+import zstandard
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.metrics import registry
+from src.settings import settings
+from src.static import accepted_encodings
+
+# Content-Encoding -> compress(data), in order of preference
+ENCODERS: dict[str, Callable[[bytes], bytes]] = {
+    # a ZstdCompressor must not be shared between threads
+    "zstd": lambda data: zstandard.ZstdCompressor(
+        level=settings.compression_zstd_level
+    ).compress(data),
+    "br": lambda data: brotli.compress(
+        data, quality=settings.compression_brotli_quality
+    ),
+    "gzip": lambda data: gzip.compress(
+        data, settings.compression_gzip_level, mtime=0
+    ),
+}
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+executor = ThreadPoolExecutor(
+    settings.compression_workers, thread_name_prefix="compression"
+)
+
+compressed_responses = registry.counter(
+    "compression_responses_total", "Compressed responses by encoding.", ("encoding",)
+)
+compression_skipped = registry.counter(
+    "compression_skipped_total",
+    "Compressible responses sent uncompressed, by reason.",
+    ("reason",),
+)
+bytes_saved = registry.counter(
+    "compression_bytes_saved_total",
+    "Response bytes saved by compression.",
+    ("encoding",),
+)
+
+
+def negotiate(headers: Headers) -> str | None:
+    accepted = accepted_encodings(headers)
+    for encoding in ENCODERS:
+        if encoding in accepted:
+            return encoding
+    return None
+
+
+def is_compressible(headers: MutableHeaders) -> bool:
+    content_type = headers.get("content-type", "")
+    return (
+        "content-encoding" not in headers
+        and "no-transform" not in headers.get("cache-control", "")
+        and (
+            content_type.startswith(COMPRESSIBLE_TYPES)
+            or content_type.split(";")[0].endswith("+json")
+        )
+    )
+
+
+class CompressionMiddleware:
+    """
+    Compresses complete response bodies of ``settings.compression_min_size``
+    bytes or more with the best encoding the client accepts: zstd, br, then gzip.
+
+    Bodies above ``settings.compression_inline_max_size`` bytes are compressed
+    in a thread pool to keep the event loop responsive. At most
+    ``settings.compression_max_concurrency`` bodies are compressed at a time,
+    responses above that CPU budget are sent uncompressed instead of waiting.
+
+    Streamed responses and responses already encoded (precompressed assets)
+    are passed through.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        # only touched from the event loop thread
+        self.active = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Message | None = None
+        passthrough = False
+
+        async def send_compressed(message: Message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+            elif message["type"] == "http.response.start":
+                start_message = message
+            elif message["type"] == "http.response.body" and not message.get(
+                "more_body", False
+            ):
+                await self.send_response(start_message, message, encoding, send)
+            else:
+                # streamed body or pathsend
+                passthrough = True
+                await send(start_message)
+                await send(message)
+
+        await self.app(scope, receive, send_compressed)
+
+    async def send_response(
+        self, start_message: Message, message: Message, encoding: str, send: Send
+    ):
+        body = message.get("body", b"")
+        headers = MutableHeaders(scope=start_message)
+        if len(body) < settings.compression_min_size or not is_compressible(headers):
+            await send(start_message)
+            await send(message)
+            return
+
+        headers.add_vary_header("Accept-Encoding")
+        if self.active >= settings.compression_max_concurrency:
+            compression_skipped.inc(reason="budget")
+            await send(start_message)
+            await send(message)
+            return
+
+        self.active += 1
+        try:
+            if len(body) > settings.compression_inline_max_size:
+                compressed = await asyncio.get_running_loop().run_in_executor(
+                    executor, ENCODERS[encoding], body
+                )
+            else:
+                compressed = ENCODERS[encoding](body)
+        finally:
+            self.active -= 1
+
+        if len(compressed) >= len(body):
+            compression_skipped.inc(reason="ratio")
+            await send(start_message)
+            await send(message)
+            return
+
+        headers["Content-Encoding"] = encoding
+        headers["Content-Length"] = str(len(compressed))
+        # the compressed body is a different representation
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+        compressed_responses.inc(encoding=encoding)
+        bytes_saved.inc(len(body) - len(compressed), encoding=encoding)
+
+        await send(start_message)
+        await send({"type": "http.response.body", "body": compressed})
+
+
+def shutdown():
+    executor.shutdown(wait=False, cancel_futures=True)
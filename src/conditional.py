@@ -0,0 +1,79 @@
+import hashlib
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response, status
+
+
+def make_etag(*parts) -> str:
+    """
+    Build a weak ETag from the values a representation depends on.
+
+    :param parts: values identifying the version of the representation
+    :return: weak entity tag, e.g. ``W/"3f2a..."``
+    :rtype: str
+    """
+    raw = "\x1f".join(str(part) for part in parts)
+    return f'W/"{hashlib.sha1(raw.encode()).hexdigest()}"'
+
+
+def to_utc(value: datetime) -> datetime:
+    # Timestamps are stored naive, in UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    return value.astimezone(UTC).replace(microsecond=0)
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(to_utc(value), usegmt=True)
+
+
+def is_not_modified(
+    request: Request, etag: str, last_modified: datetime | None = None
+) -> bool:
+    """
+    Whether the client's copy is current, per RFC 9110: ``If-None-Match`` (weak
+    comparison) takes precedence, ``If-Modified-Since`` is only checked without it.
+
+    :param request: incoming request
+    :type request: Request
+    :param etag: current ETag of the representation
+    :type etag: str
+    :param last_modified: current modification time of the representation
+    :type last_modified: datetime | None
+    :return: True if a 304 can be sent instead of the representation
+    :rtype: bool
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        current = etag.removeprefix("W/")
+        return any(
+            tag.strip().removeprefix("W/") == current for tag in if_none_match.split(",")
+        )
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return to_utc(last_modified) <= to_utc(since)
+
+    return False
+
+
+def validator_headers(etag: str, last_modified: datetime | None = None) -> dict:
+    # no-cache: clients may store the response but must revalidate it first
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def not_modified(etag: str, last_modified: datetime | None = None) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers=validator_headers(etag, last_modified),
+    )
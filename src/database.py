@@ -1,14 +1,104 @@
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+import time
 
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from src.metrics import registry
 from src.settings import settings
 
-engine = create_async_engine(settings.get_db_uri())
+pool_wait = registry.histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting for a pooled database connection.",
+    ("pool",),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+)
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool recording how long each checkout waited for a connection.
+    """
+
+    label = "primary"
+
+    def connect(self):
+        started_at = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            pool_wait.observe(time.perf_counter() - started_at, pool=self.label)
+
+
+def create_engine(url: str, label: str) -> AsyncEngine:
+    """
+    Create an engine with the pool configured in settings.
+
+    :param url: database URL
+    :type url: str
+    :param label: pool name reported by /metrics
+    :type label: str
+    :return: engine
+    :rtype: AsyncEngine
+    """
+    # A subclass per engine, so the label survives pool re-creation on dispose()
+    poolclass = type(f"{label.title()}QueuePool", (TimedQueuePool,), {"label": label})
+    return create_async_engine(
+        url,
+        poolclass=poolclass,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        pool_use_lifo=settings.db_pool_use_lifo,
+    )
+
+
+engine = create_engine(settings.get_db_uri(), "primary")
+# Read-only traffic goes to the replica when one is configured
+read_engine = (
+    create_engine(settings.db_replica_url, "replica")
+    if settings.db_replica_url
+    else engine
+)
+
+
+@registry.collect("db_pool_connections", "Database pool connections by state.")
+def pool_connections():
+    engines = [("primary", engine)]
+    if read_engine is not engine:
+        engines.append(("replica", read_engine))
+
+    for label, pool_engine in engines:
+        pool = pool_engine.pool
+        for state, value in (
+            ("checked_out", pool.checkedout()),
+            ("checked_in", pool.checkedin()),
+            ("overflow", max(pool.overflow(), 0)),
+            ("size", pool.size()),
+        ):
+            yield "db_pool_connections", {"pool": label, "state": state}, value
+
+
 async_session_factory = async_sessionmaker(
     autocommit=False, autoflush=False, bind=engine, expire_on_commit=False
 )
+read_session_factory = async_sessionmaker(
+    autocommit=False, autoflush=False, bind=read_engine, expire_on_commit=False
+)
 
 
 # Dependency
 async def get_db():
     async with async_session_factory() as session:
         yield session
+
+
+async def get_read_db():
+    """
+    Session for read-only endpoints: the replica if ``DB_REPLICA_URL`` is set,
+    otherwise the primary. Replicas lag behind, so endpoints that read what the
+    same request or client just wrote should keep using :func:`get_db`.
+    """
+    async with read_session_factory() as session:
+        yield session
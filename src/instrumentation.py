@@ -0,0 +1,139 @@
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.logger import get_logger
+from src.settings import settings
+
+logger = get_logger("SQL")
+
+STATEMENT_LOG_LENGTH = 500
+
+
+class QueryStats:
+    """
+    SQL statements executed while handling one request.
+
+    Attributes:
+        count (int): Number of statements.
+        duration (float): Total execution time in seconds.
+        statements (dict): Number of executions and total time per statement text.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements: dict[str, list] = defaultdict(lambda: [0, 0.0])
+
+    def record(self, statement: str, duration: float):
+        self.count += 1
+        self.duration += duration
+        stats = self.statements[statement]
+        stats[0] += 1
+        stats[1] += duration
+
+    def report(self) -> str:
+        lines = []
+        by_duration = sorted(self.statements.items(), key=lambda item: -item[1][1])
+        for statement, (count, duration) in by_duration:
+            text = " ".join(statement.split())[:STATEMENT_LOG_LENGTH]
+            lines.append(f"  x{count} {duration * 1000:.1f} ms: {text}")
+        return "\n".join(lines)
+
+
+_query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def get_query_stats() -> QueryStats | None:
+    """
+    Statements collected for the current request, None outside of a request.
+    """
+    return _query_stats.get()
+
+
+# Registered on the Engine class, so every engine (including the async engines'
+# sync engines) reports to the collector of the request it runs in
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _record(conn, statement)
+
+
+# after_cursor_execute is skipped when the statement fails
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    # No execution context: the statement failed before before_cursor_execute
+    if context.connection is not None and context.execution_context is not None:
+        _record(context.connection, context.statement)
+
+
+def _record(conn, statement: str):
+    started = conn.info.get("query_started_at")
+    if not started:
+        return
+    started_at = started.pop()
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.record(statement, time.perf_counter() - started_at)
+
+
+class QueryTimingMiddleware:
+    """
+    Collects the SQL statements of each HTTP request, reports them in a
+    ``Server-Timing: db;dur=<ms>;desc="<n> queries"`` header and logs requests
+    above ``settings.slow_request_queries`` statements or ``settings.slow_request_ms``
+    milliseconds, with the statements they ran.
+
+    Statements executed after the response headers were sent (streaming bodies,
+    background tasks) are logged but not in the header.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _query_stats.set(stats)
+        started_at = time.perf_counter()
+
+        async def send_with_timing(message: Message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries"',
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _query_stats.reset(token)
+            self.log_slow_request(scope, stats, time.perf_counter() - started_at)
+
+    @staticmethod
+    def log_slow_request(scope: Scope, stats: QueryStats, duration: float):
+        if (
+            stats.count <= settings.slow_request_queries
+            and duration * 1000 <= settings.slow_request_ms
+        ):
+            return
+
+        logger.warning(
+            f"Slow request {scope['method']} {scope['path']}: "
+            f"{duration * 1000:.1f} ms, {stats.count} queries "
+            f"in {stats.duration * 1000:.1f} ms\n{stats.report()}"
+        )
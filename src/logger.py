@@ -1,5 +1,11 @@
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+import time
+from datetime import UTC, datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from src.settings import settings
 
 # ANSI escape codes for colors
 RED = '\033[91m'
@@ -21,8 +27,82 @@ class ColorFormatter(logging.Formatter):
         elif record.levelno == logging.ERROR or record.levelno == logging.CRITICAL:
             color = RED
 
-        record.msg = f'{color}{record.msg}{RESET}'
-        return super().format(record)
+        # Color the formatted line, the record is shared with the other handlers
+        return f'{color}{super().format(record)}{RESET}'
+
+
+class JsonFormatter(logging.Formatter):
+    """ One JSON object per line, for log collectors """
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, UTC).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "function": record.funcName,
+            "line": record.lineno,
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class ErrorSamplingFilter(logging.Filter):
+    """
+    Lets through at most ``burst`` identical error messages per ``window`` seconds.
+
+    The first message let through after a suppressed period reports how many
+    copies were dropped.
+    """
+
+    def __init__(self, burst: int, window: float):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        # (logger, message) -> [window start, messages in window, suppressed]
+        self._seen: dict[tuple[str, str], list] = {}
+
+    def filter(self, record):
+        if record.levelno < logging.ERROR or self.burst <= 0:
+            return True
+
+        now = time.monotonic()
+        key = (record.name, str(record.msg))
+        seen = self._seen.get(key)
+        if seen is None or now - seen[0] >= self.window:
+            suppressed = seen[2] if seen else 0
+            if len(self._seen) > 1000:
+                self._seen.clear()
+            self._seen[key] = [now, 1, 0]
+            if suppressed:
+                record.msg = f"{record.msg} (suppressed {suppressed} similar messages)"
+            return True
+
+        if seen[1] < self.burst:
+            seen[1] += 1
+            return True
+
+        seen[2] += 1
+        return False
+
+
+class BackgroundQueueHandler(QueueHandler):
+    """
+    Hands records to the background listener thread once it runs (see
+    :func:`start_logging`); before that, records are written synchronously.
+    """
+
+    listening = False
+
+    def emit(self, record):
+        if self.listening:
+            super().emit(record)
+            return
+
+        for handler in listener.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
 
 
 _format = "%(asctime)s [%(levelname)s] - %(name)s - %(funcName)s(%(lineno)d) - %(message)s"
@@ -38,16 +118,45 @@ file_handler = RotatingFileHandler(
                 delay=False,
             )
 file_handler.setLevel(logging.INFO)
-file_handler.setFormatter(logging.Formatter(_format))
 
 stream_handler = logging.StreamHandler()
 stream_handler.setLevel(logging.DEBUG)
-stream_handler.setFormatter(ColorFormatter(_format))
+
+if settings.log_json:
+    file_handler.setFormatter(JsonFormatter())
+    stream_handler.setFormatter(JsonFormatter())
+else:
+    file_handler.setFormatter(logging.Formatter(_format))
+    stream_handler.setFormatter(ColorFormatter(_format))
+
+log_queue = queue.SimpleQueue()
+listener = QueueListener(
+    log_queue, file_handler, stream_handler, respect_handler_level=True
+)
+
+queue_handler = BackgroundQueueHandler(log_queue)
+queue_handler.addFilter(
+    ErrorSamplingFilter(settings.log_error_burst, settings.log_error_window)
+)
 
 
 def get_logger(name):
     logger = logging.getLogger(name)
     logger.setLevel(logging.DEBUG)
-    logger.addHandler(file_handler)
-    logger.addHandler(stream_handler)
+    if queue_handler not in logger.handlers:
+        logger.addHandler(queue_handler)
     return logger
+
+
+def start_logging():
+    """ Move file and console output to the background listener thread """
+    if not queue_handler.listening:
+        listener.start()
+        queue_handler.listening = True
+
+
+def stop_logging():
+    """ Flush queued records and stop the listener thread """
+    if queue_handler.listening:
+        queue_handler.listening = False
+        listener.stop()
@@ -1,34 +1,92 @@
+import asyncio
 from contextlib import asynccontextmanager
 from pathlib import Path
 
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src import compression
 from src.auth.router import router as auth_router
 from src.comments.router import router as comments_router
-from src.database import get_db
+from src.database import async_session_factory, get_db, read_session_factory
+from src.instrumentation import QueryTimingMiddleware
+from src.logger import get_logger, start_logging, stop_logging
+from src.metrics import MetricsMiddleware, registry
 from src.photos.router import router as photos_router
+from src.photos.services import similarity_service
 from src.tags.router import router as tags_router
 from src.user.router import router as user_router
 from src.rating.router import router as rating_router
+from src.uploads.router import router as uploads_router
+from src.uploads.service import purge_periodically
+from src.services.authentication import auth_service
+from src.services.storage import storage
+from src.settings import settings
+from src.static import CachedPage, PrecompressedStaticFiles, precompress
+
+
+logger = get_logger("App")
+
+BASE_DIR = Path(__file__).parent
+DIST_DIR = BASE_DIR / "dist"
+
+index_page = CachedPage(DIST_DIR / "index.html")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    print("Starting application...")
+    start_logging()
+    logger.info("Starting application...")
+    # No-op for variants built with `python -m src.static`
+    try:
+        written = await asyncio.to_thread(precompress, DIST_DIR)
+        if written:
+            logger.info(f"Precompressed {written} static files")
+    except OSError as e:
+        # Read-only deploys serve whatever variants exist, or the plain files
+        logger.error(f"Static files not precompressed: {e}")
+    try:
+        async with read_session_factory() as db:
+            await similarity_service.similarity_index.rebuild(db)
+        logger.info(
+            f"Indexed {len(similarity_service.similarity_index.hashes)} photo hashes"
+        )
+    except Exception as e:
+        # Searches catch up through SimilarityIndex.refresh
+        logger.error(e)
+    purge_task = asyncio.create_task(
+        purge_periodically(async_session_factory, settings.upload_purge_interval)
+    )
     yield
-    print("Closing application...")
+    purge_task.cancel()
+    storage.shutdown()
+    auth_service.shutdown()
+    compression.shutdown()
+    logger.info("Closing application...")
+    stop_logging()
 
 
 app = FastAPI(lifespan=lifespan)
 
-BASE_DIR = Path(__file__).parent
-app.mount("/static", StaticFiles(directory=BASE_DIR / "dist" ), name="static")
-app.mount("/assets", StaticFiles(directory=BASE_DIR / "dist" / "assets"), name="assets")
+app.mount("/static", PrecompressedStaticFiles(directory=DIST_DIR), name="static")
+# Asset file names carry a content hash, a changed file gets a new URL
+app.mount(
+    "/assets",
+    PrecompressedStaticFiles(directory=DIST_DIR / "assets", immutable=True),
+    name="assets",
+)
+if settings.storage_backend == "local":
+    # FileResponse hands the path to servers supporting the ASGI pathsend
+    # extension, which send the file with sendfile instead of reading it in Python
+    app.mount(
+        settings.storage_local_url,
+        StaticFiles(directory=storage.backend.root),
+        name="media",
+    )
 
 origins = [
     # "http://localhost",
@@ -36,6 +94,9 @@ origins = [
     "*",
 ]
 
+app.add_middleware(compression.CompressionMiddleware)
+app.add_middleware(QueryTimingMiddleware)
+app.add_middleware(MetricsMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -50,12 +111,19 @@ app.include_router(photos_router, prefix="/api")
 app.include_router(tags_router, prefix="/api")
 app.include_router(comments_router, prefix="/api")
 app.include_router(rating_router, prefix="/api")
+app.include_router(uploads_router, prefix="/api")
 
 
 @app.get("/")
-async def root():
-    content = Path(BASE_DIR / "dist" / "index.html").read_text()
-    return HTMLResponse(content=content, status_code=200)
+async def root(request: Request):
+    return index_page.response(request)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4"
+    )
 
 
 @app.get("/api/healthchecker")
@@ -0,0 +1,220 @@
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Iterable
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# (name, labels, value)
+Sample = tuple[str, dict[str, str], float]
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric(ABC):
+    """
+    A metric family rendered in the Prometheus text format.
+
+    Attributes:
+        name (str): Metric name.
+        help (str): Description.
+        type (str): ``counter``, ``gauge``, ``histogram`` or ``summary``.
+    """
+
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+    @abstractmethod
+    def samples(self) -> Iterable[Sample]:
+        ...
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, value: float = 1, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        self._values[key] = self._values.get(key, 0) + value
+
+    def samples(self) -> Iterable[Sample]:
+        for key, value in self._values.items():
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Iterable[str] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+        # per label set: [bucket counts..., +Inf count], sum
+        self._values: dict[tuple, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        values = self._values.get(key)
+        if values is None:
+            values = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = values
+        counts[bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def samples(self) -> Iterable[Sample]:
+        for key, (counts, total) in self._values.items():
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_sum", labels, total[0]
+            yield f"{self.name}_count", labels, cumulative
+
+
+class Collected(Metric):
+    """
+    Metric whose samples are read at scrape time, e.g. from a pool or a cache.
+    """
+
+    def __init__(
+        self, name: str, help: str, type: str, collect: Callable[[], Iterable[Sample]]
+    ):
+        super().__init__(name, help)
+        self.type = type
+        self.collect = collect
+
+    def samples(self) -> Iterable[Sample]:
+        return self.collect()
+
+
+class Registry:
+    """
+    In-process metrics registry.
+
+    Metrics are updated from the event loop thread without locking, so recording
+    a value is a dict lookup and an addition.
+
+    Methods:
+        counter(name, help, labelnames=()), histogram(name, help, labelnames=(), buckets=...):
+            Create and register a metric.
+
+        collect(name, help, type):
+            Decorator registering a function that returns the samples at scrape time.
+
+        render():
+            All metrics in the Prometheus text exposition format.
+    """
+
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Iterable[str] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def collect(self, name: str, help: str, type: str = "gauge"):
+        def decorator(func: Callable[[], Iterable[Sample]]):
+            self.register(Collected(name, help, type, func))
+            return func
+
+        return decorator
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route"),
+)
+http_requests = registry.counter(
+    "http_requests_total",
+    "HTTP responses by route template and status code.",
+    ("method", "route", "status"),
+)
+
+
+class MetricsMiddleware:
+    """
+    Records the latency and status of each HTTP request, labelled with the route
+    template (``/api/photos/{photo_id}``) to keep the number of series bounded.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            route = getattr(route, "path", None) or "<other>"
+            method = scope["method"]
+            http_request_duration.observe(
+                time.perf_counter() - started_at, method=method, route=route
+            )
+            http_requests.inc(method=method, route=route, status=str(status))
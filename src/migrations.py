@@ -0,0 +1,30 @@
+import sqlalchemy as sa
+from alembic import op
+
+BATCH_SIZE = 1000
+
+
+def backfill_in_batches(table: str, statement: str, batch_size: int = BATCH_SIZE):
+    """
+    Run a backfill ``UPDATE`` of a migration over id ranges of ``table``,
+    committing after each range.
+
+    The migration's pending schema changes are committed first, then every
+    range runs in its own transaction (alembic's autocommit block), so row
+    locks are only held for one range instead of until the migration ends.
+    A failed backfill leaves the schema change applied: fix the data and
+    rerun the statement, or downgrade by hand.
+
+    :param table: table whose ``id`` range is walked
+    :param statement: SQL ``UPDATE`` taking ``:start`` and ``:stop`` (exclusive)
+    :param batch_size: ids per range
+    """
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        max_id = connection.execute(
+            sa.text(f"SELECT coalesce(max(id), 0) FROM {table}")
+        ).scalar()
+        for start in range(0, max_id + 1, batch_size):
+            connection.execute(
+                sa.text(statement), {"start": start, "stop": start + batch_size}
+            )
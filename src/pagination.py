@@ -0,0 +1,144 @@
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import Select, tuple_
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """
+    Build an opaque keyset cursor from the sort key of the last row of a page.
+
+    :param created_at: creation time of the last row
+    :type created_at: datetime
+    :param id: id of the last row
+    :type id: int
+    :return: url-safe cursor string
+    :rtype: str
+    """
+    raw = json.dumps([created_at.isoformat(), id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Decode a cursor produced by :func:`encode_cursor`.
+
+    :param cursor: cursor string
+    :type cursor: str
+    :return: (created_at, id) sort key
+    :rtype: tuple[datetime, int]
+    :raises ValueError: if the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(id)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def encode_rank_cursor(rank: float, id: int) -> str:
+    """
+    Build a keyset cursor for relevance-ordered (search) pages.
+
+    :param rank: relevance of the last row
+    :type rank: float
+    :param id: id of the last row
+    :type id: int
+    :return: url-safe cursor string
+    :rtype: str
+    """
+    raw = json.dumps(["rank", rank, id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_rank_cursor(cursor: str) -> tuple[float, int]:
+    """
+    Decode a cursor produced by :func:`encode_rank_cursor`.
+
+    :param cursor: cursor string
+    :type cursor: str
+    :return: (rank, id) sort key
+    :rtype: tuple[float, int]
+    :raises ValueError: if the cursor is malformed or not a search cursor
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        kind, rank, id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if kind != "rank":
+            raise ValueError(kind)
+        return float(rank), int(id)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def paginate(
+    statement: Select,
+    model,
+    limit: int,
+    cursor: str | None = None,
+    descending: bool = False,
+) -> Select:
+    """
+    Apply (created_at, id) keyset ordering and the cursor condition to a statement.
+
+    One extra row is requested so the caller can tell whether a next page exists,
+    see :func:`next_cursor`.
+
+    :param statement: select statement over ``model``
+    :param model: mapped class with ``created_at`` and ``id`` columns
+    :param limit: page size
+    :param cursor: cursor returned with the previous page
+    :param descending: newest rows first
+    :return: paginated statement
+    :rtype: Select
+    """
+    key = tuple_(model.created_at, model.id)
+
+    if cursor:
+        created_at, id = decode_cursor(cursor)
+        after = tuple_(created_at, id)
+        statement = statement.where(key < after if descending else key > after)
+
+    if descending:
+        statement = statement.order_by(model.created_at.desc(), model.id.desc())
+    else:
+        statement = statement.order_by(model.created_at, model.id)
+
+    return statement.limit(limit + 1)
+
+
+def next_cursor(rows: list, limit: int) -> tuple[list, str | None]:
+    """
+    Trim the extra row requested by :func:`paginate` and build the next cursor.
+
+    :param rows: rows fetched with ``limit + 1``
+    :param limit: page size
+    :return: page rows and the cursor of the next page (None on the last page)
+    """
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    if not rows:
+        # limit=0, no row to continue from
+        return rows, None
+    last = rows[-1]
+    return rows, encode_cursor(last.created_at, last.id)
+
+
+def next_rank_cursor(rows: list, limit: int) -> tuple[list, str | None]:
+    """
+    :func:`next_cursor` for relevance-ordered pages fetched as (row, rank).
+
+    :param rows: (row, rank) pairs fetched with ``limit + 1``
+    :param limit: page size
+    :return: page rows and the cursor of the next page (None on the last page)
+    """
+    page = [row for row, _ in rows[:limit]]
+    if len(rows) <= limit or not page:
+        return page, None
+
+    last, rank = rows[limit - 1]
+    return page, encode_rank_cursor(rank, last.id)
@@ -1,6 +1,7 @@
 from typing import List
 
-from sqlalchemy import ForeignKey, String, select, func
+from sqlalchemy import BigInteger, ForeignKey, Index, Integer, String, Text, case, select, func
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.ext.hybrid import hybrid_property
 
@@ -10,6 +11,13 @@ from src.rating.models import Rating
 
 class Photo(Base):
     __tablename__ = "photos"
+    __table_args__ = (
+        Index("ix_photos_created_at_id", "created_at", "id"),
+        Index("ix_photos_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_photos_content_hash", "content_hash"),
+        # Similarity index refreshes read the photos changed since the last one
+        Index("ix_photos_updated_at_id", "updated_at", "id"),
+    )
     title: Mapped[str] = mapped_column(String(255))
     description: Mapped[str] = mapped_column(String(255))
     owner_id: Mapped[int] = mapped_column(
@@ -18,6 +26,21 @@ class Photo(Base):
     public_id: Mapped[str] = mapped_column(String(255))
     secure_url: Mapped[str] = mapped_column(String(255))
     folder: Mapped[str] = mapped_column(String(255))
+    # SHA-256 of the original, photos with the same content share the stored file
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    # 64-bit perceptual hash (dHash) as a signed BIGINT, see similarity_service
+    phash: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    # Rating aggregates, maintained by src.rating.service
+    rating_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    rating_sum: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    # Maintained by src.comments.service
+    comments_count: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0"
+    )
+    # Full-text search document, see src.photos.services.search_service
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR().with_variant(Text(), "sqlite"), nullable=True, deferred=True
+    )
     # Alchemy
     owner: Mapped["User"] = relationship("User", backref="photos", lazy="selectin")
     tags: Mapped[list["Tag"]] = relationship(
@@ -42,14 +65,22 @@ class Photo(Base):
         primaryjoin='Photo.id==Rating.photo_id',
         foreign_keys='Rating.photo_id',
         backref='photo',
-        lazy="selectin",
+        lazy="raise",
+        passive_deletes=True,
     )
 
     @hybrid_property
     def average_rating(self):
-        if not self.ratings:
+        if not self.rating_count:
             return 0
-        return sum([rating.rating for rating in self.ratings]) / len(self.ratings)
+        return self.rating_sum / self.rating_count
+
+    @average_rating.expression
+    def average_rating(cls):
+        return case(
+            (cls.rating_count == 0, 0),
+            else_=cls.rating_sum * 1.0 / cls.rating_count,
+        )
 
     def __repr__(self):
         return f"Photo(title={self.title})"
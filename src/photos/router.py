@@ -1,4 +1,4 @@
-from typing import Annotated, Any
+from typing import Annotated, Any, Literal
 
 from fastapi import (
     APIRouter,
@@ -6,28 +6,43 @@ from fastapi import (
     File,
     Form,
     HTTPException,
+    Query,
+    Request,
     Response,
     UploadFile,
     status,
     Body,
 )
+from pydantic import TypeAdapter, ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database import get_db
+from src.conditional import is_not_modified, make_etag, not_modified, validator_headers
+from src.database import get_db, get_read_db
 from src.dependencies import get_current_user
+from src.pagination import decode_cursor, decode_rank_cursor
 from src.photos.dependencies import allowed_delete_photo
 from src.photos.schemas import (
+    BulkPhotoMetadataSchema,
+    PhotosBulkResponseSchema,
     PhotoResponseSchema,
     PhotosResponseSchema,
+    PhotosSummaryResponseSchema,
+    PhotoSummarySchema,
+    SimilarPhotosResponseSchema,
     TransformationResponseSchema,
     TransformationsURLResponseSchema,
     TransformationsURLSchema,
 )
 from src.photos.services.photo_service import (
     create_photo,
+    create_photo_from_stream,
+    create_photos,
     delete_photo,
     get_photo,
+    get_photo_version,
     get_photos,
+    get_photos_versions,
+    get_similar_photos,
     update_photo,
     get_photos_count,
 )
@@ -36,6 +51,8 @@ from src.photos.services.transformation_service import (
     save_transform,
     get_qr_code,
 )
+from src.services.storage.streaming import EmptyUpload, UploadTimeout, UploadTooLarge
+from src.settings import settings
 from src.user.models import User
 
 from src.logger import get_logger
@@ -48,20 +65,61 @@ router = APIRouter(
 )
 
 
-@router.get("/", response_model=PhotosResponseSchema, status_code=status.HTTP_200_OK)
+@router.get(
+    "/",
+    response_model=PhotosResponseSchema | PhotosSummaryResponseSchema,
+    status_code=status.HTTP_200_OK,
+)
 async def get_photos_handler(
+    request: Request,
     response: Response,
-    skip: int = 0,
-    limit: int = 50,
+    skip: Annotated[int, Query(deprecated=True)] = 0,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
     q: str = "",
-    db: AsyncSession = Depends(get_db),
+    cursor: str | None = None,
+    approximate_total: bool = False,
+    view: Literal["summary", "full"] = "full",
+    db: AsyncSession = Depends(get_read_db),
 ):
 
+    if cursor:
+        try:
+            # Search pages are ordered by relevance and take their own cursors
+            decode_rank_cursor(cursor) if q else decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            )
+
     try:
-        total = await get_photos_count(query=q, db=db)
-        photos = await get_photos(skip=skip, limit=limit, query=q, db=db)
+        total, approximate = await get_photos_count(
+            query=q, db=db, approximate=approximate_total
+        )
 
-        return {"total": total, "data": photos}
+        # Revalidate from the page's ids and versions before loading relationships
+        versions = await get_photos_versions(
+            skip=skip, limit=limit, query=q, db=db, cursor=cursor, view=view
+        )
+        etag = make_etag(view, total, approximate, versions)
+        last_modified = max((version for _, version in versions), default=None)
+        if is_not_modified(request, etag, last_modified):
+            return not_modified(etag, last_modified)
+        response.headers.update(validator_headers(etag, last_modified))
+
+        photos, next_cursor = await get_photos(
+            skip=skip, limit=limit, query=q, db=db, cursor=cursor, view=view
+        )
+
+        schema = PhotosSummaryResponseSchema if view == "summary" else PhotosResponseSchema
+        return schema.model_validate(
+            {
+                "total": total,
+                "approximate_total": approximate,
+                "data": photos,
+                "next_cursor": next_cursor,
+            },
+            from_attributes=True,
+        )
 
     except Exception as e:
         logger.error(e)
@@ -76,10 +134,22 @@ async def get_photos_handler(
     "/{photo_id}", response_model=PhotoResponseSchema, status_code=status.HTTP_200_OK
 )
 async def get_photo_by_id(
-    response: Response, photo_id: int, db: AsyncSession = Depends(get_db)
+    request: Request,
+    response: Response,
+    photo_id: int,
+    db: AsyncSession = Depends(get_read_db),
 ):
 
     try:
+        # A change between the two reads makes the ETag older than the body,
+        # which only costs the client a refetch
+        version = await get_photo_version(photo_id=photo_id, db=db)
+        if version is not None:
+            etag = make_etag(photo_id, version)
+            if is_not_modified(request, etag, version):
+                return not_modified(etag, version)
+            response.headers.update(validator_headers(etag, version))
+
         photo = await get_photo(photo_id=photo_id, db=db)
         if not photo:
             response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -98,6 +168,50 @@ async def get_photo_by_id(
         }
 
 
+@router.get(
+    "/{photo_id}/similar",
+    response_model=SimilarPhotosResponseSchema,
+    status_code=status.HTTP_200_OK,
+)
+async def get_similar_photos_handler(
+    response: Response,
+    photo_id: int,
+    max_distance: Annotated[int | None, Query(ge=0, le=32)] = None,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Near-duplicates of a photo: photos whose perceptual hash differs in at most
+    ``max_distance`` of its 64 bits, closest first.
+    """
+    if max_distance is None:
+        max_distance = settings.similar_max_distance
+
+    try:
+        similar = await get_similar_photos(
+            photo_id=photo_id, max_distance=max_distance, limit=limit, db=db
+        )
+    except Exception as e:
+        logger.error(e)
+        response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+        return {
+            "status": "error",
+            "message": "An error occurred while getting the similar photos!",
+        }
+
+    if similar is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Photo not found"
+        )
+
+    return {
+        "data": [
+            {**PhotoSummarySchema.model_validate(photo).model_dump(), "distance": distance}
+            for photo, distance in similar
+        ]
+    }
+
+
 @router.post(
     "/",
     status_code=status.HTTP_201_CREATED,
@@ -145,6 +259,147 @@ async def create_photo_handler(
         }
 
 
+@router.post(
+    "/stream",
+    status_code=status.HTTP_201_CREATED,
+    response_model=PhotoResponseSchema,
+)
+async def create_photo_stream_handler(
+    request: Request,
+    response: Response,
+    title: str,
+    description: str,
+    tags: str = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Create a photo from the raw request body (not multipart), which is piped
+    to storage as it arrives instead of being spooled to a temporary file.
+    """
+    content_length = request.headers.get("content-length")
+    if content_length is not None and int(content_length) > settings.upload_max_size:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="File too large",
+        )
+    if content_length == "0":
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Empty file")
+
+    if tags:
+        tags_list = [tag.strip() for tag in tags.split(",")]
+    else:
+        tags_list = []
+
+    try:
+        photo = await create_photo_from_stream(
+            title=title,
+            chunks=request.stream(),
+            description=description,
+            tags=tags_list,
+            db=db,
+            current_user=current_user,
+        )
+
+        return {"data": photo}
+
+    except UploadTooLarge:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="File too large",
+        )
+    except EmptyUpload:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Empty file")
+    except UploadTimeout:
+        raise HTTPException(
+            status_code=status.HTTP_408_REQUEST_TIMEOUT, detail="Upload timed out"
+        )
+    except Exception as e:
+        logger.error(e)
+        response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+        return {
+            "status": "error",
+            "message": "An error occurred while creating the photo!",
+        }
+
+
+bulk_metadata_adapter = TypeAdapter(list[BulkPhotoMetadataSchema])
+
+
+@router.post(
+    "/bulk",
+    status_code=status.HTTP_200_OK,
+    response_model=PhotosBulkResponseSchema,
+)
+async def create_photos_bulk_handler(
+    response: Response,
+    files: Annotated[list[UploadFile], File()],
+    metadata: Annotated[str, Form()],
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Create many photos in one request.
+
+    ``metadata`` is a JSON array with a ``{"title", "description", "tags"}``
+    object per file, in the order of ``files``. The response has a result per
+    file, failed uploads don't fail the others.
+    """
+    if len(files) > settings.bulk_upload_max_files:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.bulk_upload_max_files} files per request",
+        )
+    try:
+        items_metadata = bulk_metadata_adapter.validate_json(metadata)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=e.errors()
+        )
+    if len(items_metadata) != len(files):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="metadata must have one entry per file",
+        )
+
+    items = [
+        {
+            "title": item.title,
+            "description": item.description,
+            "tags": [tag.strip() for tag in item.tags],
+            "file": file.file,
+        }
+        for item, file in zip(items_metadata, files)
+    ]
+
+    try:
+        photos = await create_photos(items=items, db=db, current_user=current_user)
+
+        results = []
+        for index, photo in enumerate(photos):
+            if isinstance(photo, BaseException):
+                logger.error(photo)
+                results.append(
+                    {
+                        "index": index,
+                        "status": "error",
+                        "message": "An error occurred while uploading the photo!",
+                    }
+                )
+            else:
+                results.append({"index": index, "data": photo})
+
+        return {"data": results}
+
+    except Exception as e:
+        logger.error(e)
+        response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+        return {
+            "status": "error",
+            "message": "An error occurred while creating the photos!",
+        }
+
+
 @router.put(
     "/{photo_id}", status_code=status.HTTP_200_OK, response_model=PhotoResponseSchema
 )
@@ -1,7 +1,7 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Literal, Optional
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 from src.comments.schemas import CommentResponseInstanceSchema
 from src.schemas import ResponseModel
@@ -73,6 +73,24 @@ class PhotoSchema(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class PhotoSummarySchema(BaseModel):
+    id: int
+    title: str
+    created_at: datetime | None = None
+    description: str
+    owner_id: int
+    public_id: str
+    secure_url: str
+    tags: List[TagResponseInstanceSchema] | None = []
+    average_rating: float | None = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SimilarPhotoSchema(PhotoSummarySchema):
+    distance: int
+
+
 class UpdatePhotoSchema(BaseModel):
     title: str | None = None
     description: str | None = None
@@ -86,3 +104,30 @@ class PhotoResponseSchema(ResponseModel):
 class PhotosResponseSchema(ResponseModel):
     data: List[PhotoSchema] | None = []
     total: int | None = 0
+    approximate_total: bool = False
+    next_cursor: str | None = None
+
+
+class PhotosSummaryResponseSchema(PhotosResponseSchema):
+    data: List[PhotoSummarySchema] | None = []
+
+
+class SimilarPhotosResponseSchema(ResponseModel):
+    data: List[SimilarPhotoSchema] | None = []
+
+
+class BulkPhotoMetadataSchema(BaseModel):
+    title: str = Field(max_length=255)
+    description: str = Field(max_length=255)
+    tags: List[str] = []
+
+
+class BulkPhotoResultSchema(BaseModel):
+    index: int
+    status: Literal["ok", "error"] = "ok"
+    message: str = ""
+    data: PhotoSchema | None = None
+
+
+class PhotosBulkResponseSchema(ResponseModel):
+    data: List[BulkPhotoResultSchema] = []
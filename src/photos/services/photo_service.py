@@ -1,13 +1,188 @@
-from typing import BinaryIO
-
-from sqlalchemy import select, func, or_, RowMapping, Select
+import asyncio
+import functools
+import hashlib
+import json
+import secrets
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, BinaryIO, Callable, Iterable
+
+from sqlalchemy import (
+    distinct,
+    select,
+    func,
+    tuple_,
+    update,
+    RowMapping,
+    ScalarSelect,
+    Select,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import aliased, load_only, raiseload, selectinload
+from sqlalchemy.sql.expression import ClauseElement, Executable
 
+from src.comments.models import Comment
+from src.logger import get_logger
+from src.pagination import decode_rank_cursor, next_cursor, next_rank_cursor, paginate
 from src.photos.models import Photo, Transformation
-from src.services.cloudinary_utils import delete_file, upload_file
-from src.tags.models import Tag, PhotoToTag
+from src.photos.services.search_service import get_search_backend, get_search_terms
+from src.photos.services.similarity_service import (
+    hash_photo_file,
+    hash_stored_photo,
+    similarity_index,
+)
+from src.services.storage import storage
+from src.settings import settings
+from src.tags.service import resolve_tags
 from src.user.models import User
+from src.user.service import remove_photo_comments_stats, update_user_stats
+
+logger = get_logger("Photos")
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(file: BinaryIO) -> str:
+    """
+    SHA-256 of a seekable file, read in chunks. The file is rewound afterwards.
+
+    :param file: file object
+    :return: hex digest
+    """
+    file.seek(0)
+    digest = hashlib.sha256()
+    while chunk := file.read(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def unique_public_id(content_hash: str) -> str:
+    return f"{content_hash}-{secrets.token_hex(4)}"
+
+
+async def lock_assets(keys: Iterable[str], db: AsyncSession):
+    """
+    Serialize uploads and deletions of the same stored files until the end of
+    the transaction, with Postgres advisory locks keyed by content hash.
+    Other databases (SQLite in tests) are not locked.
+
+    :param keys: content hashes (public ids for photos stored without one)
+    :param db: database session
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return
+
+    # Always in the same order, so two batches can't wait for each other
+    for key in sorted(set(keys)):
+        await db.execute(select(func.pg_advisory_xact_lock(func.hashtext(key))))
+
+
+async def find_assets(content_hashes: list[str], db: AsyncSession) -> dict[str, dict]:
+    """
+    Stored assets of photos with the given content hashes.
+
+    :param content_hashes: SHA-256 hex digests
+    :param db: database session
+    :return: asset by content hash, for the hashes already stored
+    """
+    if not content_hashes:
+        return {}
+
+    res = await db.execute(
+        select(
+            Photo.content_hash,
+            Photo.public_id,
+            Photo.secure_url,
+            Photo.folder,
+            Photo.phash,
+        ).where(Photo.content_hash.in_(set(content_hashes)))
+    )
+    assets = {}
+    for row in res.mappings():
+        assets.setdefault(row["content_hash"], dict(row))
+    return assets
+
+
+async def store_assets(
+    uploads: dict[str, Callable[[], Awaitable[dict]]], db: AsyncSession
+) -> dict[str, dict | BaseException]:
+    """
+    Assets of contents by content hash, uploading the contents not stored yet.
+
+    Uploads run before the contents are locked, so no transaction waits on
+    storage. Once locked, a content another request stored in the meantime
+    reuses its asset and the uploaded copy is deleted. The lock is held until
+    the photos are committed, see delete_unused_file.
+
+    :param uploads: upload of each content, returning its asset
+    :param db: database session
+    :return: asset, or the exception its upload raised, by content hash
+    """
+
+    async def upload_all(content_hashes: list[str]) -> dict:
+        assets = await asyncio.gather(
+            *(uploads[content_hash]() for content_hash in content_hashes),
+            return_exceptions=True,
+        )
+        return dict(zip(content_hashes, assets))
+
+    stored = await find_assets(list(uploads), db)
+    assets = await upload_all([key for key in uploads if key not in stored])
+
+    await lock_assets(uploads, db)
+    stored = await find_assets(list(uploads), db)
+    for content_hash, asset in stored.items():
+        uploaded = assets.get(content_hash)
+        if isinstance(uploaded, dict) and uploaded["public_id"] != asset["public_id"]:
+            await delete_redundant_file(uploaded["public_id"])
+    # Stored before the lock and deleted since, uploaded again while locked
+    assets.update(
+        await upload_all([key for key in uploads if key not in stored | assets])
+    )
+    return {**assets, **stored}
+
+
+async def delete_redundant_file(public_id: str):
+    """
+    Delete a copy uploaded while another request stored the same content.
+    Failures are logged, the copy is only wasted space.
+
+    :param public_id: public id of the copy
+    """
+    try:
+        if not await storage.delete_file(public_id=public_id):
+            logger.error(f"Stored file {public_id} was not deleted")
+    except Exception as e:
+        logger.error(f"Stored file {public_id} was not deleted: {e}")
+
+
+async def store_photo_file(file: BinaryIO, db: AsyncSession) -> dict:
+    """
+    Store a photo file unless a photo with the same content is already stored,
+    in which case its asset is reused.
+
+    New files are stored under their SHA-256 and a random suffix
+    (``photos/<sha256>-<suffix>``, as the local backend names them), so an
+    upload can't overwrite a different image, or a file of the same content
+    that a concurrent deletion is removing.
+
+    :param file: seekable file object
+    :param db: database session
+    :return: asset, with its ``content_hash`` and perceptual hash (``phash``)
+    """
+    content_hash = await storage.run("hash_file", hash_file, file)
+
+    async def upload() -> dict:
+        asset = await storage.upload_file(
+            file, folder="photos", public_id=unique_public_id(content_hash)
+        )
+        return {**asset, "phash": await hash_photo_file(file)}
+
+    asset = (await store_assets({content_hash: upload}, db))[content_hash]
+    if isinstance(asset, BaseException):
+        raise asset
+    return {**asset, "content_hash": content_hash}
 
 
 async def create_photo(
@@ -18,9 +193,86 @@ async def create_photo(
     tags: list[str],
     db: AsyncSession,
     current_user: User,
+    commit: bool = True,
 ) -> Photo | None:
-    asset = upload_file(file, folder="photos")
+    asset = await store_photo_file(file, db)
+    return await add_photo(
+        title=title,
+        asset=asset,
+        description=description,
+        tags=tags,
+        db=db,
+        current_user=current_user,
+        commit=commit,
+    )
 
+
+async def create_photo_from_stream(
+    *,
+    title: str,
+    chunks: AsyncIterator[bytes],
+    description: str,
+    tags: list[str],
+    db: AsyncSession,
+    current_user: User,
+) -> Photo | None:
+    """
+    Create a photo from a raw request body, sent to storage as it arrives.
+
+    The content hash is only known once the body is stored: if the same
+    content was stored before, the new copy is deleted and the old one reused.
+
+    :param chunks: body chunks, e.g. ``request.stream()``
+    :raises UploadTooLarge: if the body exceeds ``settings.upload_max_size``
+    :raises EmptyUpload: if the body is empty
+    :raises UploadTimeout: if the client stops sending
+    """
+    asset = await storage.upload_stream(
+        chunks, folder="photos", max_size=settings.upload_max_size
+    )
+    content_hash = asset["sha256"]
+    if not await find_assets([content_hash], db):
+        asset = {**asset, "phash": await hash_stored_photo(asset["public_id"])}
+
+    # Held until the photo is committed, see delete_unused_file
+    await lock_assets([content_hash], db)
+    stored = (await find_assets([content_hash], db)).get(content_hash)
+    if stored is not None:
+        if stored["public_id"] != asset["public_id"]:
+            await delete_redundant_file(asset["public_id"])
+        asset = stored
+    elif "phash" not in asset:
+        # The stored copy was deleted since the first check
+        asset = {**asset, "phash": await hash_stored_photo(asset["public_id"])}
+    asset = {**asset, "content_hash": content_hash}
+    return await add_photo(
+        title=title,
+        asset=asset,
+        description=description,
+        tags=tags,
+        db=db,
+        current_user=current_user,
+    )
+
+
+async def add_photo(
+    *,
+    title: str,
+    asset: dict,
+    description: str,
+    tags: list[str],
+    db: AsyncSession,
+    current_user: User,
+    commit: bool = True,
+) -> Photo:
+    """
+    Save a photo for an asset already in storage.
+
+    :param asset: asset returned by the storage backend
+    :param commit: False to leave the commit to the caller, for a photo created
+        in a larger transaction. It reaches the similarity index of this
+        process on the next refresh.
+    """
     photo = Photo(
         title=title,
         description=description,
@@ -28,30 +280,131 @@ async def create_photo(
         public_id=asset.get("public_id"),
         secure_url=asset.get("secure_url"),
         folder=asset.get("folder"),
+        content_hash=asset.get("content_hash"),
+        phash=asset.get("phash"),
     )
 
-    tags_arr = []
-
     if tags:
-        for tag in tags:
-            query = select(Tag).where(Tag.name == tag)
-            res = await db.execute(query)
-            tag_obj = res.scalars().one_or_none()
-            if tag_obj:
-                tags_arr.append(tag_obj)
-            else:
-                new_tag = Tag(name=tag)
-                tags_arr.append(new_tag)
-
-        photo.tags = tags_arr
+        photo.tags = await resolve_tags(tags, db)
 
     db.add(photo)
+    await db.flush()
+    await get_search_backend(db).index(db, [photo.id])
+    await update_user_stats(current_user.id, db, photos=1)
+    if not commit:
+        await db.refresh(photo)
+        return photo
+
     await db.commit()
     await db.refresh(photo)
+    similarity_index.update(photo.id, photo.phash)
 
     return photo
 
 
+async def create_photos(
+    *,
+    items: list[dict],
+    db: AsyncSession,
+    current_user: User,
+) -> list[Photo | Exception]:
+    """
+    Create many photos at once.
+
+    Files are hashed and uploaded concurrently, at most
+    ``settings.bulk_upload_concurrency`` at a time; content already stored,
+    or repeated in the batch, is uploaded at most once. The tags of the whole
+    batch are resolved together and every photo is inserted in one
+    transaction. A failed upload only fails its own item.
+
+    :param items: dicts with ``title``, ``description``, ``tags`` and ``file``
+    :param db: database session
+    :param current_user: owner of the photos
+    :return: per item, the photo or the exception its upload raised
+    """
+    semaphore = asyncio.Semaphore(settings.bulk_upload_concurrency)
+
+    async def hash_contents(file: BinaryIO) -> str:
+        async with semaphore:
+            return await storage.run("hash_file", hash_file, file)
+
+    async def upload(file: BinaryIO, content_hash: str) -> dict:
+        async with semaphore:
+            asset = await storage.upload_file(
+                file, folder="photos", public_id=unique_public_id(content_hash)
+            )
+            return {**asset, "phash": await hash_photo_file(file)}
+
+    hashes = await asyncio.gather(
+        *(hash_contents(item["file"]) for item in items), return_exceptions=True
+    )
+    # One upload per content
+    uploads = {}
+    for item, content_hash in zip(items, hashes):
+        if isinstance(content_hash, str):
+            uploads.setdefault(
+                content_hash, functools.partial(upload, item["file"], content_hash)
+            )
+    stored = await store_assets(uploads, db)
+
+    assets = []
+    for content_hash in hashes:
+        asset = stored[content_hash] if isinstance(content_hash, str) else content_hash
+        if not isinstance(asset, BaseException):
+            asset = {**asset, "content_hash": content_hash}
+        assets.append(asset)
+
+    names = [
+        name
+        for item, asset in zip(items, assets)
+        if not isinstance(asset, BaseException)
+        for name in item["tags"]
+    ]
+    tags = {tag.name: tag for tag in await resolve_tags(names, db)}
+
+    results = []
+    photos = []
+    for item, asset in zip(items, assets):
+        if isinstance(asset, BaseException):
+            results.append(asset)
+            continue
+
+        photo = Photo(
+            title=item["title"],
+            description=item["description"],
+            owner_id=current_user.id,
+            public_id=asset.get("public_id"),
+            secure_url=asset.get("secure_url"),
+            folder=asset.get("folder"),
+            content_hash=asset.get("content_hash"),
+            phash=asset.get("phash"),
+            tags=[tags[name] for name in dict.fromkeys(item["tags"]) if name],
+        )
+        results.append(photo)
+        photos.append(photo)
+
+    if not photos:
+        return results
+
+    db.add_all(photos)
+    await db.flush()
+    ids = [photo.id for photo in photos]
+    await get_search_backend(db).index(db, ids)
+    await update_user_stats(current_user.id, db, photos=len(photos))
+    await db.commit()
+
+    # One select (and one per relationship) instead of a refresh per photo
+    res = await db.execute(
+        select(Photo)
+        .where(Photo.id.in_(ids))
+        .execution_options(populate_existing=True)
+    )
+    res.scalars().all()
+    for photo in photos:
+        similarity_index.update(photo.id, photo.phash)
+    return results
+
+
 async def update_photo(
     *,
     photo_id: int,
@@ -67,35 +420,30 @@ async def update_photo(
     if not photo:
         return None
 
-    tags_arr = []
-
-    if tags:
-        for tag in tags:
-            query = select(Tag).where(Tag.name == tag)
-            res = await db.execute(query)
-            tag_obj = res.scalars().one_or_none()
-            if tag_obj:
-                tags_arr.append(tag_obj)
-            else:
-                new_tag = Tag(name=tag)
-                tags_arr.append(new_tag)
-        await db.commit()
-
+    tags_arr = await resolve_tags(tags, db) if tags else []
     if len(tags_arr) > 0:
         photo.tags = tags_arr
 
+    # Tag changes don't touch the photos row, bump the version explicitly
+    photo.updated_at = func.now()
     if title:
         photo.title = title
     if description:
         photo.description = description
     if file:
-        asset = upload_file(file, folder="photos")
+        asset = await store_photo_file(file, db)
         photo.public_id = asset.get("public_id")
         photo.secure_url = asset.get("secure_url")
         photo.folder = "photos"
+        photo.content_hash = asset.get("content_hash")
+        photo.phash = asset.get("phash")
 
+    await db.flush()
+    await get_search_backend(db).index(db, [photo.id])
     await db.commit()
     await db.refresh(photo)
+    if file:
+        similarity_index.update(photo.id, photo.phash)
     return photo
 
 
@@ -106,41 +454,200 @@ async def delete_photo(*, photo_id: int, db: AsyncSession) -> RowMapping | None:
     if not photo:
         return None
 
-    deleted = delete_file(public_id=photo.public_id)
-    if not deleted:
-        return None
-
+    await get_search_backend(db).remove(db, [photo.id])
+    await update_user_stats(photo.owner_id, db, photos=-1)
+    await remove_photo_comments_stats(photo.id, db)
     await db.delete(photo)
     await db.commit()
+    similarity_index.remove(photo.id)
 
+    await delete_unused_file(photo, db)
     return photo
 
 
+async def delete_unused_file(photo: Photo, db: AsyncSession) -> bool:
+    """
+    Delete the stored file of a deleted photo unless other photos use it.
+
+    Runs once the deletion is committed, holding the lock uploads of the same
+    content take until their photo is committed: a concurrent upload either
+    committed its photo before the check, or finds no stored file once it holds
+    the lock and uploads it again. Failures are logged, the photo stays deleted.
+
+    :param photo: photo deleted from the database
+    :param db: database session
+    :return: True if the file was deleted
+    """
+    try:
+        await lock_assets([photo.content_hash or photo.public_id], db)
+        if await is_asset_shared(photo, db):
+            return False
+
+        deleted = await storage.delete_file(public_id=photo.public_id)
+        if not deleted:
+            logger.error(f"Stored file {photo.public_id} was not deleted")
+        return deleted
+    except Exception as e:
+        logger.error(f"Stored file {photo.public_id} was not deleted: {e}")
+        return False
+    finally:
+        # Releases the lock
+        await db.commit()
+
+
+async def is_asset_shared(photo: Photo, db: AsyncSession) -> bool:
+    """
+    Whether other photos use the stored file of a photo, which must then be kept.
+
+    :param photo: photo
+    :param db: database session
+    """
+    if photo.content_hash:
+        # Deduplicated photos share the hash of the photo they reuse
+        shared = Photo.content_hash == photo.content_hash
+    else:
+        shared = Photo.public_id == photo.public_id
+    res = await db.execute(
+        select(Photo.id).where(shared, Photo.id != photo.id).limit(1)
+    )
+    return res.first() is not None
+
+
+def get_photo_load_options(view: str = "full") -> list:
+    """
+    Loader options for a photo view.
+
+    The "summary" view loads only the columns and tags rendered by the photo
+    grid; any other relationship access raises instead of querying.
+
+    :param view: "summary" or "full"
+    :type view: str
+    :return: loader options for ``select(Photo)``
+    :rtype: list
+    """
+    if view != "summary":
+        return []
+
+    return [
+        load_only(
+            Photo.id,
+            Photo.title,
+            Photo.description,
+            Photo.created_at,
+            Photo.owner_id,
+            Photo.public_id,
+            Photo.secure_url,
+            Photo.rating_count,
+            Photo.rating_sum,
+        ),
+        selectinload(Photo.tags),
+        raiseload("*"),
+    ]
+
+
 async def get_photos(
-    skip: int, limit: int, query: str, db: AsyncSession
-) -> list[Photo]:
+    skip: int,
+    limit: int,
+    query: str,
+    db: AsyncSession,
+    cursor: str | None = None,
+    view: str = "full",
+) -> tuple[list[Photo], str | None]:
+    """
+    Get a page of photos, newest first.
+
+    Pages are keyset-paginated on (created_at, id); ``skip`` is only applied when
+    no cursor is given and is kept for backwards compatibility.
+    Search results are ordered by relevance and keyset-paginated on (rank, id).
+
+    :param skip: number of photos to skip (deprecated, use cursor)
+    :param limit: page size
+    :param query: search query
+    :param db: database session
+    :param cursor: cursor returned with the previous page
+    :param view: "summary" or "full", see :func:`get_photo_load_options`
+    :return: photos and the cursor of the next page
+    """
+    options = get_photo_load_options(view)
+
     if query:
-        statement = get_search_statement(query, skip, limit)
+        statement = get_search_statement(query, db, skip, limit, cursor).options(
+            *options
+        )
         res = await db.execute(statement)
+        return next_rank_cursor(res.all(), limit)
 
-        return list(res.scalars().all())
-    else:
-        statement = select(Photo).offset(skip).limit(limit)
-        res = await db.execute(statement)
-        return list(res.scalars().all())
+    statement = select(Photo).options(*options).offset(0 if cursor else skip)
+    statement = paginate(statement, Photo, limit=limit, cursor=cursor, descending=True)
+    res = await db.execute(statement)
+    return next_cursor(list(res.scalars().all()), limit)
+
+
+async def get_photos_count(
+    query: str, db: AsyncSession, approximate: bool = False
+) -> tuple[int, bool]:
+    """
+    Count photos matching the query in a single COUNT statement.
 
+    With ``approximate`` set, Postgres answers from planner statistics when the
+    estimate is above ``settings.photos_count_estimate_threshold``; smaller
+    results and other databases are counted exactly.
 
-async def get_photos_count(query: str, db: AsyncSession) -> int:
+    :param query: search query
+    :param db: database session
+    :param approximate: allow an estimated total for broad queries
+    :return: total and whether it is an estimate
+    """
     if query:
-        statement = get_search_statement(query)
-        res = await db.execute(statement)
-        total = len(res.scalars().all())
+        estimated = get_search_backend(db).match(get_search_terms(query))
+        ranked = estimated.subquery()
+        statement = select(func.count(distinct(ranked.c.photo_id)))
     else:
-        query = select(func.count(Photo.id))
-        res = await db.execute(query)
-        total = res.scalar()
+        statement = select(func.count(Photo.id))
+        estimated = select(Photo.id)
+
+    if approximate:
+        estimate = await estimate_count(estimated, db)
+        if estimate is not None and estimate >= settings.photos_count_estimate_threshold:
+            return estimate, True
+
+    res = await db.execute(statement)
+    return res.scalar(), False
+
+
+class Explain(Executable, ClauseElement):
+    """
+    ``EXPLAIN (FORMAT JSON)`` of a statement, compiled by the dialect together
+    with the statement so its bound parameters use the driver's own style.
+    """
+
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
 
-    return total
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler, **kw) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+async def estimate_count(statement: Select, db: AsyncSession) -> int | None:
+    """
+    Row estimate of the Postgres planner for a statement, None on other databases.
+
+    :param statement: statement to estimate
+    :param db: database session
+    :return: estimated number of rows
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return None
+
+    res = await db.execute(Explain(statement))
+    plan = res.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
 
 
 async def get_photo(*, photo_id: int, db: AsyncSession) -> Photo | None:
@@ -149,13 +656,170 @@ async def get_photo(*, photo_id: int, db: AsyncSession) -> Photo | None:
     return res.scalars().one_or_none()
 
 
-def get_search_statement(query: str, skip: int = 0, limit: int = 50) -> Select:
+async def get_similar_photos(
+    *, photo_id: int, max_distance: int, limit: int, db: AsyncSession
+) -> list[tuple[Photo, int]] | None:
+    """
+    Photos whose perceptual hash is within ``max_distance`` bits of the
+    photo's, from the in-memory BK-tree.
+
+    :param photo_id: ID of the photo
+    :param max_distance: maximum Hamming distance between the hashes
+    :param limit: maximum number of photos
+    :param db: database session
+    :return: (photo, distance), closest first, None if the photo doesn't exist
+    """
+    res = await db.execute(select(Photo.phash).where(Photo.id == photo_id))
+    row = res.one_or_none()
+    if row is None:
+        return None
+    if row.phash is None:
+        return []
+
+    matches = [
+        (distance, id)
+        for distance, id in await similarity_index.search(row.phash, max_distance, db)
+        if id != photo_id
+    ]
+    similar = []
+    while matches and len(similar) < limit:
+        batch = matches[: limit - len(similar)]
+        matches = matches[len(batch) :]
+        res = await db.execute(
+            select(Photo)
+            .where(Photo.id.in_([id for _, id in batch]))
+            .options(*get_photo_load_options("summary"))
+        )
+        photos = {photo.id: photo for photo in res.scalars().all()}
+        for distance, id in batch:
+            if id in photos:
+                similar.append((photos[id], distance))
+            else:
+                # Deleted by another worker
+                similarity_index.remove(id)
+    return similar
+
+
+async def touch_photos(photo_ids: Iterable[int], db: AsyncSession):
+    """
+    Bump ``updated_at`` of photos whose representation changed without an
+    UPDATE of their row (tags, transformations, comment edits), so their ETag
+    changes. Counter updates of the row bump it through ``onupdate``.
+
+    :param photo_ids: IDs of the changed photos
+    :param db: database session
+    """
+    await db.execute(
+        update(Photo)
+        .where(Photo.id.in_(list(photo_ids)))
+        .values(updated_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+
+
+def get_version(
+    photo_updated_at: datetime,
+    owner_updated_at: datetime,
+    commenters_updated_at: datetime | None = None,
+) -> datetime:
+    # The owner and commenter profiles are embedded in the photo representation
+    return max(
+        version
+        for version in (photo_updated_at, owner_updated_at, commenters_updated_at)
+        if version is not None
+    )
+
+
+def get_commenters_version(photo_id) -> ScalarSelect:
+    """
+    Latest ``updated_at`` of the users who commented a photo, as a scalar
+    subquery over ``ix_comments_photo_id_created_at_id``.
+
+    :param photo_id: photo id or a column to correlate with
+    """
+    commenter = aliased(User)
+    return (
+        select(func.max(commenter.updated_at))
+        .join(Comment, Comment.user_id == commenter.id)
+        .where(Comment.photo_id == photo_id)
+        .scalar_subquery()
+    )
+
+
+async def get_photo_version(*, photo_id: int, db: AsyncSession) -> datetime | None:
+    """
+    Last modification time of a photo, its owner and its commenters, from
+    indexed lookups without loading relationships.
+
+    :param photo_id: ID of the photo
+    :param db: database session
+    :return: version of the photo, None if it doesn't exist
+    """
+    res = await db.execute(
+        select(Photo.updated_at, User.updated_at, get_commenters_version(photo_id))
+        .join(User, User.id == Photo.owner_id)
+        .where(Photo.id == photo_id)
+    )
+    row = res.one_or_none()
+    return get_version(*row) if row else None
+
+
+async def get_photos_versions(
+    skip: int,
+    limit: int,
+    query: str,
+    db: AsyncSession,
+    cursor: str | None = None,
+    view: str = "full",
+) -> list[tuple[int, datetime]]:
+    """
+    IDs and versions of the photos :func:`get_photos` returns for the same
+    arguments, read from the photos, users and comments rows only.
+
+    The extra row of a keyset page is included, as it decides the next cursor.
+
+    :return: (photo id, version) of each photo of the page, in page order
+    """
+    columns = [Photo.id, Photo.updated_at, User.updated_at]
+    if view != "summary":
+        columns.append(get_commenters_version(Photo.id))
+    if query:
+        statement = get_search_statement(
+            query, db, skip, limit, cursor
+        ).with_only_columns(*columns)
+    else:
+        statement = select(*columns).offset(0 if cursor else skip)
+        statement = paginate(
+            statement, Photo, limit=limit, cursor=cursor, descending=True
+        )
+    statement = statement.join(User, User.id == Photo.owner_id)
+
+    res = await db.execute(statement)
+    return [(id, get_version(*versions)) for id, *versions in res.all()]
+
+
+def get_search_statement(
+    query: str,
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 50,
+    cursor: str | None = None,
+) -> Select:
+    """
+    Select of (photo, rank) for a search page, best match first, with one
+    extra row for :func:`~src.pagination.next_rank_cursor`.
+
+    :param cursor: search cursor of the previous page, ``skip`` is ignored with it
+    """
+    ranked = get_search_backend(db).match(get_search_terms(query)).subquery()
     statement = (
-        select(Photo)
-        .join(PhotoToTag, Photo.id == PhotoToTag.photo_id, isouter=True)
-        .join(Tag, Tag.id == PhotoToTag.tag_id, isouter=True)
-        .where(or_(Tag.name.ilike(f"%{query}%"), Photo.title.ilike(f"%{query}%")))
-        .offset(skip)
-        .limit(limit)
+        select(Photo, ranked.c.rank)
+        .join(ranked, ranked.c.photo_id == Photo.id)
+        .order_by(ranked.c.rank.desc(), Photo.id.desc())
     )
-    return statement
+    if cursor:
+        rank, id = decode_rank_cursor(cursor)
+        statement = statement.where(tuple_(ranked.c.rank, Photo.id) < tuple_(rank, id))
+    else:
+        statement = statement.offset(skip)
+    return statement.limit(limit + 1)
@@ -0,0 +1,192 @@
+import re
+from abc import ABC, abstractmethod
+
+from sqlalchemy import (
+    DDL,
+    Select,
+    column,
+    delete,
+    event,
+    false,
+    func,
+    insert,
+    literal_column,
+    select,
+    table,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.photos.models import Photo
+from src.settings import settings
+from src.tags.models import PhotoToTag, Tag
+
+# SQLite keeps the search document in an FTS5 table keyed by photo id (rowid)
+photos_fts = table(
+    "photos_fts",
+    column("rowid"),
+    column("title"),
+    column("description"),
+    column("tags"),
+)
+
+event.listen(
+    Photo.__table__,
+    "after_create",
+    DDL(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS photos_fts "
+        "USING fts5(title, description, tags)"
+    ).execute_if(dialect="sqlite"),
+)
+event.listen(
+    Photo.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS photos_fts").execute_if(dialect="sqlite"),
+)
+
+
+def get_search_terms(query: str) -> list[str]:
+    """
+    Split a user query into search terms, dropping any query syntax characters.
+
+    :param query: raw search query
+    :type query: str
+    :return: lowercase terms
+    :rtype: list[str]
+    """
+    return re.findall(r"\w+", query.lower())
+
+
+def _tag_names(aggregate) -> Select:
+    return (
+        select(aggregate(Tag.name, " "))
+        .join(PhotoToTag, PhotoToTag.tag_id == Tag.id)
+        .where(PhotoToTag.photo_id == Photo.id)
+        .scalar_subquery()
+    )
+
+
+class SearchBackend(ABC):
+    """
+    Full-text search over photo title, tags and description.
+
+    Methods:
+        match(terms):
+            Select of (photo_id, rank) for photos matching every term (prefix match).
+
+        index(db, photo_ids):
+            Rebuild the search document of the given photos.
+
+        remove(db, photo_ids):
+            Drop the search document of the given photos.
+    """
+
+    @abstractmethod
+    def match(self, terms: list[str]) -> Select:
+        ...
+
+    @abstractmethod
+    async def index(self, db: AsyncSession, photo_ids: list[int]) -> None:
+        ...
+
+    async def remove(self, db: AsyncSession, photo_ids: list[int]) -> None:
+        # Backends keeping the document on the photo row drop it with the row
+        pass
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    Weighted ``tsvector`` stored in ``photos.search_vector`` (GIN index), ranked with ``ts_rank``.
+    Title is weighted A, tags B and description C.
+    """
+
+    @staticmethod
+    def _weighted(value, weight: str):
+        return func.setweight(
+            func.to_tsvector(settings.search_config, func.coalesce(value, "")), weight
+        )
+
+    def document(self):
+        return (
+            self._weighted(Photo.title, "A")
+            .op("||")(self._weighted(_tag_names(func.string_agg), "B"))
+            .op("||")(self._weighted(Photo.description, "C"))
+        )
+
+    def match(self, terms: list[str]) -> Select:
+        if not terms:
+            return select(Photo.id.label("photo_id"), literal_column("0").label("rank")).where(false())
+
+        tsquery = func.to_tsquery(
+            settings.search_config, " & ".join(f"{term}:*" for term in terms)
+        )
+        return select(
+            Photo.id.label("photo_id"),
+            func.ts_rank(Photo.search_vector, tsquery).label("rank"),
+        ).where(Photo.search_vector.op("@@")(tsquery))
+
+    async def index(self, db: AsyncSession, photo_ids: list[int]) -> None:
+        if not photo_ids:
+            return
+        await db.execute(
+            update(Photo)
+            .where(Photo.id.in_(photo_ids))
+            .values(search_vector=self.document())
+            .execution_options(synchronize_session=False)
+        )
+
+
+class SqliteSearchBackend(SearchBackend):
+    """
+    FTS5 table ``photos_fts``, ranked with ``bm25`` using the same weights as ``ts_rank``.
+    """
+
+    def match(self, terms: list[str]) -> Select:
+        statement = select(
+            photos_fts.c.rowid.label("photo_id"),
+            (-func.bm25(literal_column("photos_fts"), 1.0, 0.2, 0.4)).label("rank"),
+        )
+        if not terms:
+            return statement.where(false())
+
+        fts_query = " ".join(f'"{term}"*' for term in terms)
+        return statement.where(literal_column("photos_fts").op("MATCH")(fts_query))
+
+    async def index(self, db: AsyncSession, photo_ids: list[int]) -> None:
+        if not photo_ids:
+            return
+        await self.remove(db, photo_ids)
+        await db.execute(
+            insert(photos_fts).from_select(
+                ["rowid", "title", "description", "tags"],
+                select(
+                    Photo.id,
+                    Photo.title,
+                    Photo.description,
+                    func.coalesce(_tag_names(func.group_concat), ""),
+                ).where(Photo.id.in_(photo_ids)),
+            )
+        )
+
+    async def remove(self, db: AsyncSession, photo_ids: list[int]) -> None:
+        if not photo_ids:
+            return
+        await db.execute(delete(photos_fts).where(photos_fts.c.rowid.in_(photo_ids)))
+
+
+postgres_backend = PostgresSearchBackend()
+sqlite_backend = SqliteSearchBackend()
+
+
+def get_search_backend(db: AsyncSession) -> SearchBackend:
+    """
+    Pick the search backend matching the dialect of the session.
+
+    :param db: database session
+    :type db: AsyncSession
+    :return: search backend
+    :rtype: SearchBackend
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite_backend
+    return postgres_backend
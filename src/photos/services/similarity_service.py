@@ -0,0 +1,330 @@
+import asyncio
+import io
+import time
+from datetime import datetime, timedelta
+from typing import BinaryIO
+
+from PIL import Image, UnidentifiedImageError
+from sqlalchemy import select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.photos.models import Photo
+from src.services.storage import storage
+from src.settings import settings
+
+HASH_BITS = 64
+# Refreshes re-read this far back, rows committed by transactions that
+# started before the last refresh carry an older updated_at
+REFRESH_OVERLAP = timedelta(minutes=1)
+# Thumbnail fetched to hash a photo whose original isn't at hand
+THUMBNAIL_SIZE = (72, 64)
+# Largest copy of an image decoded for hashing, 18 KB of pixels
+PREVIEW_SIZE = (THUMBNAIL_SIZE[0] * 2, THUMBNAIL_SIZE[1] * 2)
+
+
+def load_preview(file: BinaryIO) -> Image.Image | None:
+    """
+    Grayscale copy of an image at most ``PREVIEW_SIZE``, decoded from the file
+    without reading it into memory first.
+
+    :return: preview, None if the file isn't an image Pillow can decode
+    """
+    try:
+        with Image.open(file) as image:
+            # JPEG decoders can scale down while decoding, much cheaper than a full decode
+            image.draft("L", PREVIEW_SIZE)
+            preview = image.convert("L")
+    except (UnidentifiedImageError, OSError, ValueError, Image.DecompressionBombError):
+        return None
+    preview.thumbnail(PREVIEW_SIZE)
+    return preview
+
+
+def dhash_image(image: Image.Image) -> int:
+    """
+    64-bit difference hash of a grayscale image: one bit per pair of
+    horizontally adjacent pixels of a 9x8 thumbnail, set when the left one is
+    brighter. Resized or recompressed copies differ by a few bits.
+    """
+    pixels = image.resize((9, 8), Image.Resampling.LANCZOS).tobytes()
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            value = (value << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return value
+
+
+def dhash(data: bytes) -> int | None:
+    """
+    :param data: encoded image
+    :type data: bytes
+    :return: :func:`dhash_image` of the image, None if it can't be decoded
+    :rtype: int | None
+    """
+    preview = load_preview(io.BytesIO(data))
+    if preview is None:
+        return None
+    return dhash_image(preview)
+
+
+def to_signed(value: int | None) -> int | None:
+    # Stored in a signed BIGINT column
+    if value is None or value < 1 << (HASH_BITS - 1):
+        return value
+    return value - (1 << HASH_BITS)
+
+
+def to_unsigned(value: int | None) -> int | None:
+    if value is None or value >= 0:
+        return value
+    return value + (1 << HASH_BITS)
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree of 64-bit hashes under the Hamming distance.
+
+    A node's children are keyed by their distance to it, so by the triangle
+    inequality a search for hashes within ``d`` of ``h`` only descends into
+    children keyed ``distance(h, node) - d`` to ``distance(h, node) + d``.
+
+    Photos with the same hash share a node. Removing a photo only drops its
+    id, the node keeps routing searches.
+    """
+
+    def __init__(self):
+        # node: [hash, ids, {distance: child}]
+        self.root: list | None = None
+        self.size = 0
+
+    def add(self, value: int, id: int):
+        self.size += 1
+        if self.root is None:
+            self.root = [value, {id}, {}]
+            return
+
+        node = self.root
+        while True:
+            distance = hamming(value, node[0])
+            if distance == 0:
+                node[1].add(id)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, {id}, {}]
+                return
+            node = child
+
+    def remove(self, value: int, id: int):
+        node = self.root
+        while node is not None:
+            distance = hamming(value, node[0])
+            if distance == 0:
+                if id in node[1]:
+                    node[1].discard(id)
+                    self.size -= 1
+                return
+            node = node[2].get(distance)
+
+    def search(self, value: int, max_distance: int) -> list[tuple[int, int]]:
+        """
+        :return: (distance, id) of the photos within ``max_distance``, closest first
+        """
+        found = []
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = hamming(value, node[0])
+            if distance <= max_distance:
+                found.extend((distance, id) for id in node[1])
+            for key, child in node[2].items():
+                if distance - max_distance <= key <= distance + max_distance:
+                    stack.append(child)
+        found.sort()
+        return found
+
+
+class SimilarityIndex:
+    """
+    In-process BK-tree of the photos' perceptual hashes.
+
+    Each process keeps its own tree. Writes made by this process update it
+    directly. :meth:`refresh` re-reads the photos whose ``updated_at`` moved
+    since the previous refresh, so photos added, replaced or backfilled by
+    other workers are picked up. It runs before a search, at most every
+    ``settings.similar_refresh_interval`` seconds. Photos deleted elsewhere are
+    dropped when a search result fails to load, see
+    :func:`~src.photos.services.photo_service.get_similar_photos`.
+
+    Attributes:
+        tree (BKTree): Hashes by photo id.
+        hashes (dict[int, int]): Indexed hash of each photo id.
+        updated_at (datetime | None): Latest ``updated_at`` read from the database.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.tree = BKTree()
+        self.hashes: dict[int, int] = {}
+        self.updated_at: datetime | None = None
+        self.refreshed_at: float | None = None
+
+    def update(self, photo_id: int, phash: int | None):
+        """
+        Index the current hash of a photo, replacing the previous one. A None
+        hash removes the photo.
+        """
+        phash = to_unsigned(phash)
+        if self.hashes.get(photo_id) == phash:
+            return
+        self.remove(photo_id)
+        if phash is not None:
+            self.hashes[photo_id] = phash
+            self.tree.add(phash, photo_id)
+
+    def remove(self, photo_id: int):
+        phash = self.hashes.pop(photo_id, None)
+        if phash is not None:
+            self.tree.remove(phash, photo_id)
+
+    async def refresh(self, db: AsyncSession, batch_size: int = 10000):
+        statement = (
+            select(Photo.id, Photo.phash, Photo.updated_at)
+            .order_by(Photo.updated_at, Photo.id)
+            .limit(batch_size)
+        )
+        if self.updated_at is None:
+            statement = statement.where(Photo.phash.is_not(None))
+        else:
+            statement = statement.where(
+                Photo.updated_at >= self.updated_at - REFRESH_OVERLAP
+            )
+
+        after = None
+        while True:
+            page = statement if after is None else statement.where(
+                tuple_(Photo.updated_at, Photo.id) > tuple_(*after)
+            )
+            rows = (await db.execute(page)).all()
+            for photo_id, phash, _ in rows:
+                self.update(photo_id, phash)
+            if rows:
+                after = (rows[-1].updated_at, rows[-1].id)
+                if self.updated_at is None or after[0] > self.updated_at:
+                    self.updated_at = after[0]
+            if len(rows) < batch_size:
+                break
+        self.refreshed_at = time.monotonic()
+
+    async def rebuild(self, db: AsyncSession):
+        self.clear()
+        await self.refresh(db)
+
+    async def search(
+        self, phash: int, max_distance: int, db: AsyncSession
+    ) -> list[tuple[int, int]]:
+        if (
+            self.refreshed_at is None
+            or time.monotonic() - self.refreshed_at >= settings.similar_refresh_interval
+        ):
+            await self.refresh(db)
+        return self.tree.search(to_unsigned(phash), max_distance)
+
+
+similarity_index = SimilarityIndex()
+
+def _dhash_file(file: BinaryIO) -> int | None:
+    file.seek(0)
+    try:
+        preview = load_preview(file)
+    finally:
+        file.seek(0)
+    return None if preview is None else dhash_image(preview)
+
+
+def _dhash_url(url: str) -> int | None:
+    with storage.backend.open(url) as file:
+        preview = load_preview(file)
+    return None if preview is None else dhash_image(preview)
+
+
+async def hash_photo_file(file: BinaryIO) -> int | None:
+    """
+    Perceptual hash of an image file, as stored in ``Photo.phash``.
+
+    Computed on the storage threads: the image is decoded scaled down and
+    hashing the preview takes well under a millisecond.
+    """
+    return to_signed(await storage.run("phash_file", _dhash_file, file))
+
+
+async def hash_stored_photo(public_id: str) -> int | None:
+    """
+    Perceptual hash of a stored photo, from a small thumbnail where the
+    backend can resize.
+    """
+    url = storage.build_url(
+        public_id, width=THUMBNAIL_SIZE[0], height=THUMBNAIL_SIZE[1], crop="scale"
+    )
+    try:
+        value = await storage.run("phash_url", _dhash_url, url)
+    except (OSError, ValueError):
+        return None
+    return to_signed(value)
+
+
+async def backfill_hashes(db: AsyncSession, batch_size: int = 100) -> int:
+    """
+    Hash the photos stored before ``Photo.phash`` existed, from thumbnails
+    built by the storage backend. Photos that can't be decoded stay NULL and
+    are retried on the next run.
+
+    Run it with ``python -m src.photos.services.similarity_service``. The
+    updates bump ``updated_at``, running workers index the photos on their
+    next refresh.
+
+    :return: number of photos hashed
+    """
+    hashed = 0
+    after_id = 0
+    while True:
+        res = await db.execute(
+            select(Photo.id, Photo.public_id)
+            .where(Photo.phash.is_(None), Photo.id > after_id)
+            .order_by(Photo.id)
+            .limit(batch_size)
+        )
+        rows = res.all()
+        if not rows:
+            return hashed
+
+        hashes = await asyncio.gather(
+            *(hash_stored_photo(public_id) for _, public_id in rows)
+        )
+        for (photo_id, _), phash in zip(rows, hashes):
+            if phash is None:
+                continue
+            await db.execute(
+                update(Photo)
+                .where(Photo.id == photo_id, Photo.phash.is_(None))
+                .values(phash=phash)
+            )
+            hashed += 1
+        await db.commit()
+        after_id = rows[-1].id
+
+
+if __name__ == "__main__":
+    from src.database import async_session_factory
+
+    async def main():
+        async with async_session_factory() as db:
+            print(f"{await backfill_hashes(db)} photos hashed")
+
+    asyncio.run(main())
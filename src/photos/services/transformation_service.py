@@ -2,8 +2,9 @@ from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.photos.models import Photo, Transformation, QrCode
+from src.photos.services.photo_service import touch_photos
 from src.photos.utils.qrcode_utils import create_qr_code
-from src.services.cloudinary_utils import transform_file, upload_file
+from src.services.storage import storage
 
 
 async def transform(
@@ -16,7 +17,7 @@ async def transform(
     if not photo:
         return None
 
-    result = transform_file(public_id=photo.public_id, transformations=transformations)
+    result = storage.transform_file(public_id=photo.public_id, transformations=transformations)
 
     return result
 
@@ -25,7 +26,7 @@ async def save_transform(
     photo_id: int, url: str, db: AsyncSession
 ) -> Transformation | None:
 
-    asset = upload_file(file=url, folder="transformations")
+    asset = await storage.upload_file(file=url, folder="transformations")
 
     transformation = Transformation(
         photo_id=photo_id,
@@ -36,6 +37,7 @@ async def save_transform(
     )
 
     db.add(transformation)
+    await touch_photos([photo_id], db)
     await db.commit()
     await db.flush()
     await db.refresh(transformation)
@@ -45,7 +47,7 @@ async def save_transform(
 
 async def get_qr_code(transformation_id: int, url: str, db: AsyncSession) -> QrCode | None:
 
-    qr_asset = create_qr_code(url=url)
+    qr_asset = await create_qr_code(url=url)
     if qr_asset:
         qr = QrCode(
             transformation_id=transformation_id,
@@ -56,6 +58,10 @@ async def get_qr_code(transformation_id: int, url: str, db: AsyncSession) -> QrC
         )
 
         db.add(qr)
+        photo_id = await db.scalar(
+            select(Transformation.photo_id).where(Transformation.id == transformation_id)
+        )
+        await touch_photos([photo_id], db)
         await db.commit()
         await db.refresh(qr)
 
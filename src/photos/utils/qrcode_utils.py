@@ -1,10 +1,10 @@
 import qrcode
-from src.services.cloudinary_utils import upload_file
+from src.services.storage import storage
 from qrcode.image.svg import SvgPathImage
 import io
 
 
-def create_qr_code(url: str) -> dict | None:
+def render_qr_code(url: str) -> io.BytesIO:
 
     qr = qrcode.QRCode(
         version=1,
@@ -21,7 +21,14 @@ def create_qr_code(url: str) -> dict | None:
     img.save(img_io)
     img_io.seek(0)
 
-    asset = upload_file(file=img_io, folder="qrcodes")
+    return img_io
+
+
+async def create_qr_code(url: str) -> dict | None:
+
+    img_io = await storage.run("render_qr_code", render_qr_code, url)
+
+    asset = await storage.upload_file(file=img_io, folder="qrcodes")
 
     if asset:
         return asset
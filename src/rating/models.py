@@ -1,4 +1,4 @@
-from sqlalchemy import ForeignKey, SmallInteger, CheckConstraint
+from sqlalchemy import ForeignKey, Index, SmallInteger, CheckConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.models import Base
@@ -6,6 +6,9 @@ from src.models import Base
 
 class Rating(Base):
     __tablename__ = "ratings"
+    __table_args__ = (
+        Index("ix_ratings_photo_id_user_id", "photo_id", "user_id", unique=True),
+    )
     photo_id: Mapped[int] = mapped_column(
         ForeignKey("photos.id", ondelete="CASCADE", onupdate="CASCADE")
     )
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database import get_db
+from src.database import get_db, get_read_db
 from src.dependencies import get_current_user
 from src.logger import get_logger
 from src.rating.schemas import (
@@ -33,7 +33,7 @@ router = APIRouter(
 async def get_average_rating_handler(
     response: Response,
     photo_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     try:
         average_rating = await get_average_rating(db=db, photo_id=photo_id)
@@ -83,7 +83,7 @@ async def set_rating_handler(
     current_user: User = Depends(get_current_user),
 ):
     try:
-        rating_create = await create_update_rating(
+        rating_create, average_rating = await create_update_rating(
             db=db, user_id=current_user.id, photo_id=photo_id, rating=rating.rating
         )
         if not rating_create:
@@ -92,7 +92,9 @@ async def set_rating_handler(
                 "status": "error",
                 "message": "An error occurred while creating rating!",
             }
-        return {"data": rating_create}
+        data = RatingResponseSchema.Data.model_validate(rating_create)
+        data.average_rating = average_rating
+        return {"data": data}
     except Exception as e:
         logger.error(e)
         response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -15,6 +15,7 @@ class RatingResponseSchema(ResponseModel):
         id: int
         user_id: int
         photo_id: int
+        average_rating: float | None = None
 
     data: Data = None
 
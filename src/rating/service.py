@@ -1,6 +1,8 @@
-from sqlalchemy import select, and_
+from sqlalchemy import and_, delete, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.photos.models import Photo
 from src.rating.models import Rating
 
 
@@ -13,49 +15,92 @@ async def get_rating(db: AsyncSession, photo_id: int, user_id: int):
     return result.scalar_one_or_none()
 
 
+async def lock_photo(db: AsyncSession, photo_id: int, user_id: int) -> int | None:
+    # Votes on a photo queue on its row, so the vote read here stays current
+    # until the aggregates are adjusted and the transaction commits
+    result = await db.execute(
+        select(Rating.rating)
+        .select_from(Photo)
+        .outerjoin(
+            Rating, and_(Rating.photo_id == Photo.id, Rating.user_id == user_id)
+        )
+        .where(Photo.id == photo_id)
+        .with_for_update(of=Photo)
+    )
+    return result.scalar_one_or_none()
+
+
+async def adjust_photo_rating(
+    db: AsyncSession, photo_id: int, count: int, total: int
+) -> float:
+    # O(1) relative update of the aggregates; callers hold the lock of lock_photo
+    result = await db.execute(
+        update(Photo)
+        .where(Photo.id == photo_id)
+        .values(
+            rating_count=Photo.rating_count + count,
+            rating_sum=Photo.rating_sum + total,
+        )
+        .returning(Photo.average_rating)
+        .execution_options(synchronize_session=False)
+    )
+    return result.scalar_one_or_none() or 0
+
+
 async def create_update_rating(
     db: AsyncSession, photo_id: int, user_id: int, rating: int
-):
+) -> tuple[Rating, float]:
+    """
+    Set the rating of a user for a photo and return it with the new photo average.
 
+    The vote is a single ``INSERT ... ON CONFLICT (photo_id, user_id) DO UPDATE``,
+    so concurrent votes of the same user can't create duplicate rows. Votes on
+    the same photo are serialized by :func:`lock_photo`, which also reads the
+    previous vote so the aggregates are adjusted by the difference.
+    """
+    previous = await lock_photo(db, photo_id, user_id)
+    insert = sqlite.insert if db.get_bind().dialect.name == "sqlite" else postgresql.insert
+    statement = insert(Rating).values(photo_id=photo_id, user_id=user_id, rating=rating)
     result = await db.execute(
-        select(Rating).where(
-            and_(Rating.user_id == user_id, Rating.photo_id == photo_id)
+        statement.on_conflict_do_update(
+            index_elements=[Rating.photo_id, Rating.user_id],
+            set_={"rating": statement.excluded.rating, "updated_at": func.now()},
         )
+        .returning(Rating)
+        .execution_options(populate_existing=True)
     )
-    db_rating = result.scalars().first()
+    db_rating = result.scalar_one()
 
-    if db_rating:
-        db_rating.rating = rating
-        await db.commit()
-        await db.refresh(db_rating)
-        return db_rating
+    if previous is None:
+        average_rating = await adjust_photo_rating(db, photo_id, 1, rating)
     else:
-        db_rating = Rating(photo_id=photo_id, user_id=user_id, rating=rating)
-
-    db.add(db_rating)
+        average_rating = await adjust_photo_rating(db, photo_id, 0, rating - previous)
     await db.commit()
-    await db.refresh(db_rating)
-    return db_rating
+    return db_rating, average_rating
 
 
 async def delete_rating(db: AsyncSession, photo_id: int, user_id: int):
-
+    await lock_photo(db, photo_id, user_id)
     result = await db.execute(
-        select(Rating).where(
-            and_(Rating.user_id == user_id, Rating.photo_id == photo_id)
-        )
+        delete(Rating)
+        .where(and_(Rating.user_id == user_id, Rating.photo_id == photo_id))
+        .returning(Rating)
     )
-    db_rating = result.scalars().first()
+    db_rating = result.scalar_one_or_none()
+    if not db_rating:
+        return None
 
-    await db.delete(db_rating)
+    await adjust_photo_rating(db, photo_id, -1, -db_rating.rating)
     await db.commit()
 
     return db_rating
 
 
 async def get_average_rating(db: AsyncSession, photo_id: int):
-    result = await db.execute(select(Rating).where(Rating.photo_id == photo_id))
-    ratings = result.scalars().all()
-    if not ratings:
+    result = await db.execute(
+        select(Photo.average_rating).where(Photo.id == photo_id)
+    )
+    average_rating = result.scalar_one_or_none()
+    if not average_rating:
         return 0
-    return sum([rating.rating for rating in ratings]) / len(ratings)
+    return average_rating
@@ -1,3 +1,5 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime, timedelta
 from typing import Optional
 
@@ -17,7 +19,9 @@ class Auth:
     Authentication service for handling user authentication and token management.
 
     Attributes:
-        pwd_context (CryptContext): Password hashing context using bcrypt.
+        pwd_context (CryptContext): Password hashing context using bcrypt with
+            ``settings.bcrypt_rounds``; hashes of any other cost need an update.
+        hash_executor (ThreadPoolExecutor): Bounded pool bcrypt runs on, off the event loop.
         SECRET_KEY (str): Secret key for JWT encoding and decoding.
         ALGORITHM (str): Algorithm used for JWT encoding and decoding.
         oauth2_scheme (OAuth2PasswordBearer): OAuth2 password bearer scheme for token authentication.
@@ -26,6 +30,9 @@ class Auth:
         verify_password(plain_password, hashed_password):
             Verifies a plain password against a hashed password.
 
+        verify_and_update(plain_password, hashed_password):
+            Verifies a password and rehashes it if the hash uses an outdated cost.
+
         get_password_hash(password):
             Hashes a password using bcrypt.
 
@@ -48,12 +55,25 @@ class Auth:
             Decodes an email verification token and returns the email if the token is valid.
     """
 
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    pwd_context = CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=settings.bcrypt_rounds,
+        bcrypt__min_rounds=settings.bcrypt_rounds,
+        bcrypt__max_rounds=settings.bcrypt_rounds,
+    )
+    hash_executor = ThreadPoolExecutor(
+        max_workers=settings.password_hash_workers, thread_name_prefix="password"
+    )
     SECRET_KEY = settings.secret_key
     ALGORITHM = settings.algorithm
     ACCESS_EXPIRES_DELTA = settings.access_token_expire_minutes
 
-    def verify_password(self, plain_password, hashed_password):
+    async def _run_hash(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.hash_executor, func, *args)
+
+    async def verify_password(self, plain_password, hashed_password):
         """
         Verifies a plain password against a hashed password.
 
@@ -64,9 +84,28 @@ class Auth:
         Returns:
             bool: True if the passwords match, False otherwise.
         """
-        return self.pwd_context.verify(plain_password, hashed_password)
+        return await self._run_hash(
+            self.pwd_context.verify, plain_password, hashed_password
+        )
+
+    async def verify_and_update(self, plain_password, hashed_password):
+        """
+        Verifies a plain password and, if the hash needs an update (e.g. the bcrypt
+        cost changed), hashes the password again with the current settings.
+
+        Args:
+            plain_password (str): The plain password to verify.
+            hashed_password (str): The hashed password to compare against.
+
+        Returns:
+            tuple[bool, str | None]: Whether the passwords match and the new hash,
+                                     None if the stored hash is up to date.
+        """
+        return await self._run_hash(
+            self.pwd_context.verify_and_update, plain_password, hashed_password
+        )
 
-    def get_password_hash(self, password: str):
+    async def get_password_hash(self, password: str):
         """
         Hashes a password using bcrypt.
 
@@ -76,7 +115,10 @@ class Auth:
         Returns:
             str: The hashed password.
         """
-        return self.pwd_context.hash(password)
+        return await self._run_hash(self.pwd_context.hash, password)
+
+    def shutdown(self):
+        self.hash_executor.shutdown(wait=False, cancel_futures=True)
 
     oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
@@ -205,7 +247,7 @@ class Auth:
         except JWTError as e:
             raise credentials_exception
 
-        user = await users.get_user_by_email(email, db)
+        user = await users.get_cached_user_by_email(email, db)
         if user is None:
             raise credentials_exception
         return user
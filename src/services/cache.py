@@ -0,0 +1,123 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from src.metrics import registry
+
+# Named caches, reported by /metrics
+caches: dict[str, "TTLCache"] = {}
+
+
+class TTLCache:
+    """
+    In-process LRU cache whose entries expire ``ttl`` seconds after they were set.
+
+    The cache is per process: other workers keep their own copy, so entries
+    invalidated here can stay visible elsewhere for at most ``ttl`` seconds.
+    A ``maxsize`` of 0 disables the cache. Caches created with a ``name`` are
+    reported by ``/metrics``.
+
+    Attributes:
+        maxsize (int): Maximum number of entries, least recently used are evicted first.
+        ttl (float): Entry lifetime in seconds.
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups that found no live entry.
+
+    Methods:
+        get(key):
+            Returns the cached value or None.
+
+        set(key, value):
+            Stores a value.
+
+        delete(key):
+            Drops a value if it is cached.
+
+        clear():
+            Drops every value.
+
+        stats():
+            Returns size, hits, misses and evictions.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, name: str = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        if name:
+            caches[name] = self
+
+    def get(self, key: Hashable) -> Any | None:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        if self.maxsize <= 0:
+            return
+
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: Hashable):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+@registry.collect("cache_requests_total", "Cache lookups by result.", type="counter")
+def cache_requests():
+    for name, cache in caches.items():
+        yield "cache_requests_total", {"cache": name, "result": "hit"}, cache.hits
+        yield "cache_requests_total", {"cache": name, "result": "miss"}, cache.misses
+
+
+@registry.collect("cache_hit_ratio", "Share of cache lookups answered from the cache.")
+def cache_hit_ratio():
+    for name, cache in caches.items():
+        lookups = cache.hits + cache.misses
+        ratio = cache.hits / lookups if lookups else 0.0
+        yield "cache_hit_ratio", {"cache": name}, ratio
+
+
+@registry.collect("cache_entries", "Number of cached entries.")
+def cache_entries():
+    for name, cache in caches.items():
+        yield "cache_entries", {"cache": name}, len(cache)
+
+
+@registry.collect(
+    "cache_evictions_total", "Entries evicted to stay under maxsize.", type="counter"
+)
+def cache_evictions():
+    for name, cache in caches.items():
+        yield "cache_evictions_total", {"cache": name}, cache.evictions
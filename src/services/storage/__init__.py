@@ -0,0 +1,67 @@
+from src.services.storage.base import StorageBackend
+from src.services.storage.facade import AsyncStorage, StorageMetrics
+from src.metrics import registry
+from src.settings import settings
+
+
+def get_storage_backend(name: str) -> StorageBackend:
+    """
+    Create the storage backend selected in settings.
+
+    :param name: ``cloudinary`` or ``local``
+    :type name: str
+    :return: storage backend
+    :rtype: StorageBackend
+    """
+    if name == "local":
+        from src.services.storage.local_backend import LocalStorage
+
+        return LocalStorage(
+            root=settings.storage_local_root, base_url=settings.storage_local_url
+        )
+
+    from src.services.storage.cloudinary_backend import CloudinaryStorage
+
+    return CloudinaryStorage(main_folder=settings.cloudinary_folder)
+
+
+storage = AsyncStorage(
+    backend=get_storage_backend(settings.storage_backend),
+    max_workers=settings.storage_max_workers,
+    max_concurrency=settings.storage_max_concurrency,
+    timeout=settings.storage_timeout,
+    stream_workers=settings.storage_stream_workers,
+    stream_timeout=settings.storage_stream_timeout,
+)
+
+
+@registry.collect(
+    "storage_call_duration_seconds", "Storage backend call time.", type="summary"
+)
+def storage_durations():
+    for operation, stats in storage.metrics.snapshot().items():
+        labels = {"operation": operation}
+        yield "storage_call_duration_seconds_sum", labels, stats["duration_seconds"]
+        yield "storage_call_duration_seconds_count", labels, stats["calls"]
+
+
+@registry.collect(
+    "storage_call_wait_seconds",
+    "Time storage calls waited for a concurrency slot and a thread.",
+    type="summary",
+)
+def storage_waits():
+    for operation, stats in storage.metrics.snapshot().items():
+        labels = {"operation": operation}
+        yield "storage_call_wait_seconds_sum", labels, stats["wait_seconds"]
+        yield "storage_call_wait_seconds_count", labels, stats["calls"]
+
+
+@registry.collect(
+    "storage_call_failures_total", "Failed storage calls.", type="counter"
+)
+def storage_failures():
+    for operation, stats in storage.metrics.snapshot().items():
+        for status in ("errors", "timeouts"):
+            labels = {"operation": operation, "status": status}
+            yield "storage_call_failures_total", labels, stats[status]
@@ -0,0 +1,59 @@
+import urllib.request
+from abc import ABC, abstractmethod
+from typing import BinaryIO
+
+
+class StorageBackend(ABC):
+    """
+    Blocking asset storage. Calls are run off the event loop by
+    :class:`~src.services.storage.facade.AsyncStorage`.
+
+    Assets are described by Cloudinary-style dicts with at least ``public_id``,
+    ``secure_url``, ``folder`` and ``original_filename``.
+
+    Methods:
+        upload_file(file, folder, public_id=None):
+            Stores a file object or the resource behind a URL, returns the asset.
+
+        upload_stream(file, folder):
+            Stores a file object read once, front to back, in bounded chunks.
+
+        delete_file(public_id):
+            Deletes an asset, returns True on success.
+
+        build_url(public_id, width=300, height=300, crop="fill"):
+            URL of a resized version of an asset.
+
+        transform_file(public_id, transformations):
+            URL of a transformed version of an asset, None if it can't be built.
+
+        open(url):
+            Opens an asset URL for reading.
+    """
+
+    @abstractmethod
+    def upload_file(
+        self, file: BinaryIO | str, folder: str, public_id: str = None
+    ) -> dict:
+        ...
+
+    def upload_stream(self, file: BinaryIO, folder: str) -> dict:
+        # Backends whose upload_file reads in chunks need nothing more
+        return self.upload_file(file, folder)
+
+    @abstractmethod
+    def delete_file(self, public_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    def build_url(
+        self, public_id: str, width: int = 300, height: int = 300, crop: str = "fill"
+    ) -> str:
+        ...
+
+    @abstractmethod
+    def transform_file(self, public_id: str, transformations: dict) -> str | None:
+        ...
+
+    def open(self, url: str) -> BinaryIO:
+        return urllib.request.urlopen(url)
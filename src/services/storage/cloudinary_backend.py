@@ -0,0 +1,116 @@
+from typing import BinaryIO
+import re
+
+import cloudinary
+import cloudinary.api
+import cloudinary.uploader
+import cloudinary.utils
+
+from src.services.storage.base import StorageBackend
+from src.services.storage.streaming import EmptyUpload
+from src.settings import settings
+
+img_url_pattern = re.compile(r'<img\s+[^>]*src="([^"]+)"')
+
+
+class CloudinaryStorage(StorageBackend):
+    """
+    Assets stored on Cloudinary, resized and transformed by Cloudinary URLs.
+    """
+
+    def __init__(self, main_folder: str = ""):
+        self.main_folder = main_folder
+        cloudinary.config(
+            cloud_name=settings.cloudinary_name,
+            api_key=settings.cloudinary_api_key,
+            api_secret=settings.cloudinary_api_secret,
+        )
+
+    def get_full_folder(self, folder: str) -> str:
+        full_path = [self.main_folder, folder]
+        return "/".join(p for p in full_path if p != "")
+
+    def upload_file(
+        self, file: BinaryIO | str, folder: str, public_id: str = None
+    ) -> dict:
+        folder_upload = self.get_full_folder(folder)
+        if not public_id:
+            asset = cloudinary.uploader.upload(
+                file,
+                folder=folder_upload,
+                # A random suffix keeps files with the same name apart
+                use_filename=True,
+                use_unique_filename=True,
+            )
+        else:
+            asset = cloudinary.uploader.upload(
+                file,
+                folder=folder_upload,
+                public_id=public_id,
+                overwrite=True,
+            )
+
+        return asset
+
+    def upload_stream(self, file: BinaryIO, folder: str) -> dict:
+        # Chunked upload API, as cloudinary.uploader.upload_large but without
+        # seeking to find the size: chunks are sent with an unknown total
+        # (-1) until the last one, so two chunks are held in memory at most
+        options = {"folder": self.get_full_folder(folder)}
+        headers = {"X-Unique-Upload-Id": cloudinary.utils.random_public_id()}
+        chunk_size = settings.storage_chunk_size
+
+        asset = None
+        start = 0
+        try:
+            chunk = file.read(chunk_size)
+            while chunk:
+                next_chunk = file.read(chunk_size)
+                end = start + len(chunk) - 1
+                total = -1 if next_chunk else end + 1
+                headers["Content-Range"] = f"bytes {start}-{end}/{total}"
+                asset = cloudinary.uploader.upload_large_part(
+                    (file.name, chunk), http_headers=dict(headers), **options
+                )
+                options["public_id"] = asset.get("public_id")
+                start = end + 1
+                chunk = next_chunk
+        except Exception:
+            if options.get("public_id"):
+                # Drops the asset if the last part went through; the parts of
+                # an unfinished upload are discarded by Cloudinary
+                try:
+                    cloudinary.uploader.destroy(public_id=options["public_id"])
+                except Exception:
+                    pass
+            raise
+
+        if asset is None:
+            raise EmptyUpload("Empty upload")
+        return asset
+
+    def delete_file(self, public_id: str) -> bool:
+        r = cloudinary.uploader.destroy(public_id=public_id)
+        if r.get("result") == "ok":
+            return True
+        return False
+
+    def build_url(
+        self, public_id: str, width: int = 300, height: int = 300, crop: str = "fill"
+    ) -> str:
+        return cloudinary.CloudinaryImage(public_id=public_id).build_url(
+            width=width, height=height, crop=crop
+        )
+
+    def transform_file(self, public_id: str, transformations: dict) -> str | None:
+        result = cloudinary.CloudinaryImage(public_id=public_id).image(
+            **transformations
+        )
+        if not result:
+            return None
+
+        match = img_url_pattern.search(result)
+        if match:
+            return match.group(1)
+        else:
+            return None
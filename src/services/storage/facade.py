@@ -0,0 +1,274 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import AsyncIterator, BinaryIO, Callable
+
+from src.logger import get_logger
+from src.services.storage.base import StorageBackend
+from src.services.storage.streaming import ChunkReader, EmptyUpload, UploadTimeout
+
+logger = get_logger("Storage")
+
+
+async def first_chunk(chunks: AsyncIterator[bytes]) -> bytes | None:
+    async for chunk in chunks:
+        if chunk:
+            return chunk
+    return None
+
+
+class StorageMetrics:
+    """
+    Per-operation totals of storage calls.
+
+    ``wait`` is the time a call spent waiting for a concurrency slot and a pool
+    thread, ``duration`` is the time the SDK call itself took.
+    """
+
+    def __init__(self):
+        self.operations: dict[str, dict[str, float]] = {}
+
+    def record(self, operation: str, wait: float, duration: float, status: str):
+        stats = self.operations.setdefault(
+            operation,
+            {
+                "calls": 0,
+                "errors": 0,
+                "timeouts": 0,
+                "wait_seconds": 0.0,
+                "wait_seconds_max": 0.0,
+                "duration_seconds": 0.0,
+                "duration_seconds_max": 0.0,
+            },
+        )
+        stats["calls"] += 1
+        if status == "error":
+            stats["errors"] += 1
+        elif status == "timeout":
+            stats["timeouts"] += 1
+        stats["wait_seconds"] += wait
+        stats["wait_seconds_max"] = max(stats["wait_seconds_max"], wait)
+        stats["duration_seconds"] += duration
+        stats["duration_seconds_max"] = max(stats["duration_seconds_max"], duration)
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        return {operation: dict(stats) for operation, stats in self.operations.items()}
+
+
+class AsyncStorage:
+    """
+    Async facade over a blocking :class:`StorageBackend`.
+
+    Calls run on a bounded thread pool so a slow upload does not block the event loop.
+    At most ``max_concurrency`` calls are in flight (running or queued for a thread),
+    and each call is abandoned after ``timeout`` seconds. An abandoned call keeps
+    its slot until its thread is done, so timeouts can't oversubscribe the pool.
+
+    Streamed uploads last as long as the client takes to send the body, they
+    run on their own pool of ``stream_workers`` threads so slow clients can't
+    hold the threads other calls need.
+
+    Attributes:
+        backend (StorageBackend): Storage the calls are made to.
+        timeout (float): Per-call timeout in seconds.
+        stream_timeout (float): Seconds a streamed upload waits for the next chunk.
+        metrics (StorageMetrics): Queue wait and call duration per operation.
+
+    Methods:
+        run(operation, func, *args, **kwargs):
+            Runs a blocking function on the storage pool.
+
+        upload_file(file, folder, public_id=None):
+            Uploads a file and returns the asset.
+
+        upload_stream(chunks, folder, max_size):
+            Uploads an async byte stream as it arrives, returns the asset with
+            its size and SHA-256.
+
+        delete_file(public_id):
+            Deletes an asset, returns True on success.
+
+        build_url(public_id, **options), transform_file(public_id, transformations):
+            Build asset URLs; these don't do I/O and run inline.
+    """
+
+    def __init__(
+        self,
+        backend: StorageBackend,
+        max_workers: int,
+        max_concurrency: int,
+        timeout: float,
+        stream_workers: int = 4,
+        stream_timeout: float = 30,
+    ):
+        self.backend = backend
+        self.timeout = timeout
+        self.stream_timeout = stream_timeout
+        self.metrics = StorageMetrics()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="storage"
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._stream_executor = ThreadPoolExecutor(
+            max_workers=stream_workers, thread_name_prefix="storage-stream"
+        )
+        # Streams queue here, in the event loop, not for a thread
+        self._stream_semaphore = asyncio.Semaphore(stream_workers)
+
+    async def run(self, operation: str, func: Callable, *args, **kwargs):
+        return await self._run(operation, partial(func, *args, **kwargs), self.timeout)
+
+    async def _run(
+        self,
+        operation: str,
+        func: Callable,
+        timeout: float | None,
+        executor: ThreadPoolExecutor | None = None,
+        semaphore: asyncio.Semaphore | None = None,
+        cleanup: Callable | None = None,
+    ):
+        # cleanup is called on the pool thread with the result of a call that
+        # returns after the caller stopped waiting for it
+        semaphore = semaphore or self._semaphore
+        queued_at = time.perf_counter()
+        timings = {}
+        lock = threading.Lock()
+        state = {"finished": False, "abandoned": False}
+
+        def call():
+            started_at = time.perf_counter()
+            timings["wait"] = started_at - queued_at
+            try:
+                result = func()
+            finally:
+                timings["duration"] = time.perf_counter() - started_at
+            with lock:
+                state["finished"] = True
+                abandoned = state["abandoned"]
+            if abandoned and cleanup is not None:
+                try:
+                    cleanup(result)
+                except Exception as e:
+                    logger.error(f"Storage {operation} cleanup failed: {e}")
+            return result
+
+        loop = asyncio.get_running_loop()
+
+        def release(_):
+            try:
+                loop.call_soon_threadsafe(semaphore.release)
+            except RuntimeError:
+                # Event loop already closed
+                pass
+
+        status = "ok"
+        try:
+            await semaphore.acquire()
+            try:
+                future = (executor or self._executor).submit(call)
+            except BaseException:
+                semaphore.release()
+                raise
+            # The slot is released when the thread is done, not when we stop waiting
+            future.add_done_callback(release)
+            try:
+                return await asyncio.wait_for(
+                    asyncio.shield(asyncio.wrap_future(future)), timeout
+                )
+            except (TimeoutError, asyncio.CancelledError) as e:
+                with lock:
+                    state["abandoned"] = not state["finished"]
+                if isinstance(e, TimeoutError) and not state["abandoned"]:
+                    # Returned just as the timeout fired
+                    return await asyncio.wrap_future(future)
+                # Drops the call if it is still queued for a thread
+                future.cancel()
+                raise
+        except TimeoutError:
+            status = "timeout"
+            logger.error(f"Storage {operation} timed out after {timeout}s")
+            raise
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            wait = timings.get("wait", time.perf_counter() - queued_at)
+            self.metrics.record(operation, wait, timings.get("duration", 0.0), status)
+
+    async def upload_file(
+        self, file: BinaryIO | str, folder: str, public_id: str = None
+    ) -> dict:
+        # An upload that finishes after its timeout is deleted if it got a new
+        # id; under a given id it may have replaced an asset in use, so it's kept
+        if public_id is None:
+            cleanup = self._delete_late_upload
+        else:
+            cleanup = self._log_late_upload
+        return await self._run(
+            "upload_file",
+            partial(self.backend.upload_file, file, folder, public_id),
+            self.timeout,
+            cleanup=cleanup,
+        )
+
+    def _delete_late_upload(self, asset: dict):
+        logger.warning(f"Deleting {asset['public_id']}, uploaded after its timeout")
+        self.backend.delete_file(asset["public_id"])
+
+    def _log_late_upload(self, asset: dict):
+        logger.warning(f"{asset['public_id']} was uploaded after its timeout")
+
+    async def upload_stream(
+        self, chunks: AsyncIterator[bytes], folder: str, max_size: int
+    ) -> dict:
+        """
+        :raises EmptyUpload: if the stream ends before any data.
+        :raises UploadTooLarge: if the stream exceeds ``max_size``.
+        :raises UploadTimeout: if the client sends nothing for ``stream_timeout``.
+        """
+        # The first chunk is awaited here, a client that never sends one
+        # doesn't take a stream thread
+        try:
+            first = await asyncio.wait_for(first_chunk(chunks), self.stream_timeout)
+        except TimeoutError:
+            raise UploadTimeout(f"No data for {self.stream_timeout}s") from None
+        if first is None:
+            raise EmptyUpload("Empty upload")
+
+        async def body():
+            yield first
+            async for chunk in chunks:
+                yield chunk
+
+        reader = ChunkReader(
+            body(), asyncio.get_running_loop(), max_size, timeout=self.stream_timeout
+        )
+        try:
+            asset = await self._run(
+                "upload_stream",
+                partial(self.backend.upload_stream, reader, folder),
+                timeout=None,
+                executor=self._stream_executor,
+                semaphore=self._stream_semaphore,
+            )
+        finally:
+            reader.close()
+        return {**asset, "bytes": reader.size, "sha256": reader.sha256}
+
+    async def delete_file(self, public_id: str) -> bool:
+        return await self.run(
+            "delete_file", self.backend.delete_file, public_id=public_id
+        )
+
+    def build_url(self, public_id: str, **options) -> str:
+        return self.backend.build_url(public_id, **options)
+
+    def transform_file(self, public_id: str, transformations: dict) -> str | None:
+        return self.backend.transform_file(public_id, transformations)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._stream_executor.shutdown(wait=False, cancel_futures=True)
+
@@ -0,0 +1,141 @@
+import hashlib
+import os
+import secrets
+import tempfile
+import urllib.request
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO
+
+from src.services.storage.base import StorageBackend
+
+CHUNK_SIZE = 1024 * 1024
+
+# Magic numbers of the image formats the app accepts
+SIGNATURES = (
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"GIF87a", ".gif"),
+    (b"GIF89a", ".gif"),
+    (b"BM", ".bmp"),
+)
+
+
+def guess_extension(head: bytes) -> str:
+    """
+    Guess the file extension from the first bytes of a file.
+
+    :param head: first bytes of the file
+    :type head: bytes
+    :return: extension with the leading dot, empty if unknown
+    :rtype: str
+    """
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    for signature, extension in SIGNATURES:
+        if head.startswith(signature):
+            return extension
+    if head.lstrip().startswith((b"<svg", b"<?xml")):
+        return ".svg"
+    return ""
+
+
+class LocalStorage(StorageBackend):
+    """
+    Assets stored on local disk under ``<folder>/<sha256[:2]>/<sha256>-<nonce><ext>``.
+    Every upload gets its own file, deleting one asset never affects another;
+    identical content is deduplicated by the callers, which track who uses an
+    asset (see ``photo_service.store_photo_file``).
+
+    Files are served by a ``StaticFiles`` mount at ``base_url`` (see ``src.main``).
+    Resizing and transformations are not supported, URLs point at the original file.
+
+    Attributes:
+        root (Path): Directory holding the assets.
+        base_url (str): URL prefix the directory is served under.
+    """
+
+    def __init__(self, root: str | Path, base_url: str):
+        self.root = Path(root).resolve()
+        self.base_url = base_url.rstrip("/")
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def get_path(self, public_id: str) -> Path:
+        path = (self.root / public_id).resolve()
+        if not path.is_relative_to(self.root):
+            raise ValueError(f"Invalid public id: {public_id}")
+        return path
+
+    def get_url(self, public_id: str) -> str:
+        return f"{self.base_url}/{public_id}"
+
+    def open(self, file: BinaryIO | str) -> BinaryIO:
+        if not isinstance(file, str):
+            return file
+        if file.startswith(self.base_url + "/"):
+            return self.get_path(file[len(self.base_url) + 1 :]).open("rb")
+        if file.startswith(("http://", "https://")):
+            return urllib.request.urlopen(file)
+        return open(file, "rb")
+
+    def upload_file(
+        self, file: BinaryIO | str, folder: str, public_id: str = None
+    ) -> dict:
+        # public_id is ignored: the name is derived from the content
+        folder = str(PurePosixPath(folder))
+        staging = self.root / ".tmp"
+        staging.mkdir(exist_ok=True)
+
+        digest = hashlib.sha256()
+        head = b""
+        size = 0
+        source = self.open(file)
+        target = None
+        try:
+            with tempfile.NamedTemporaryFile(dir=staging, delete=False) as target:
+                while chunk := source.read(CHUNK_SIZE):
+                    if len(head) < 16:
+                        head += chunk[:16]
+                    digest.update(chunk)
+                    target.write(chunk)
+                    size += len(chunk)
+        except Exception:
+            if target is not None:
+                os.unlink(target.name)
+            raise
+        finally:
+            if source is not file:
+                source.close()
+
+        sha256 = digest.hexdigest()
+        name = f"{sha256}-{secrets.token_hex(4)}{guess_extension(head)}"
+        public_id = f"{folder}/{sha256[:2]}/{name}"
+        path = self.get_path(public_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(target.name, path)
+
+        return {
+            "public_id": public_id,
+            "secure_url": self.get_url(public_id),
+            "folder": folder,
+            "original_filename": sha256,
+            "bytes": size,
+            "etag": sha256,
+        }
+
+    def delete_file(self, public_id: str) -> bool:
+        try:
+            self.get_path(public_id).unlink()
+        except (FileNotFoundError, ValueError):
+            return False
+        return True
+
+    def build_url(
+        self, public_id: str, width: int = 300, height: int = 300, crop: str = "fill"
+    ) -> str:
+        return self.get_url(public_id)
+
+    def transform_file(self, public_id: str, transformations: dict) -> str | None:
+        if not self.get_path(public_id).exists():
+            return None
+        return self.get_url(public_id)
+
@@ -0,0 +1,100 @@
+import asyncio
+import hashlib
+from typing import AsyncIterator
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+class EmptyUpload(ValueError):
+    pass
+
+
+class UploadTimeout(ValueError):
+    pass
+
+
+class ChunkReader:
+    """
+    Blocking file-like view of an async byte stream, e.g. ``request.stream()``,
+    for backends running on the storage thread pool.
+
+    Each ``read`` pulls chunks from the event loop on demand, so at most one
+    incoming chunk plus the requested size is held in memory. The SHA-256 and
+    size of the data are computed as it is read.
+
+    Attributes:
+        max_size (int): Reading past this many bytes raises :class:`UploadTooLarge`.
+        timeout (float): Seconds to wait for the next chunk from the client,
+            :class:`UploadTimeout` after that.
+        size (int): Bytes read so far.
+        sha256 (str): Hex digest of the data, set once the stream is exhausted.
+    """
+
+    name = "stream"
+
+    def __init__(
+        self,
+        chunks: AsyncIterator[bytes],
+        loop: asyncio.AbstractEventLoop,
+        max_size: int,
+        timeout: float,
+    ):
+        self.chunks = chunks
+        self.loop = loop
+        self.max_size = max_size
+        self.timeout = timeout
+        self.size = 0
+        self.sha256 = None
+        self.closed = False
+        self._digest = hashlib.sha256()
+        self._buffer = bytearray()
+        self._eof = False
+
+    async def _next_chunk(self) -> bytes | None:
+        try:
+            return await anext(self.chunks)
+        except StopAsyncIteration:
+            return None
+
+    def _fill(self, size: int):
+        while not self._eof and (size < 0 or len(self._buffer) < size):
+            if self.closed:
+                raise ValueError("I/O operation on closed stream")
+            future = asyncio.run_coroutine_threadsafe(self._next_chunk(), self.loop)
+            try:
+                chunk = future.result(self.timeout)
+            except TimeoutError:
+                # Stop waiting on the client in the event loop too
+                future.cancel()
+                raise UploadTimeout(f"No data for {self.timeout}s") from None
+            if chunk is None:
+                self._eof = True
+                self.sha256 = self._digest.hexdigest()
+                break
+            self.size += len(chunk)
+            if self.size > self.max_size:
+                raise UploadTooLarge(f"Upload exceeds {self.max_size} bytes")
+            self._digest.update(chunk)
+            self._buffer += chunk
+
+    def read(self, size: int = -1) -> bytes:
+        self._fill(size)
+        if size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    def readable(self) -> bool:
+        return True
+
+    def close(self):
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
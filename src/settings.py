@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -8,11 +10,46 @@ class Settings(BaseSettings):
     postgres_db_name: str = "photo_share"
     postgres_domain: str = "localhost"
     postgres_port: str = "5432"
+    db_replica_url: str = ""
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_pool_use_lifo: bool = False
+
+    # SEARCH
+    search_config: str = "simple"
+    photos_count_estimate_threshold: int = 10000
+
+    # LOGGING
+    log_json: bool = False
+    log_error_burst: int = 10
+    log_error_window: float = 60
+
+    # INSTRUMENTATION
+    slow_request_queries: int = 20
+    slow_request_ms: float = 1000
+
+    # COMPRESSION
+    compression_min_size: int = 1024
+    compression_inline_max_size: int = 64 * 1024
+    compression_max_concurrency: int = 4
+    compression_workers: int = 2
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    compression_zstd_level: int = 3
 
     # JWT
     secret_key: str
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 60
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 4
+
+    # CACHE
+    user_cache_size: int = 1024
+    user_cache_ttl: float = 60
 
     # REDIS
     # redis_host: str = "localhost"
@@ -20,11 +57,36 @@ class Settings(BaseSettings):
     # redis_db: int = 0
 
     # CLOUDINARY
-    cloudinary_name: str
-    cloudinary_api_key: str
-    cloudinary_api_secret: str
+    cloudinary_name: str = ""
+    cloudinary_api_key: str = ""
+    cloudinary_api_secret: str = ""
     cloudinary_folder: str = ""
 
+    # STORAGE
+    storage_backend: Literal["cloudinary", "local"] = "cloudinary"
+    storage_local_root: str = "media"
+    storage_local_url: str = "/media"
+    storage_max_workers: int = 8
+    storage_max_concurrency: int = 32
+    storage_timeout: float = 60
+    # Streamed uploads have their own threads, and give up on a client that
+    # sends nothing for storage_stream_timeout seconds
+    storage_stream_workers: int = 4
+    storage_stream_timeout: float = 30
+    # Cloudinary's chunked uploads need chunks of at least 5 MB
+    storage_chunk_size: int = 6 * 1024 * 1024
+
+    # UPLOADS
+    upload_max_size: int = 50 * 1024 * 1024
+    upload_staging_dir: str = "uploads"
+    upload_session_ttl: int = 24 * 60 * 60
+    upload_purge_interval: int = 60 * 60
+    bulk_upload_max_files: int = 50
+    bulk_upload_concurrency: int = 4
+    similar_max_distance: int = 10
+    # Seconds between reads of the photos other workers changed
+    similar_refresh_interval: float = 5
+
     @staticmethod
     def get_db_uri():
         return f"postgresql+asyncpg://{settings.postgres_user}:{settings.postgres_password}@{settings.postgres_domain}:{settings.postgres_port}/{settings.postgres_db_name}"
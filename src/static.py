@@ -0,0 +1,164 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import sys
+from pathlib import Path
+
+import brotli
+from starlette.datastructures import Headers
+from starlette.requests import Request
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# Text formats worth compressing, images and fonts are already compressed
+COMPRESSIBLE = {".js", ".mjs", ".css", ".html", ".json", ".map", ".svg", ".txt", ".ico"}
+MIN_SIZE = 1024
+
+# Variants in order of preference: (Content-Encoding, file suffix)
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _compress_file(path: Path, suffix: str, compress) -> bool:
+    target = path.with_name(path.name + suffix)
+    if target.exists() and target.stat().st_mtime >= path.stat().st_mtime:
+        return False
+
+    data = compress(path.read_bytes())
+    tmp = target.with_name(target.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, target)
+    return True
+
+
+def precompress(directory: str | Path, min_size: int = MIN_SIZE) -> int:
+    """
+    Write ``.br`` and ``.gz`` variants next to the compressible files of a
+    directory, skipping variants that are newer than their source.
+
+    Run at build time with ``python -m src.static <directory>`` or at startup.
+
+    :param directory: directory to walk
+    :type directory: str | Path
+    :param min_size: smaller files are served as is
+    :type min_size: int
+    :return: number of variants written
+    :rtype: int
+    """
+    compressors = (
+        (".br", lambda data: brotli.compress(data, quality=11)),
+        (".gz", lambda data: gzip.compress(data, 9, mtime=0)),
+    )
+
+    written = 0
+    for path in Path(directory).rglob("*"):
+        if (
+            not path.is_file()
+            or path.suffix not in COMPRESSIBLE
+            or path.stat().st_size < min_size
+        ):
+            continue
+        for suffix, compress in compressors:
+            written += _compress_file(path, suffix, compress)
+    return written
+
+
+def accepted_encodings(headers: Headers) -> set[str]:
+    accepted = set()
+    for item in headers.get("accept-encoding", "").split(","):
+        coding, _, params = item.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    ``StaticFiles`` serving the ``.br``/``.gz`` variant of a file written by
+    :func:`precompress` when the client accepts it.
+
+    Attributes:
+        immutable (bool): Mark responses cacheable for a year, for file names
+            that contain a content hash.
+    """
+
+    def __init__(self, *args, immutable: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.immutable = immutable
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        accepted = accepted_encodings(request_headers)
+
+        response = None
+        for encoding, suffix in ENCODINGS:
+            if encoding not in accepted:
+                continue
+            try:
+                variant_stat = os.stat(str(full_path) + suffix)
+            except OSError:
+                continue
+            response = FileResponse(
+                str(full_path) + suffix,
+                status_code=status_code,
+                stat_result=variant_stat,
+                # content type of the original file, not application/gzip
+                media_type=mimetypes.guess_type(str(full_path))[0] or "text/plain",
+                headers={"Content-Encoding": encoding},
+            )
+            break
+
+        if response is None:
+            response = FileResponse(
+                full_path, status_code=status_code, stat_result=stat_result
+            )
+        if Path(full_path).suffix in COMPRESSIBLE:
+            response.headers["Vary"] = "Accept-Encoding"
+        if self.immutable:
+            response.headers["Cache-Control"] = IMMUTABLE
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+class CachedPage:
+    """
+    HTML page read once and served with a content-hash ``ETag``, answering
+    ``304 Not Modified`` to requests that already have it.
+
+    ``Cache-Control: no-cache`` makes browsers revalidate on every load, so a
+    new deploy is picked up immediately while unchanged pages cost no body.
+
+    Attributes:
+        path (Path): File the page is read from.
+        content (bytes): Page body.
+        etag (str): Quoted SHA-256 prefix of the body.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.content = self.path.read_bytes()
+        self.etag = f'"{hashlib.sha256(self.content).hexdigest()[:32]}"'
+        self.headers = {"ETag": self.etag, "Cache-Control": "no-cache"}
+
+    def response(self, request: Request) -> Response:
+        if_none_match = request.headers.get("if-none-match", "")
+        if self.etag in [tag.strip(" W/") for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers=self.headers)
+        return Response(self.content, media_type="text/html", headers=self.headers)
+
+
+if __name__ == "__main__":
+    for directory in sys.argv[1:] or [Path(__file__).parent / "dist"]:
+        print(f"{directory}: {precompress(directory)} files written")
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database import get_db
+from src.database import get_db, get_read_db
 from src.logger import get_logger
 from src.tags.dependencies import allowed_create_tag, allowed_delete_tag
 from src.tags.schemas import TagResponseSchema, TagSchema, TagsResponseSchema
@@ -16,7 +16,9 @@ router = APIRouter(
 
 
 @router.get("/", response_model=TagsResponseSchema, status_code=status.HTTP_200_OK)
-async def get_tags_handler(response: Response, db: AsyncSession = Depends(get_db)):
+async def get_tags_handler(
+    response: Response, db: AsyncSession = Depends(get_read_db)
+):
 
     try:
         tags = await get_tags(db)
@@ -1,7 +1,10 @@
-from sqlalchemy import select
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.tags.models import Tag
+from src.photos.services.search_service import get_search_backend
+from src.photos.models import Photo
+from src.tags.models import PhotoToTag, Tag
 
 
 async def get_tags(db: AsyncSession) -> list[Tag]:
@@ -16,6 +19,47 @@ async def get_tags(db: AsyncSession) -> list[Tag]:
     return list(result.scalars().all())
 
 
+async def resolve_tags(names: list[str], db: AsyncSession) -> list[Tag]:
+    """
+    Get the tags with the given names, creating the missing ones.
+
+    Takes at most three queries whatever the number of names: one select of the
+    existing tags, one ``INSERT ... ON CONFLICT DO NOTHING RETURNING`` of the missing
+    ones and, if a concurrent request created some of them first, one more select.
+
+    :param names: tag names, duplicates are ignored
+    :type names: list[str]
+    :param db: Database session dependency.
+    :type db: AsyncSession
+    :return: tags in the order of ``names``
+    :rtype: list[Tag]
+    """
+    names = list(dict.fromkeys(name for name in names if name))
+    if not names:
+        return []
+
+    result = await db.execute(select(Tag).where(Tag.name.in_(names)))
+    tags = {tag.name: tag for tag in result.scalars()}
+
+    missing = [name for name in names if name not in tags]
+    if missing:
+        dialect = sqlite if db.get_bind().dialect.name == "sqlite" else postgresql
+        result = await db.execute(
+            dialect.insert(Tag)
+            .values([{"name": name} for name in missing])
+            .on_conflict_do_nothing(index_elements=[Tag.name])
+            .returning(Tag)
+        )
+        tags.update((tag.name, tag) for tag in result.scalars())
+
+        raced = [name for name in missing if name not in tags]
+        if raced:
+            result = await db.execute(select(Tag).where(Tag.name.in_(raced)))
+            tags.update((tag.name, tag) for tag in result.scalars())
+
+    return [tags[name] for name in names]
+
+
 async def create_tag(name:str, db: AsyncSession) -> Tag:
     """
     Create a new tag.
@@ -51,6 +95,20 @@ async def delete_tag(tag_id: int, db: AsyncSession) -> Tag | None:
     if not tag:
         return None
 
+    result = await db.execute(
+        select(PhotoToTag.photo_id).filter(PhotoToTag.tag_id == tag_id)
+    )
+    photo_ids = list(result.scalars().all())
+
     await db.delete(tag)
+    await db.flush()
+    await get_search_backend(db).index(db, photo_ids)
+    # Bump the photos' ETags, photo_service.touch_photos imports this module
+    await db.execute(
+        update(Photo)
+        .where(Photo.id.in_(photo_ids))
+        .values(updated_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
     await db.commit()
     return tag
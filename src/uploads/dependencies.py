@@ -0,0 +1,24 @@
+from fastapi import Depends, HTTPException, status
+
+from src.database import get_db
+from src.dependencies import get_current_user
+from src.uploads.models import UploadSession
+from src.uploads.service import get_session
+from src.user.models import User
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def get_upload_session(
+    session_id: int,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> UploadSession:
+
+    session = await get_session(session_id, db, user)
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found"
+        )
+
+    return session
@@ -0,0 +1,33 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.models import Base
+
+
+class UploadSession(Base):
+    """
+    A resumable upload: the original is staged on local disk (see
+    ``src.uploads.service.get_staging_path``) until ``received`` reaches ``size``.
+    """
+
+    __tablename__ = "upload_sessions"
+    __table_args__ = (Index("ix_upload_sessions_expires_at", "expires_at"),)
+    owner_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE", onupdate="CASCADE")
+    )
+    title: Mapped[str] = mapped_column(String(255))
+    description: Mapped[str] = mapped_column(String(255))
+    tags: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    size: Mapped[int] = mapped_column(BigInteger)
+    # Bytes received from the start of the file, uploads resume from here
+    received: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
+    expires_at: Mapped[datetime] = mapped_column(DateTime)
+    # Set on finalize, a repeated finalize returns the same photo
+    photo_id: Mapped[int | None] = mapped_column(
+        ForeignKey("photos.id", ondelete="SET NULL"), nullable=True
+    )
+
+    def __repr__(self):
+        return f"UploadSession(id={self.id}, received={self.received}/{self.size})"
@@ -0,0 +1,195 @@
+import re
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database import get_db
+from src.dependencies import get_current_user
+from src.logger import get_logger
+from src.photos.schemas import PhotoResponseSchema
+from src.services.storage.streaming import UploadTooLarge
+from src.settings import settings
+from src.uploads.dependencies import get_upload_session
+from src.uploads.models import UploadSession
+from src.uploads.schemas import UploadSessionCreateSchema, UploadSessionResponseSchema
+from src.uploads.service import (
+    create_session,
+    delete_session,
+    finalize_session,
+    write_chunk,
+)
+from src.user.models import User
+
+logger = get_logger("Uploads")
+
+router = APIRouter(
+    prefix="/uploads",
+    tags=["Uploads"],
+)
+
+content_range_pattern = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+
+@router.post(
+    "/",
+    status_code=status.HTTP_201_CREATED,
+    response_model=UploadSessionResponseSchema,
+)
+async def create_upload_handler(
+    response: Response,
+    body: UploadSessionCreateSchema,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Start a resumable upload. Send the file with ``PUT /uploads/{id}`` in one or
+    more ``Content-Range: bytes <start>-<end>/<size>`` requests, resume from
+    ``received`` after a failure, then ``POST /uploads/{id}/finalize``.
+    """
+    if body.size > settings.upload_max_size:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="File too large",
+        )
+
+    try:
+        session = await create_session(
+            title=body.title,
+            description=body.description,
+            tags=body.tags,
+            size=body.size,
+            db=db,
+            current_user=current_user,
+        )
+        return {"data": session}
+    except Exception as e:
+        logger.error(e)
+        response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+        return {
+            "status": "error",
+            "message": "An error occurred while creating the upload!",
+        }
+
+
+@router.get(
+    "/{session_id}",
+    status_code=status.HTTP_200_OK,
+    response_model=UploadSessionResponseSchema,
+)
+async def get_upload_handler(session: UploadSession = Depends(get_upload_session)):
+    return {"data": session}
+
+
+@router.put(
+    "/{session_id}",
+    status_code=status.HTTP_200_OK,
+    response_model=UploadSessionResponseSchema,
+)
+async def put_chunk_handler(
+    request: Request,
+    response: Response,
+    content_range: str = Header(),
+    session: UploadSession = Depends(get_upload_session),
+    db: AsyncSession = Depends(get_db),
+):
+    match = content_range_pattern.match(content_range)
+    if not match:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid Content-Range"
+        )
+    start, end, size = (int(value) for value in match.groups())
+    if start > end or end >= size or size != session.size:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Content-Range doesn't match the upload",
+        )
+    if session.photo_id is not None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="Upload already finalized"
+        )
+    if start > session.received:
+        # A gap would leave unwritten bytes, resume from `received`
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Expected a range starting at or before {session.received}",
+        )
+
+    try:
+        session = await write_chunk(
+            session,
+            start=start,
+            length=end - start + 1,
+            chunks=request.stream(),
+            db=db,
+        )
+        return {"data": session}
+    except UploadTooLarge:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Body is longer than the Content-Range",
+        )
+    except Exception as e:
+        logger.error(e)
+        response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+        return {
+            "status": "error",
+            "message": "An error occurred while saving the chunk!",
+        }
+
+
+@router.post(
+    "/{session_id}/finalize",
+    status_code=status.HTTP_201_CREATED,
+    response_model=PhotoResponseSchema,
+)
+async def finalize_upload_handler(
+    response: Response,
+    session: UploadSession = Depends(get_upload_session),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    if session.received < session.size:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Upload incomplete: {session.received} of {session.size} bytes",
+        )
+
+    try:
+        photo = await finalize_session(session, db, current_user)
+        if not photo:
+            response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+            return {
+                "status": "error",
+                "message": "An error occurred while creating the photo!",
+            }
+
+        return {"data": photo}
+    except Exception as e:
+        logger.error(e)
+        response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+        return {
+            "status": "error",
+            "message": "An error occurred while creating the photo!",
+        }
+
+
+@router.delete(
+    "/{session_id}",
+    status_code=status.HTTP_200_OK,
+    response_model=UploadSessionResponseSchema,
+)
+async def delete_upload_handler(
+    response: Response,
+    session: UploadSession = Depends(get_upload_session),
+    db: AsyncSession = Depends(get_db),
+):
+    try:
+        session = await delete_session(session, db)
+        return {"data": session}
+    except Exception as e:
+        logger.error(e)
+        response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+        return {
+            "status": "error",
+            "message": "An error occurred while deleting the upload!",
+        }
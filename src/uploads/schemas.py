@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from src.schemas import ResponseModel
+
+
+class UploadSessionCreateSchema(BaseModel):
+    title: str = Field(max_length=255)
+    description: str = Field(max_length=255)
+    tags: str | None = Field(default=None, max_length=255)
+    size: int = Field(gt=0)
+
+
+class UploadSessionSchema(BaseModel):
+    id: int
+    title: str
+    description: str
+    tags: str | None = None
+    size: int
+    received: int
+    expires_at: datetime
+    photo_id: int | None = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class UploadSessionResponseSchema(ResponseModel):
+    data: UploadSessionSchema = None
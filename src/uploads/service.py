@@ -0,0 +1,272 @@
+import asyncio
+import os
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import AsyncIterator
+
+from sqlalchemy import case, delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.logger import get_logger
+from src.photos.models import Photo
+from src.photos.services.photo_service import create_photo
+from src.services.storage.streaming import UploadTooLarge
+from src.settings import settings
+from src.uploads.models import UploadSession
+from src.user.models import User
+
+logger = get_logger("Uploads")
+
+# Incoming chunks are gathered up to this size before a disk write
+WRITE_SIZE = 1024 * 1024
+
+
+def get_staging_path(session_id: int) -> Path:
+    return Path(settings.upload_staging_dir) / f"{session_id}.part"
+
+
+def _utcnow() -> datetime:
+    # Timestamps are stored naive, in UTC
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+def _write_at(fd: int, data: bytes, offset: int):
+    # pwrite doesn't move a shared file position, concurrent requests for
+    # the same session can't interleave a seek and a write
+    while data:
+        written = os.pwrite(fd, data, offset)
+        data = data[written:]
+        offset += written
+
+
+def _unlink(path: Path):
+    path.unlink(missing_ok=True)
+
+
+async def purge_expired_sessions(db: AsyncSession):
+    """
+    Delete expired sessions and their staged files.
+
+    :param db: Database session dependency.
+    :type db: AsyncSession
+    """
+    result = await db.execute(
+        delete(UploadSession)
+        .where(UploadSession.expires_at < _utcnow())
+        .returning(UploadSession.id)
+    )
+    for session_id in result.scalars().all():
+        await asyncio.to_thread(_unlink, get_staging_path(session_id))
+
+
+async def purge_periodically(
+    session_factory: async_sessionmaker[AsyncSession], interval: float
+):
+    """
+    Run :func:`purge_expired_sessions` every ``interval`` seconds, so staged
+    files of abandoned uploads don't pile up on a server nobody uploads to.
+    Runs until cancelled.
+    """
+    while True:
+        try:
+            async with session_factory() as db:
+                await purge_expired_sessions(db)
+                await db.commit()
+        except Exception as e:
+            logger.error(e)
+        await asyncio.sleep(interval)
+
+
+async def create_session(
+    *,
+    title: str,
+    description: str,
+    tags: str | None,
+    size: int,
+    db: AsyncSession,
+    current_user: User,
+) -> UploadSession:
+    """
+    Start a resumable upload of a ``size`` bytes original.
+
+    :param size: Size of the file in bytes.
+    :type size: int
+    :param db: Database session dependency.
+    :type db: AsyncSession
+    :param current_user: Owner of the upload.
+    :type current_user: User
+    :return: The new session, expiring after ``settings.upload_session_ttl`` seconds.
+    :rtype: UploadSession
+    """
+    await purge_expired_sessions(db)
+
+    session = UploadSession(
+        owner_id=current_user.id,
+        title=title,
+        description=description,
+        tags=tags,
+        size=size,
+        received=0,
+        expires_at=_utcnow() + timedelta(seconds=settings.upload_session_ttl),
+    )
+    db.add(session)
+    await db.flush()
+
+    path = get_staging_path(session.id)
+    await asyncio.to_thread(path.parent.mkdir, parents=True, exist_ok=True)
+    await asyncio.to_thread(path.touch)
+
+    await db.commit()
+    await db.refresh(session)
+    return session
+
+
+async def get_session(
+    session_id: int, db: AsyncSession, current_user: User
+) -> UploadSession | None:
+    """
+    Get an unexpired upload session of the current user.
+
+    :return: The session, None if it doesn't exist, expired or belongs to someone else.
+    :rtype: UploadSession | None
+    """
+    result = await db.execute(
+        select(UploadSession).where(
+            UploadSession.id == session_id,
+            UploadSession.owner_id == current_user.id,
+            UploadSession.expires_at >= _utcnow(),
+        )
+    )
+    return result.scalar_one_or_none()
+
+
+async def write_chunk(
+    session: UploadSession,
+    start: int,
+    length: int,
+    chunks: AsyncIterator[bytes],
+    db: AsyncSession,
+) -> UploadSession:
+    """
+    Write the bytes of a ``Content-Range`` at ``start`` in the staged file.
+
+    ``start`` must not be past ``session.received``. If the client disconnects
+    midway, the bytes that arrived still count, so the retry only sends the rest.
+
+    :param session: Upload session.
+    :type session: UploadSession
+    :param start: Offset of the first byte.
+    :type start: int
+    :param length: Announced number of bytes.
+    :type length: int
+    :param chunks: Request body chunks.
+    :type chunks: AsyncIterator[bytes]
+    :param db: Database session dependency.
+    :type db: AsyncSession
+    :return: The session with the new ``received`` offset.
+    :rtype: UploadSession
+    :raises UploadTooLarge: if the body is longer than ``length``.
+    """
+    fd = await asyncio.to_thread(os.open, get_staging_path(session.id), os.O_WRONLY)
+    offset = start
+    buffer = bytearray()
+    try:
+        async for chunk in chunks:
+            if offset + len(buffer) + len(chunk) > start + length:
+                raise UploadTooLarge("Body is longer than the Content-Range")
+            buffer += chunk
+            if len(buffer) >= WRITE_SIZE:
+                await asyncio.to_thread(_write_at, fd, bytes(buffer), offset)
+                offset += len(buffer)
+                buffer.clear()
+        await asyncio.to_thread(_write_at, fd, bytes(buffer), offset)
+        offset += len(buffer)
+    finally:
+        await asyncio.to_thread(os.close, fd)
+        if offset > start:
+            # Only extends a contiguous prefix, concurrent requests can't move it back
+            await db.execute(
+                update(UploadSession)
+                .where(
+                    UploadSession.id == session.id,
+                    UploadSession.received >= start,
+                )
+                .values(
+                    received=case(
+                        (UploadSession.received < offset, offset),
+                        else_=UploadSession.received,
+                    )
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+
+    await db.refresh(session)
+    return session
+
+
+async def finalize_session(
+    session: UploadSession, db: AsyncSession, current_user: User
+) -> Photo | None:
+    """
+    Create the photo from a complete upload with :func:`create_photo` and drop
+    the staged file. Finalizing a session again returns the same photo.
+
+    The session row is locked first, concurrent finalize calls wait and
+    return the photo of the first one. The photo and ``photo_id`` are
+    committed together, a failure leaves neither.
+
+    :param session: Upload session with ``received == size``.
+    :type session: UploadSession
+    :param db: Database session dependency.
+    :type db: AsyncSession
+    :param current_user: Owner of the upload.
+    :type current_user: User
+    :return: The photo.
+    :rtype: Photo | None
+    """
+    result = await db.execute(
+        select(UploadSession)
+        .where(UploadSession.id == session.id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    session = result.scalar_one()
+    if session.photo_id is not None:
+        result = await db.execute(select(Photo).where(Photo.id == session.photo_id))
+        photo = result.scalar_one_or_none()
+        await db.commit()
+        return photo
+
+    path = get_staging_path(session.id)
+    file = await asyncio.to_thread(open, path, "rb")
+    try:
+        photo = await create_photo(
+            title=session.title,
+            file=file,
+            description=session.description,
+            tags=[tag.strip() for tag in session.tags.split(",")] if session.tags else [],
+            db=db,
+            current_user=current_user,
+            commit=False,
+        )
+        session.photo_id = photo.id
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    finally:
+        await asyncio.to_thread(file.close)
+
+    await asyncio.to_thread(_unlink, path)
+    return photo
+
+
+async def delete_session(session: UploadSession, db: AsyncSession) -> UploadSession:
+    """
+    Abort an upload and drop its staged file.
+    """
+    await db.delete(session)
+    await db.commit()
+    await asyncio.to_thread(_unlink, get_staging_path(session.id))
+    return session
@@ -1,6 +1,6 @@
 import enum
 
-from sqlalchemy import Enum, String
+from sqlalchemy import Enum, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.models import Base
@@ -14,6 +14,7 @@ class Role(enum.Enum):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (Index("ix_users_created_at_id", "created_at", "id"),)
     role: Mapped[Enum] = mapped_column(Enum(Role), default=Role.USER)
     username: Mapped[str] = mapped_column(String(25))
     email: Mapped[str] = mapped_column(String, nullable=False, unique=True)
@@ -21,6 +22,11 @@ class User(Base):
     refresh_token: Mapped[str] = mapped_column(String, nullable=True)
     avatar: Mapped[str] = mapped_column(String(255), nullable=True)
     blocked: Mapped[bool] = mapped_column(default=False)
+    # Activity counters, maintained by src.user.service.update_user_stats
+    count_photos: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    count_comments: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0"
+    )
 
     def __repr__(self):
         return f"User(name={self.username}, role={self.role})"
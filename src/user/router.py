@@ -7,6 +7,7 @@ from fastapi import (
     File,
     Form,
     HTTPException,
+    Query,
     Response,
     UploadFile,
     status,
@@ -14,12 +15,13 @@ from fastapi import (
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.comments.schemas import CommentsResponseSchema
-from src.database import get_db
+from src.database import get_db, get_read_db
 from src.dependencies import allowed_all, get_current_user
+from src.pagination import decode_cursor
 from src.photos.schemas import PhotosResponseSchema
 from src.schemas import ResponseModel
 from src.services.authentication import auth_service
-from src.services.cloudinary_utils import build_url, upload_file
+from src.services.storage import storage
 from src.user import service as users
 from src.user.models import Role, User
 from src.user.schemas import (
@@ -104,8 +106,8 @@ async def update_avatar(
     """
 
     try:
-        avatar = upload_file(file.file, "user_avatar", user.email)
-        avatar_url = build_url(avatar.get("public_id"))
+        avatar = await storage.upload_file(file.file, "user_avatar", user.email)
+        avatar_url = storage.build_url(avatar.get("public_id"))
         result = await users.update_avatar_url(user.email, avatar_url, db)
     except Exception as e:
         return {"status": "error", "message": str(e)}
@@ -139,7 +141,7 @@ async def reset_password(
     try:
         if body.new_password != body.confirm_password:
             raise HTTPException(status_code=400, detail="Passwords don't match")
-        hashed_password = auth_service.get_password_hash(body.new_password)
+        hashed_password = await auth_service.get_password_hash(body.new_password)
         await users.update_password(user.email, hashed_password, db)
         return {"message": "Password updated successfully"}
     except Exception as e:
@@ -148,7 +150,7 @@ async def reset_password(
 
 @router.get("/profile/{username}", response_model=UserProfileResponseSchema)
 async def get_profile(
-    response: Response, username: str, db: AsyncSession = Depends(get_db)
+    response: Response, username: str, db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get user profile
@@ -181,35 +183,50 @@ async def get_profile(
 )
 async def get_all_users(
     response: Response,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    cursor: str | None = None,
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
     """
-    Get all users
+    Get all users, a page at a time
 
     :param response: response object
+    :param limit: page size
+    :type limit: int
+    :param cursor: cursor returned with the previous page
+    :type cursor: str | None
     :param db: database session
     :type db: AsyncSession
     :param user: current user
     :type user: User
 
-    :return: all users
+    :return: page of users
     :rtype: UsersProfileResponseSchema
     """
 
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            )
+
     try:
-        users_data = await users.get_all_users(db)
+        total = await users.get_count_users(db)
+        users_data, next_cursor = await users.get_all_users(db, limit, cursor)
     except Exception as e:
         response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
         return {"status": "error", "message": str(e)}
 
-    return {"data": users_data, "total": len(users_data)}
+    return {"data": users_data, "total": total, "next_cursor": next_cursor}
 
 
 @router.get("/photos", response_model=PhotosResponseSchema)
 async def get_user_photos(
     skip: int = 0,
-    limit: int = 50,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
@@ -239,7 +256,7 @@ async def get_user_photos(
 @router.get("/comments", response_model=CommentsResponseSchema)
 async def get_user_comments(
     skip: int = 0,
-    limit: int = 50,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
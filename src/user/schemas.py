@@ -98,13 +98,17 @@ class UserProfileResponseSchema(UserCurrentResponseSchema):
     )
 
 
-class UserProfileInfoResponseSchema(UserProfileResponseSchema.Data):
-    pass
+class UserProfileInfoResponseSchema(UserCurrentResponseSchema.Data):
+    # Embedded in photos and comments, whose ETags follow users.updated_at,
+    # so it leaves out the activity counters
+    created_at: datetime
+    updated_at: datetime
 
 
 class UsersProfileResponseSchema(UserProfileResponseSchema):
     data: list[UserProfileResponseSchema.Data] = []
     total: int = 0
+    next_cursor: str | None = None
 
     model_config = ConfigDict(
         from_attributes=True,
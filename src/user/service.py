@@ -1,12 +1,22 @@
-from sqlalchemy import func, select
+from sqlalchemy import func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import make_transient_to_detached, selectinload
 
 from src.comments.models import Comment
+from src.pagination import next_cursor, paginate
 from src.photos.models import Photo
+from src.services.cache import TTLCache
+from src.settings import settings
 from src.user.models import Role, User
 from src.user.schemas import UserSchema, UserUpdateSchema
 
+# Column values of authenticated users keyed by email (the token subject).
+# Every write to a user invalidates its entry in this worker; other workers
+# see the change once their entry expires (settings.user_cache_ttl).
+user_cache = TTLCache(
+    maxsize=settings.user_cache_size, ttl=settings.user_cache_ttl, name="user"
+)
+
 
 async def get_count_users(db: AsyncSession):
     """
@@ -22,6 +32,69 @@ async def get_count_users(db: AsyncSession):
     return result.scalar()
 
 
+async def update_user_stats(
+    user_id: int, db: AsyncSession, photos: int = 0, comments: int = 0
+):
+    """
+    Adjust the photo and comment counters of a user.
+
+    A single UPDATE with relative values, so concurrent changes don't overwrite each other.
+    Counters are not part of the profile embedded in photos and comments, so
+    ``updated_at`` (their version) is kept.
+
+    :param user_id: user id
+    :type user_id: int
+    :param db: database connection
+    :type db: AsyncSession
+    :param photos: change of the photo count
+    :type photos: int
+    :param comments: change of the comment count
+    :type comments: int
+    """
+    result = await db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(
+            count_photos=User.count_photos + photos,
+            count_comments=User.count_comments + comments,
+            updated_at=User.updated_at,
+        )
+        .returning(User.email)
+    )
+    for email in result.scalars():
+        invalidate_user(email)
+
+
+async def remove_photo_comments_stats(photo_id: int, db: AsyncSession):
+    """
+    Decrement the comment counters of everyone who commented a photo about to be
+    deleted (its comments are removed by the database cascade).
+
+    :param photo_id: photo id
+    :type photo_id: int
+    :param db: database connection
+    :type db: AsyncSession
+    """
+    counts = (
+        select(Comment.user_id, func.count(Comment.id).label("count"))
+        .where(Comment.photo_id == photo_id)
+        .group_by(Comment.user_id)
+        .subquery()
+    )
+    result = await db.execute(
+        update(User)
+        .where(User.id == counts.c.user_id)
+        .values(
+            count_comments=User.count_comments - counts.c.count,
+            updated_at=User.updated_at,
+        )
+        .returning(User.email)
+        .execution_options(synchronize_session=False)
+    )
+    for email in result.scalars():
+        invalidate_user(email)
+
+
 async def get_user_by_email(email: str, db: AsyncSession):
     """
     Retrieve a user by their email from the database.
@@ -42,6 +115,42 @@ async def get_user_by_email(email: str, db: AsyncSession):
     return user
 
 
+async def get_cached_user_by_email(email: str, db: AsyncSession):
+    """
+    Retrieve a user by their email, serving repeated lookups from ``user_cache``.
+
+    A cached user is attached to the session without a query, so it can be
+    updated like a user loaded from the database.
+
+    Args:
+        email (str): The email of the user to retrieve.
+        db (AsyncSession): The database session.
+
+    Returns:
+        User: The user with the specified email, if it exists. Otherwise, returns None.
+    """
+    data = user_cache.get(email)
+    if data is not None:
+        user = User(**data)
+        make_transient_to_detached(user)
+        return await db.merge(user, load=False)
+
+    user = await get_user_by_email(email, db)
+    if user is not None:
+        user_cache.set(email, user.to_dict())
+    return user
+
+
+def invalidate_user(email: str):
+    """
+    Drop a user from ``user_cache`` after it was changed.
+
+    Args:
+        email (str): The email of the changed user.
+    """
+    user_cache.delete(email)
+
+
 async def create_user(body: UserSchema, db: AsyncSession):
     """
     Create a new user and save it to the database.
@@ -86,6 +195,7 @@ async def update_user(email: str, body: UserUpdateSchema, db: AsyncSession):
     for attr, value in body.model_dump().items():
         setattr(user, attr, value)
     await db.commit()
+    invalidate_user(email)
     await db.refresh(user)
 
     return user
@@ -109,6 +219,7 @@ async def update_avatar_url(email: str, url: str | None, db: AsyncSession) -> Us
     user = await get_user_by_email(email, db)
     user.avatar = url
     await db.commit()
+    invalidate_user(email)
     await db.refresh(user)
     return user
 
@@ -130,6 +241,7 @@ async def update_password(email: str, password: str, db: AsyncSession):
     user = await get_user_by_email(email, db)
     user.password = password
     await db.commit()
+    invalidate_user(email)
     await db.refresh(user)
     return user
 
@@ -153,6 +265,7 @@ async def update_role(user: User, role: Role, db: AsyncSession):
 
     user.role = role
     await db.commit()
+    invalidate_user(user.email)
     await db.refresh(user)
     return user
 
@@ -169,7 +282,10 @@ async def update_token(user: User, token: str | None, db: AsyncSession):
         db (AsyncSession): The database session.
     """
     user.refresh_token = token
+    # Logins are not profile changes (this also covers a password rehash)
+    user.updated_at = User.updated_at
     await db.commit()
+    invalidate_user(user.email)
 
 
 async def block_user(user: User, block: bool, db: AsyncSession):
@@ -196,51 +312,31 @@ async def block_user(user: User, block: bool, db: AsyncSession):
 
     user.blocked = block
     await db.commit()
+    invalidate_user(user.email)
     await db.refresh(user)
     return user
 
 
-async def get_all_users(db: AsyncSession):
+async def get_all_users(db: AsyncSession, limit: int = 50, cursor: str | None = None):
     """
-    Get all users.
+    Get a page of users, oldest first.
 
     :param db: database connection
     :type db: AsyncSession
+    :param limit: page size
+    :type limit: int
+    :param cursor: cursor returned with the previous page
+    :type cursor: str | None
 
-    :return: all users
-    :rtype: List[User]
+    :return: user profiles and the cursor of the next page
+    :rtype: tuple[List[dict], str | None]
     """
 
-    stmt = (
-        select(
-            User,
-            func.count(Photo.id).label("count_photos"),
-            func.count(Comment.id).label("count_comments"),
-        )
-        .select_from(User)
-        .join(Photo, isouter=True)
-        .join(Comment, isouter=True)
-        .group_by(User.id)
-    )
-
+    stmt = paginate(select(User), User, limit, cursor)
     result = await db.execute(stmt)
+    users_page, next_page = next_cursor(list(result.scalars().all()), limit)
 
-    if not result:
-        return None
-
-    users_data = result.mappings().all()
-
-    users_profiles = []
-    for user_data in users_data:
-        profile = {}
-        for key, value in user_data.items():
-            if isinstance(value, User):
-                profile.update(**value.to_dict())
-            else:
-                profile.update({key: value})
-        users_profiles.append(profile)
-
-    return users_profiles
+    return [user.to_dict() for user in users_page], next_page
 
 
 async def get_user_profile(username: str, db: AsyncSession):
@@ -256,33 +352,14 @@ async def get_user_profile(username: str, db: AsyncSession):
     :rtype: User
     """
 
-    stmt = (
-        select(
-            User,
-            func.count(Photo.id).label("count_photos"),
-            func.count(Comment.id).label("count_comments"),
-        )
-        .select_from(User)
-        .filter_by(username=username)
-        .join(Photo, isouter=True)
-        .join(Comment, isouter=True)
-        .group_by(User.id)
-    )
-
-    user_data = await db.execute(stmt)
-    user_data = user_data.mappings().first()
+    stmt = select(User).filter_by(username=username)
+    user = await db.execute(stmt)
+    user = user.scalars().first()
 
-    if not user_data:
+    if not user:
         return None
 
-    profile = {}
-    for key, value in user_data.items():
-        if isinstance(value, User):
-            profile.update(**value.to_dict())
-        else:
-            profile.update({key: value})
-
-    return profile
+    return user.to_dict()
 
 
 async def get_user_photos(skip: int, limit: int, user: User, db: AsyncSession):
@@ -1,3 +1,12 @@
+import asyncio
+
+from sqlalchemy import select
+
+from src.services.authentication import auth_service
+from src.settings import settings
+from src.user.models import User
+from tests.conftest import TestingSession
+
 access_token = ""
 refresh_token = ""
 reset_token = ""
@@ -63,6 +72,31 @@ def test_login_invalid_password(client, user):
     assert data["detail"] == "Invalid password"
 
 
+def test_login_rehashes_outdated_password(client):
+    email = "rehash@example.com"
+
+    async def create_user():
+        async with TestingSession() as session:
+            password = auth_service.pwd_context.hash("testtest", rounds=4)
+            session.add(User(username="rehash", email=email, password=password))
+            await session.commit()
+
+    async def get_password():
+        async with TestingSession() as session:
+            result = await session.execute(select(User.password).filter_by(email=email))
+            return result.scalar_one()
+
+    asyncio.run(create_user())
+    response = client.post(
+        "/api/auth/login", data={"username": email, "password": "testtest"}
+    )
+
+    assert response.status_code == 200, response.text
+    password = asyncio.run(get_password())
+    assert password.startswith(f"$2b${settings.bcrypt_rounds:02d}$")
+    assert not auth_service.pwd_context.needs_update(password)
+
+
 def test_refresh_token(client):
     global access_token, refresh_token
     response = client.get(
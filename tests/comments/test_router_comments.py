@@ -1,6 +1,13 @@
+import asyncio
+from datetime import datetime, timedelta
+
 import pytest_asyncio
 from starlette.datastructures import QueryParams
 
+from src.comments.models import Comment
+from src.photos.models import Photo
+from tests.conftest import TestingSession
+
 
 @pytest_asyncio.fixture()
 async def token(client, user, monkeypatch):
@@ -31,6 +38,13 @@ def test_create_comment_success(client, token, user):
     assert response_json.get("data").get("user").get("email") == user.get("email"), response.text
 
 
+def test_create_comment_counted_in_profile(client, user):
+    response = client.get(f"/api/user/profile/{user['username']}")
+
+    assert response.status_code == 200, response.text
+    assert response.json()["data"]["count_comments"] == 1
+
+
 def test_get_comments_success(client):
     photo_id = 1
     response = client.get(f"/api/comments/{photo_id}")
@@ -72,7 +86,7 @@ def test_update_comment_fail(client, token):
     assert response.status_code == 500, response.text
 
 
-def test_delete_comment_success(client, token):
+def test_delete_comment_success(client, token, user):
     response = client.delete(
         "/api/comments/1",
         headers={"Authorization": f"Bearer {token}"}
@@ -80,6 +94,9 @@ def test_delete_comment_success(client, token):
 
     assert response.status_code == 200, response.text
 
+    response = client.get(f"/api/user/profile/{user['username']}")
+    assert response.json()["data"]["count_comments"] == 0
+
 
 def test_delete_comment_fail(client, token):
     response = client.delete(
@@ -88,3 +105,56 @@ def test_delete_comment_fail(client, token):
     )
 
     assert response.status_code == 500, response.text
+
+
+def test_get_comments_pages(client, token):
+    async def create_comments():
+        async with TestingSession() as session:
+            photo = Photo(
+                title="commented",
+                description="",
+                owner_id=1,
+                public_id="photos/commented",
+                secure_url="https://example.com/commented.jpg",
+                folder="photos",
+                comments_count=3,
+            )
+            session.add(photo)
+            await session.flush()
+            created_at = datetime(2024, 1, 1)
+            session.add_all(
+                Comment(
+                    user_id=1,
+                    photo_id=photo.id,
+                    comment=f"comment {i}",
+                    created_at=created_at + timedelta(minutes=i),
+                )
+                for i in range(3)
+            )
+            await session.commit()
+            return photo.id
+
+    photo_id = asyncio.run(create_comments())
+
+    response = client.get(f"/api/comments/{photo_id}", params={"limit": 2})
+
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["total"] == 3
+    assert [c["comment"] for c in data["data"]] == ["comment 0", "comment 1"]
+    assert data["next_cursor"]
+
+    response = client.get(
+        f"/api/comments/{photo_id}",
+        params={"limit": 2, "cursor": data["next_cursor"]},
+    )
+
+    data = response.json()
+    assert [c["comment"] for c in data["data"]] == ["comment 2"]
+    assert data["next_cursor"] is None
+
+
+def test_get_comments_invalid_cursor(client):
+    response = client.get("/api/comments/1", params={"cursor": "invalid"})
+
+    assert response.status_code == 400, response.text
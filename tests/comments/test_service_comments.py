@@ -20,6 +20,8 @@ class TestCreateCommentHandler(unittest.IsolatedAsyncioTestCase):
 
     async def test_create_comment(self):
         mocked_user = MagicMock(spec=User)
+        # The counter UPDATE returns the emails of the changed users
+        self.session.execute.return_value = MagicMock()
 
         comment = CommentSchema(comment="Test comment", photo_id=1)
         result = await create_comment(comment, self.session, mocked_user)
@@ -33,8 +35,9 @@ class TestCreateCommentHandler(unittest.IsolatedAsyncioTestCase):
         mocked_comments.scalars.return_value.all.return_value = result_list
         self.session.execute.return_value = mocked_comments
 
-        result = await get_comments(photo_id, self.session)
+        result, cursor = await get_comments(photo_id, self.session)
         self.assertEqual(result, result_list)
+        self.assertIsNone(cursor)
 
     async def test_update_comment(self):
         self.mocked_user = MagicMock(spec=User)
@@ -5,12 +5,13 @@ from fastapi.testclient import TestClient
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
 from src.comments.models import Comment
-from src.database import get_db
+from src.database import get_db, get_read_db
 from src.main import app
 from src.models import Base
 from src.photos.models import Photo
 from src.tags.models import Tag
 from src.user.models import Role, User
+from src.user.service import user_cache
 
 DATABASE_TEST_URL = "sqlite+aiosqlite:///./test.db"
 
@@ -36,6 +37,7 @@ def create_test_database():
             await conn.run_sync(Base.metadata.create_all)
 
     asyncio.run(init())
+    user_cache.clear()
 
 
 @pytest.fixture(scope="module")
@@ -46,6 +48,7 @@ def client():
             yield session
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
 
     yield TestClient(app)
 
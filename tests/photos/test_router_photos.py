@@ -0,0 +1,645 @@
+import asyncio
+import hashlib
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from PIL import Image, ImageDraw
+from sqlalchemy import delete, select, update
+
+from src.comments.models import Comment
+from src.dependencies import get_current_user
+from src.main import app
+from src.photos.models import Photo
+from src.photos.services.search_service import sqlite_backend
+from src.photos.services.similarity_service import backfill_hashes, similarity_index
+from src.services.storage import storage
+from src.services.storage.local_backend import LocalStorage
+from src.settings import settings
+from src.tags.models import Tag
+from src.user.models import User
+from src.user.service import update_token, update_user_stats
+from tests.conftest import TestingSession
+
+
+@pytest.fixture(scope="module", autouse=True)
+def photos(create_test_database):
+    async def init():
+        async with TestingSession() as session:
+            owner = User(username="owner", email="owner@test.com", password="secret")
+            session.add(owner)
+            await session.flush()
+
+            created_at = datetime(2024, 1, 1)
+            photos = [
+                Photo(
+                    title=f"photo {i}",
+                    description=f"description {i}",
+                    owner_id=owner.id,
+                    public_id=f"photos/photo_{i}",
+                    secure_url=f"https://example.com/photo_{i}.jpg",
+                    folder="photos",
+                    created_at=created_at + timedelta(minutes=i),
+                )
+                for i in range(5)
+            ]
+            photos[1].tags = [Tag(name="sunset")]
+            photos[2].title = "Sunset beach"
+            photos[3].description = "sunset over the sea"
+            session.add_all(photos)
+            await session.flush()
+            await sqlite_backend.index(session, [photo.id for photo in photos])
+            await session.commit()
+
+    asyncio.run(init())
+
+
+def test_get_photos_first_page(client):
+    response = client.get("/api/photos/", params={"limit": 2})
+
+    assert response.status_code == 200, response.text
+    data_obj = response.json()
+    assert data_obj["total"] == 5
+    assert [photo["title"] for photo in data_obj["data"]] == ["photo 4", "photo 3"]
+    assert data_obj["next_cursor"]
+
+
+def test_get_photos_limit_out_of_range(client):
+    for limit in (0, 101):
+        response = client.get("/api/photos/", params={"limit": limit})
+        assert response.status_code == 422, response.text
+
+
+def test_search_photos_ranked(client):
+    response = client.get("/api/photos/", params={"q": "sunset"})
+
+    assert response.status_code == 200, response.text
+    data_obj = response.json()
+    assert data_obj["total"] == 3
+    assert [photo["id"] for photo in data_obj["data"]] == [3, 2, 4]
+
+
+def test_search_photos_prefix(client):
+    response = client.get("/api/photos/", params={"q": "SUN"})
+
+    assert response.status_code == 200, response.text
+    assert len(response.json()["data"]) == 3
+
+
+def test_search_photos_no_match(client):
+    response = client.get("/api/photos/", params={"q": "mountain"})
+
+    assert response.status_code == 200, response.text
+    data_obj = response.json()
+    assert data_obj["data"] == []
+    assert data_obj["total"] == 0
+
+
+def test_get_photos_follow_cursor(client):
+    titles = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        data_obj = client.get("/api/photos/", params=params).json()
+        titles.extend(photo["title"] for photo in data_obj["data"])
+        cursor = data_obj["next_cursor"]
+        if not cursor:
+            break
+
+    assert titles == ["photo 4", "photo 3", "Sunset beach", "photo 1", "photo 0"]
+
+
+def test_search_photos_follow_cursor(client):
+    ids = []
+    cursor = None
+    while True:
+        params = {"q": "sunset", "limit": 1}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/photos/", params=params)
+        assert response.status_code == 200, response.text
+        data_obj = response.json()
+        ids.extend(photo["id"] for photo in data_obj["data"])
+        cursor = data_obj["next_cursor"]
+        if not cursor:
+            break
+
+    assert ids == [3, 2, 4]
+
+
+def test_search_photos_rejects_listing_cursor(client):
+    cursor = client.get("/api/photos/", params={"limit": 1}).json()["next_cursor"]
+    response = client.get("/api/photos/", params={"q": "sunset", "cursor": cursor})
+
+    assert response.status_code == 400, response.text
+
+
+def test_get_photos_skip(client):
+    response = client.get("/api/photos/", params={"skip": 3, "limit": 2})
+
+    assert response.status_code == 200, response.text
+    data_obj = response.json()
+    assert [photo["id"] for photo in data_obj["data"]] == [2, 1]
+    assert data_obj["next_cursor"] is None
+
+
+def test_get_photos_invalid_cursor(client):
+    response = client.get("/api/photos/", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400, response.text
+
+
+def test_search_photos_count_beyond_page(client):
+    response = client.get("/api/photos/", params={"q": "photo", "limit": 1})
+
+    assert response.status_code == 200, response.text
+    data_obj = response.json()
+    assert len(data_obj["data"]) == 1
+    assert data_obj["total"] == 4
+
+
+def test_get_photos_approximate_total_falls_back_to_exact(client):
+    response = client.get("/api/photos/", params={"approximate_total": True})
+
+    assert response.status_code == 200, response.text
+    data_obj = response.json()
+    assert data_obj["total"] == 5
+    assert data_obj["approximate_total"] is False
+
+
+def test_get_photos_summary_view(client):
+    response = client.get("/api/photos/", params={"view": "summary", "limit": 1})
+
+    assert response.status_code == 200, response.text
+    photo = response.json()["data"][0]
+    assert photo["title"] == "photo 4"
+    assert photo["owner_id"] == 1
+    assert "owner" not in photo
+    assert "comments" not in photo
+    assert "transformations" not in photo
+
+
+def test_get_photos_full_view(client):
+    response = client.get("/api/photos/", params={"limit": 1})
+
+    assert response.status_code == 200, response.text
+    photo = response.json()["data"][0]
+    assert photo["owner"]["username"] == "owner"
+    assert photo["comments"] == []
+
+
+def set_updated_at(photo_id: int, updated_at: datetime):
+    async def run():
+        async with TestingSession() as session:
+            await session.execute(
+                update(Photo).where(Photo.id == photo_id).values(updated_at=updated_at)
+            )
+            await session.commit()
+
+    asyncio.run(run())
+
+
+def test_get_photo_not_modified(client):
+    response = client.get("/api/photos/1")
+
+    assert response.status_code == 200, response.text
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+    assert response.headers["last-modified"]
+
+    response = client.get("/api/photos/1", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+    set_updated_at(1, datetime(2030, 1, 1))
+    response = client.get("/api/photos/1", headers={"If-None-Match": etag})
+    assert response.status_code == 200, response.text
+    assert response.headers["etag"] != etag
+    assert response.headers["last-modified"] == "Tue, 01 Jan 2030 00:00:00 GMT"
+
+
+def test_get_photo_etag_follows_commenters(client):
+    async def add_commenter():
+        async with TestingSession() as session:
+            commenter = User(
+                username="commenter", email="commenter@test.com", password="secret"
+            )
+            session.add(commenter)
+            await session.flush()
+            session.add(Comment(user_id=commenter.id, photo_id=3, comment="nice"))
+            await session.commit()
+            return commenter.id
+
+    commenter_id = asyncio.run(add_commenter())
+    etag = client.get("/api/photos/3").headers["etag"]
+
+    # A login of the owner and the commenter's counters are not profile changes
+    async def touch_users():
+        async with TestingSession() as session:
+            await update_token(await session.get(User, 1), "token", session)
+            await update_user_stats(commenter_id, session, comments=1)
+            await session.commit()
+
+    asyncio.run(touch_users())
+    response = client.get("/api/photos/3", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    async def rename_commenter():
+        async with TestingSession() as session:
+            await session.execute(
+                update(User)
+                .where(User.id == commenter_id)
+                .values(username="renamed", updated_at=datetime(2029, 1, 1))
+            )
+            await session.commit()
+
+    asyncio.run(rename_commenter())
+    response = client.get("/api/photos/3", headers={"If-None-Match": etag})
+    assert response.status_code == 200, response.text
+    assert response.json()["data"]["comments"][0]["user"]["username"] == "renamed"
+
+
+def test_get_photo_if_modified_since(client):
+    set_updated_at(2, datetime(2030, 1, 1))
+
+    response = client.get(
+        "/api/photos/2", headers={"If-Modified-Since": "Tue, 01 Jan 2030 00:00:00 GMT"}
+    )
+    assert response.status_code == 304
+
+    response = client.get(
+        "/api/photos/2", headers={"If-Modified-Since": "Mon, 31 Dec 2029 00:00:00 GMT"}
+    )
+    assert response.status_code == 200, response.text
+
+
+def test_get_photos_not_modified(client):
+    response = client.get("/api/photos/", params={"limit": 2})
+
+    assert response.status_code == 200, response.text
+    etag = response.headers["etag"]
+
+    response = client.get(
+        "/api/photos/", params={"limit": 2}, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+    # Another page or view is another representation
+    response = client.get(
+        "/api/photos/",
+        params={"limit": 2, "view": "summary"},
+        headers={"If-None-Match": etag},
+    )
+    assert response.status_code == 200, response.text
+
+    set_updated_at(4, datetime(2031, 1, 1))
+    response = client.get(
+        "/api/photos/", params={"limit": 2}, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200, response.text
+    assert response.headers["last-modified"] == "Wed, 01 Jan 2031 00:00:00 GMT"
+
+
+def test_search_photos_not_modified(client):
+    response = client.get("/api/photos/", params={"q": "sunset"})
+    etag = response.headers["etag"]
+
+    response = client.get(
+        "/api/photos/", params={"q": "sunset"}, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+
+@pytest.fixture()
+def local_storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "backend", LocalStorage(tmp_path, "/media"))
+    monkeypatch.setitem(
+        app.dependency_overrides, get_current_user, lambda: User(id=1, username="owner")
+    )
+    return storage.backend
+
+
+def test_create_photo_stream(client, local_storage):
+    content = b"\x89PNG\r\n\x1a\n" + b"0" * 100_000
+
+    response = client.post(
+        "/api/photos/stream",
+        params={"title": "streamed", "description": "raw body", "tags": "raw,stream"},
+        content=content,
+        headers={"Content-Type": "image/png"},
+    )
+
+    assert response.status_code == 201, response.text
+    photo = response.json()["data"]
+    assert photo["title"] == "streamed"
+    assert sorted(tag["name"] for tag in photo["tags"]) == ["raw", "stream"]
+    assert local_storage.get_path(photo["public_id"]).read_bytes() == content
+
+
+def test_create_photo_stream_too_large(client, local_storage, monkeypatch):
+    monkeypatch.setattr(settings, "upload_max_size", 10)
+
+    response = client.post(
+        "/api/photos/stream",
+        params={"title": "big", "description": "too big"},
+        content=b"0" * 11,
+    )
+    assert response.status_code == 413
+
+    # Without Content-Length the limit is enforced while reading
+    response = client.post(
+        "/api/photos/stream",
+        params={"title": "big", "description": "too big"},
+        content=iter([b"0" * 6, b"0" * 6]),
+    )
+    assert response.status_code == 413
+
+
+def test_create_photo_stream_empty_chunked_body(client, local_storage):
+    response = client.post(
+        "/api/photos/stream",
+        params={"title": "empty", "description": "no data"},
+        content=iter([b""]),
+    )
+    assert response.status_code == 400, response.text
+
+
+def test_create_photos_bulk(client, local_storage, monkeypatch):
+    async def upload_file(file, folder, public_id=None):
+        content = file.read()
+        if content == b"broken":
+            raise ValueError("upload failed")
+        return local_storage.upload_file(io.BytesIO(content), folder)
+
+    monkeypatch.setattr(storage, "upload_file", upload_file)
+    metadata = [
+        {"title": "bulk 1", "description": "first", "tags": ["album", "beach"]},
+        {"title": "bulk 2", "description": "broken", "tags": ["album"]},
+        {"title": "bulk 3", "description": "third", "tags": ["album", " beach "]},
+    ]
+
+    response = client.post(
+        "/api/photos/bulk",
+        data={"metadata": json.dumps(metadata)},
+        files=[
+            ("files", ("1.png", b"\x89PNG\r\n\x1a\n1", "image/png")),
+            ("files", ("2.png", b"broken", "image/png")),
+            ("files", ("3.png", b"\x89PNG\r\n\x1a\n3", "image/png")),
+        ],
+    )
+
+    assert response.status_code == 200, response.text
+    results = response.json()["data"]
+    assert [result["status"] for result in results] == ["ok", "error", "ok"]
+    assert results[0]["data"]["title"] == "bulk 1"
+    assert results[1]["data"] is None
+    assert sorted(tag["name"] for tag in results[2]["data"]["tags"]) == [
+        "album",
+        "beach",
+    ]
+    assert results[2]["data"]["owner"]["username"] == "owner"
+
+
+def test_create_photos_bulk_metadata_mismatch(client, local_storage):
+    response = client.post(
+        "/api/photos/bulk",
+        data={"metadata": json.dumps([])},
+        files=[("files", ("1.png", b"1", "image/png"))],
+    )
+    assert response.status_code == 400
+
+    response = client.post(
+        "/api/photos/bulk",
+        data={"metadata": "[{}]"},
+        files=[("files", ("1.png", b"1", "image/png"))],
+    )
+    assert response.status_code == 422
+
+
+def test_duplicate_upload_reuses_asset(client, local_storage, monkeypatch):
+    uploads = []
+    upload_file = storage.upload_file
+
+    async def counting_upload_file(file, folder, public_id=None):
+        uploads.append(public_id)
+        return await upload_file(file, folder, public_id)
+
+    monkeypatch.setattr(storage, "upload_file", counting_upload_file)
+    content = b"\x89PNG\r\n\x1a\n" + b"duplicate" * 100
+
+    photos = []
+    for title in ("original", "repost"):
+        response = client.post(
+            "/api/photos/",
+            data={"title": title, "description": "same content"},
+            files={"file": (f"{title}.png", content, "image/png")},
+        )
+        assert response.status_code == 201, response.text
+        photos.append(response.json()["data"])
+
+    assert len(uploads) == 1
+    assert uploads[0].startswith(hashlib.sha256(content).hexdigest() + "-")
+    assert photos[0]["public_id"] == photos[1]["public_id"]
+    path = local_storage.get_path(photos[0]["public_id"])
+
+    # The file is kept while another photo uses it
+    response = client.delete(f"/api/photos/{photos[0]['id']}")
+    assert response.status_code == 200, response.text
+    assert path.exists()
+
+    response = client.delete(f"/api/photos/{photos[1]['id']}")
+    assert response.status_code == 200, response.text
+    assert not path.exists()
+
+
+def test_upload_racing_same_content_reuses_asset(client, local_storage, monkeypatch):
+    content = b"\x89PNG\r\n\x1a\n" + b"raced" * 100
+    upload_file = storage.upload_file
+    uploaded = []
+
+    async def racing_upload_file(file, folder, public_id=None):
+        uploaded.append(await upload_file(file, folder, public_id))
+        # Another request stores the same content meanwhile
+        async with TestingSession() as session:
+            owner = await session.scalar(select(User).where(User.username == "owner"))
+            session.add(
+                Photo(
+                    title="winner",
+                    description="raced",
+                    owner_id=owner.id,
+                    public_id="photos/winner",
+                    secure_url="https://example.com/winner.png",
+                    folder="photos",
+                    content_hash=hashlib.sha256(content).hexdigest(),
+                )
+            )
+            await session.commit()
+        return uploaded[-1]
+
+    monkeypatch.setattr(storage, "upload_file", racing_upload_file)
+    response = client.post(
+        "/api/photos/",
+        data={"title": "loser", "description": "raced"},
+        files={"file": ("raced.png", content, "image/png")},
+    )
+
+    assert response.status_code == 201, response.text
+    assert response.json()["data"]["public_id"] == "photos/winner"
+    assert not local_storage.get_path(uploaded[0]["public_id"]).exists()
+
+
+def test_delete_photo_removes_file_after_commit(client, local_storage, monkeypatch):
+    content = b"\x89PNG\r\n\x1a\n" + b"deleted after commit" * 100
+    response = client.post(
+        "/api/photos/",
+        data={"title": "deleted", "description": "deleted"},
+        files={"file": ("deleted.png", content, "image/png")},
+    )
+    assert response.status_code == 201, response.text
+    photo = response.json()["data"]
+
+    rows = []
+    delete_file = storage.delete_file
+
+    async def checking_delete_file(public_id):
+        # What a concurrent upload of the same content would see
+        async with TestingSession() as session:
+            rows.append(await session.get(Photo, photo["id"]))
+        return await delete_file(public_id=public_id)
+
+    monkeypatch.setattr(storage, "delete_file", checking_delete_file)
+    response = client.delete(f"/api/photos/{photo['id']}")
+
+    assert response.status_code == 200, response.text
+    assert rows == [None]
+    assert not local_storage.get_path(photo["public_id"]).exists()
+
+
+def test_duplicate_stream_reuses_asset(client, local_storage):
+    content = b"\x89PNG\r\n\x1a\n" + b"streamed twice" * 100
+
+    public_ids = set()
+    for _ in range(2):
+        response = client.post(
+            "/api/photos/stream",
+            params={"title": "streamed", "description": "twice"},
+            content=content,
+        )
+        assert response.status_code == 201, response.text
+        public_ids.add(response.json()["data"]["public_id"])
+
+    assert len(public_ids) == 1
+
+
+def make_jpeg(seed: int, size=(320, 240)) -> bytes:
+    image = Image.new("RGB", (640, 480), "white")
+    draw = ImageDraw.Draw(image)
+    for i in range(8):
+        x, y = (seed * 97 + i * 131) % 600, (seed * 53 + i * 71) % 440
+        draw.rectangle((x, y, x + 120, y + 90), fill=(i * 30, 255 - seed * 40, 90))
+    buffer = io.BytesIO()
+    image.resize(size).save(buffer, format="JPEG", quality=80)
+    return buffer.getvalue()
+
+
+def test_get_similar_photos(client, local_storage):
+    similarity_index.clear()
+    uploads = {
+        "original": make_jpeg(1, size=(640, 480)),
+        "thumbnail": make_jpeg(1, size=(200, 150)),
+        "other": make_jpeg(4),
+    }
+    ids = {}
+    for title, content in uploads.items():
+        response = client.post(
+            "/api/photos/",
+            data={"title": title, "description": "similar"},
+            files={"file": (f"{title}.jpg", content, "image/jpeg")},
+        )
+        assert response.status_code == 201, response.text
+        ids[title] = response.json()["data"]["id"]
+
+    response = client.get(f"/api/photos/{ids['original']}/similar")
+
+    assert response.status_code == 200, response.text
+    data = response.json()["data"]
+    assert [photo["id"] for photo in data] == [ids["thumbnail"]]
+    assert data[0]["distance"] <= settings.similar_max_distance
+
+    response = client.get(
+        f"/api/photos/{ids['original']}/similar", params={"max_distance": 64}
+    )
+    assert response.status_code == 422
+
+    # Photos without a hash have no near-duplicates
+    response = client.get("/api/photos/1/similar")
+    assert response.status_code == 200, response.text
+    assert response.json()["data"] == []
+
+    response = client.get("/api/photos/999999/similar")
+    assert response.status_code == 404
+
+
+def test_similar_photos_follow_other_workers(client, local_storage, monkeypatch):
+    monkeypatch.setattr(settings, "similar_refresh_interval", 0)
+    similarity_index.clear()
+    ids = {}
+    for title, content in (
+        ("original", make_jpeg(2, size=(640, 480))),
+        ("replaced", make_jpeg(2, size=(300, 225))),
+        ("deleted", make_jpeg(2, size=(200, 150))),
+    ):
+        response = client.post(
+            "/api/photos/",
+            data={"title": title, "description": "other workers"},
+            files={"file": (f"{title}.jpg", content, "image/jpeg")},
+        )
+        assert response.status_code == 201, response.text
+        ids[title] = response.json()["data"]["id"]
+
+    async def change_elsewhere():
+        async with TestingSession() as session:
+            phash = await session.scalar(
+                select(Photo.phash).where(Photo.id == ids["original"])
+            )
+            await session.execute(
+                update(Photo).where(Photo.id == ids["replaced"]).values(phash=~phash)
+            )
+            await session.execute(delete(Photo).where(Photo.id == ids["deleted"]))
+            await session.commit()
+
+    asyncio.run(change_elsewhere())
+
+    response = client.get(f"/api/photos/{ids['original']}/similar")
+
+    assert response.status_code == 200, response.text
+    assert response.json()["data"] == []
+    assert ids["replaced"] in similarity_index.hashes
+    assert ids["deleted"] not in similarity_index.hashes
+
+
+def test_backfill_hashes(client, local_storage):
+    asset = local_storage.upload_file(io.BytesIO(make_jpeg(3)), folder="photos")
+
+    async def run():
+        async with TestingSession() as session:
+            photo = Photo(
+                title="before phash",
+                description="backfilled",
+                owner_id=1,
+                public_id=asset["public_id"],
+                secure_url=asset["secure_url"],
+                folder="photos",
+            )
+            session.add(photo)
+            await session.commit()
+
+            # Photos whose files are missing are skipped
+            assert await backfill_hashes(session) == 1
+            await session.refresh(photo)
+            return photo.phash
+
+    assert asyncio.run(run()) is not None
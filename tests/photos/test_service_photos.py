@@ -0,0 +1,64 @@
+import asyncio
+import os
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import asyncpg
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.photos.services.photo_service import Explain, estimate_count, lock_assets
+from src.photos.services.search_service import PostgresSearchBackend
+
+
+def test_explain_uses_dialect_parameters():
+    statement = PostgresSearchBackend().match(["sunset"])
+
+    compiled = Explain(statement).compile(dialect=asyncpg.dialect())
+
+    assert str(compiled).startswith("EXPLAIN (FORMAT JSON) SELECT photos.id")
+    assert "$1" in str(compiled)
+    assert list(compiled.params.values()) == ["simple", "sunset:*"]
+
+
+def test_estimate_count_other_databases():
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        try:
+            async with AsyncSession(engine) as db:
+                return await estimate_count(select(func.count()), db)
+        finally:
+            await engine.dispose()
+
+    assert asyncio.run(run()) is None
+
+
+def test_lock_assets_in_order():
+    db = AsyncMock(spec=AsyncSession)
+    db.get_bind = MagicMock()
+    db.get_bind.return_value.dialect.name = "postgresql"
+
+    asyncio.run(lock_assets(["b", "a", "b"], db))
+
+    locked = [
+        call.args[0].compile(dialect=asyncpg.dialect()).params
+        for call in db.execute.await_args_list
+    ]
+    assert [list(params.values()) for params in locked] == [["a"], ["b"]]
+
+
+@pytest.mark.postgres
+@pytest.mark.skipif(
+    not os.environ.get("TEST_POSTGRES_URL"), reason="TEST_POSTGRES_URL not set"
+)
+def test_estimate_count_postgres():
+    async def run():
+        engine = create_async_engine(os.environ["TEST_POSTGRES_URL"])
+        try:
+            async with AsyncSession(engine) as db:
+                # Bound parameters, and a row estimate known to the planner
+                return await estimate_count(select(func.generate_series(1, 1000)), db)
+        finally:
+            await engine.dispose()
+
+    assert asyncio.run(run()) == 1000
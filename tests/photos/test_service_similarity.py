@@ -0,0 +1,104 @@
+import io
+import random
+
+from PIL import Image, ImageDraw
+
+from src.photos.services.similarity_service import (
+    PREVIEW_SIZE,
+    BKTree,
+    SimilarityIndex,
+    dhash,
+    hamming,
+    load_preview,
+    to_signed,
+    to_unsigned,
+)
+
+
+def make_image(seed: int, size=(640, 480)) -> Image.Image:
+    rng = random.Random(seed)
+    image = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(image)
+    for _ in range(12):
+        x, y = rng.randrange(size[0]), rng.randrange(size[1])
+        w, h = rng.randrange(40, 300), rng.randrange(40, 300)
+        color = tuple(rng.randrange(256) for _ in range(3))
+        draw.ellipse((x, y, x + w, y + h), fill=color)
+    return image
+
+
+def encode(image: Image.Image, format="JPEG", **options) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format=format, **options)
+    return buffer.getvalue()
+
+
+def test_dhash_matches_resized_copies():
+    image = make_image(1)
+    original = dhash(encode(image, quality=90))
+    resized = dhash(encode(image.resize((320, 240)), quality=60))
+    png = dhash(encode(image, format="PNG"))
+    other = dhash(encode(make_image(2), quality=90))
+
+    assert hamming(original, resized) <= 6
+    assert hamming(original, png) <= 6
+    assert hamming(original, other) > 12
+
+
+def test_preview_is_small():
+    preview = load_preview(io.BytesIO(encode(make_image(1, size=(4000, 3000)))))
+
+    # Only this copy is sent to the hashing processes
+    assert preview.mode == "L"
+    assert preview.width <= PREVIEW_SIZE[0] and preview.height <= PREVIEW_SIZE[1]
+
+
+def test_dhash_not_an_image():
+    assert dhash(b"not an image") is None
+
+
+def test_signed_round_trip():
+    for value in (0, 1, (1 << 63) - 1, 1 << 63, (1 << 64) - 1):
+        signed = to_signed(value)
+        assert -(1 << 63) <= signed < 1 << 63
+        assert to_unsigned(signed) == value
+
+
+def test_bk_tree_search_matches_linear_scan():
+    rng = random.Random(0)
+    hashes = {id: rng.getrandbits(64) for id in range(500)}
+    # Near-duplicates and an exact duplicate of photo 0
+    hashes[500] = hashes[0] ^ 0b101
+    hashes[501] = hashes[0]
+    tree = BKTree()
+    for id, value in hashes.items():
+        tree.add(value, id)
+
+    for max_distance in (0, 3, 20):
+        expected = sorted(
+            (hamming(hashes[0], value), id)
+            for id, value in hashes.items()
+            if hamming(hashes[0], value) <= max_distance
+        )
+        assert tree.search(hashes[0], max_distance) == expected
+
+    tree.remove(hashes[0], 0)
+    assert tree.search(hashes[0], 2) == [(0, 501), (2, 500)]
+    assert tree.size == 501
+
+
+def test_index_update_replaces_hash():
+    index = SimilarityIndex()
+    index.update(1, to_signed(1 << 63))
+    index.update(2, None)
+
+    assert index.tree.search(1 << 63, 0) == [(0, 1)]
+    assert 2 not in index.hashes
+
+    index.update(1, 5)
+    assert index.tree.search(1 << 63, 0) == []
+    assert index.tree.search(5, 0) == [(0, 1)]
+
+    index.update(1, None)
+    assert index.tree.search(5, 0) == []
+    assert index.hashes == {}
@@ -1,5 +1,31 @@
+import asyncio
+
+import pytest
 import pytest_asyncio
 
+from src.photos.models import Photo
+from src.rating.service import create_update_rating
+from tests.conftest import TestingSession
+
+
+@pytest.fixture(scope="module", autouse=True)
+def photo(create_test_database):
+    async def init():
+        async with TestingSession() as session:
+            session.add(
+                Photo(
+                    title="photo",
+                    description="description",
+                    owner_id=1,
+                    public_id="photos/photo",
+                    secure_url="https://example.com/photo.jpg",
+                    folder="photos",
+                )
+            )
+            await session.commit()
+
+    asyncio.run(init())
+
 
 @pytest_asyncio.fixture()
 async def token(client, user, monkeypatch):
@@ -26,6 +52,7 @@ def test_set_rating_handler(client, user, token):
 
     assert response.status_code == 200, response.text
     assert response_json.get("data").get("rating") == rating.get("rating"), response.text
+    assert response_json.get("data").get("average_rating") == 5, response.text
 
 
 def test_update_rating_handler(client, user, token):
@@ -40,6 +67,7 @@ def test_update_rating_handler(client, user, token):
 
     assert response.status_code == 200, response.text
     assert response_json.get("data").get("rating") == rating.get("rating"), response.text
+    assert response_json.get("data").get("average_rating") == 4, response.text
 
 
 def test_get_average_rating_handler(client):
@@ -63,3 +91,37 @@ def test_delete_rating_handler(client, user, token):
 
     assert response.status_code == 200, response.text
     assert response_json.get("data").get("rating") == 4, response.text
+
+
+def test_average_rating_after_delete(client):
+    response = client.get("/api/rating/avg/1")
+
+    assert response.status_code == 200, response.text
+    assert response.json().get("data").get("rating") == 0, response.text
+
+
+def test_concurrent_votes_keep_aggregates():
+    async def vote(user_id: int, rating: int) -> float:
+        async with TestingSession() as session:
+            _, average_rating = await create_update_rating(
+                session, photo_id=1, user_id=user_id, rating=rating
+            )
+            return average_rating
+
+    async def aggregates():
+        async with TestingSession() as session:
+            photo = await session.get(Photo, 1)
+            return photo.rating_count, photo.rating_sum
+
+    async def run():
+        await asyncio.gather(vote(101, 5), vote(102, 3))
+        return await aggregates()
+
+    assert asyncio.run(run()) == (2, 8)
+
+    # A changed vote adjusts the sum by the difference only
+    async def revote():
+        await vote(101, 2)
+        return await aggregates()
+
+    assert asyncio.run(revote()) == (2, 5)
@@ -17,31 +17,28 @@ class TestRatingService(unittest.IsolatedAsyncioTestCase):
     def setUp(self):
         self.session = AsyncMock(spec=AsyncSession)
 
-    async def test_create_rating(self):
-        rating = Rating()
-
+    def mock_results(self, rating, average_rating, previous=None):
+        mocked_lock = MagicMock()
+        mocked_lock.scalar_one_or_none.return_value = previous
         mocked_rating = MagicMock()
-        mocked_rating.scalars.return_value.first.return_value = rating
-        self.session.execute.return_value = mocked_rating
-
-        result = await create_update_rating(
-            db=self.session, photo_id=1, user_id=1, rating=5
-        )
-        self.assertIsInstance(result, Rating)
-        self.assertEqual(result.rating, 5)
-
-    async def test_update_rating(self):
-        rating = Rating()
+        mocked_rating.scalar_one.return_value = rating
+        mocked_rating.scalar_one_or_none.return_value = rating
+        mocked_average = MagicMock()
+        mocked_average.scalar_one_or_none.return_value = average_rating
+        # The photo row lock (with the previous vote), the vote, then the aggregates
+        self.session.execute.side_effect = [mocked_lock, mocked_rating, mocked_average]
 
-        mocked_rating = MagicMock()
-        mocked_rating.scalars.return_value.first.return_value = rating
-        self.session.execute.return_value = mocked_rating
+    async def test_create_update_rating(self):
+        rating = Rating(photo_id=1, user_id=1, rating=5)
+        self.mock_results(rating, 4.5)
 
-        result = await create_update_rating(
-            db=self.session, photo_id=1, user_id=1, rating=4
+        result, average_rating = await create_update_rating(
+            db=self.session, photo_id=1, user_id=1, rating=5
         )
-        self.assertIsInstance(result, Rating)
-        self.assertEqual(result.rating, 4)
+        self.assertIs(result, rating)
+        self.assertEqual(average_rating, 4.5)
+        self.assertEqual(self.session.execute.await_count, 3)
+        self.session.commit.assert_awaited_once()
 
     async def test_rating_get(self):
         rating = Rating()
@@ -54,19 +51,34 @@ class TestRatingService(unittest.IsolatedAsyncioTestCase):
         self.assertIsInstance(result, Rating)
 
     async def test_delete_rating(self):
-        rating = Rating()
+        rating = Rating(rating=4)
+        self.mock_results(rating, 0)
 
+        result = await delete_rating(db=self.session, photo_id=1, user_id=1)
+        self.assertIs(result, rating)
+        self.session.commit.assert_awaited_once()
+
+    async def test_delete_rating_not_found(self):
         mocked_rating = MagicMock()
-        mocked_rating.scalars.return_value.first.return_value = rating
-        self.session.execute.return_value = mocked_rating
+        mocked_rating.scalar_one_or_none.return_value = None
+        self.session.execute.side_effect = [MagicMock(), mocked_rating]
 
         result = await delete_rating(db=self.session, photo_id=1, user_id=1)
-        self.assertIsInstance(result, Rating)
+        self.assertIsNone(result)
+        self.session.commit.assert_not_called()
 
     async def test_get_average_rating(self):
         mocked_rating = MagicMock()
-        mocked_rating.scalars.return_value.all.return_value = []
+        mocked_rating.scalar_one_or_none.return_value = None
         self.session.execute.return_value = mocked_rating
 
         result = await get_average_rating(db=self.session, photo_id=1)
         self.assertEqual(result, 0)
+
+    async def test_get_average_rating_from_aggregates(self):
+        mocked_rating = MagicMock()
+        mocked_rating.scalar_one_or_none.return_value = 4.5
+        self.session.execute.return_value = mocked_rating
+
+        result = await get_average_rating(db=self.session, photo_id=1)
+        self.assertEqual(result, 4.5)
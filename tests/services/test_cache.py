@@ -0,0 +1,47 @@
+import unittest
+from unittest.mock import patch
+
+from src.services.cache import TTLCache
+
+
+class TestTTLCache(unittest.TestCase):
+
+    def test_hit_and_miss(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+
+        self.assertIsNone(cache.get("a"))
+        cache.set("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_expires(self):
+        cache = TTLCache(maxsize=2, ttl=10)
+        with patch("src.services.cache.time.monotonic", return_value=100):
+            cache.set("a", 1)
+        with patch("src.services.cache.time.monotonic", return_value=111):
+            self.assertIsNone(cache.get("a"))
+
+    def test_delete(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.delete("a")
+        cache.delete("missing")
+
+        self.assertIsNone(cache.get("a"))
+
+
+if __name__ == '__main__':
+    unittest.main()
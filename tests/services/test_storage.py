@@ -0,0 +1,227 @@
+import asyncio
+import hashlib
+import io
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.services.storage import AsyncStorage, StorageBackend
+from src.services.storage.local_backend import LocalStorage
+from src.services.storage.streaming import EmptyUpload, UploadTimeout, UploadTooLarge
+
+
+class TestAsyncStorage(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.backend = MagicMock(spec=StorageBackend)
+        self.storage = AsyncStorage(
+            self.backend, max_workers=2, max_concurrency=2, timeout=0.5
+        )
+
+    def tearDown(self):
+        self.storage.shutdown()
+
+    async def test_upload_file(self):
+        self.backend.upload_file.return_value = {"public_id": "photos/test"}
+        result = await self.storage.upload_file("file", folder="photos")
+
+        self.backend.upload_file.assert_called_once_with("file", "photos", None)
+        self.assertEqual(result, {"public_id": "photos/test"})
+        stats = self.storage.metrics.snapshot()["upload_file"]
+        self.assertEqual(stats["calls"], 1)
+        self.assertEqual(stats["errors"], 0)
+
+    async def test_error_is_recorded(self):
+        self.backend.delete_file.side_effect = ValueError("boom")
+        with self.assertRaises(ValueError):
+            await self.storage.delete_file(public_id="photos/test")
+
+        self.assertEqual(self.storage.metrics.snapshot()["delete_file"]["errors"], 1)
+
+    async def test_timeout(self):
+        with self.assertRaises(TimeoutError):
+            await self.storage.run("slow", time.sleep, 1)
+
+        self.assertEqual(self.storage.metrics.snapshot()["slow"]["timeouts"], 1)
+
+
+class TestAbandonedCalls(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.backend = MagicMock(spec=StorageBackend)
+        # Two threads but one slot: only the semaphore keeps calls apart
+        self.storage = AsyncStorage(
+            self.backend, max_workers=2, max_concurrency=1, timeout=0.1
+        )
+
+    def tearDown(self):
+        self.storage.shutdown()
+
+    async def test_timed_out_call_keeps_its_slot(self):
+        events = []
+
+        def slow():
+            time.sleep(0.3)
+            events.append("slow done")
+
+        with self.assertRaises(TimeoutError):
+            await self.storage.run("slow", slow)
+        await self.storage.run("fast", events.append, "fast")
+
+        self.assertEqual(events, ["slow done", "fast"])
+
+    async def test_late_upload_is_deleted(self):
+        def upload(file, folder, public_id):
+            time.sleep(0.3)
+            return {"public_id": public_id or "transformations/new"}
+
+        self.backend.upload_file.side_effect = upload
+        with self.assertRaises(TimeoutError):
+            await self.storage.upload_file("file", folder="transformations")
+        with self.assertRaises(TimeoutError):
+            await self.storage.upload_file("file", folder="photos", public_id="abc")
+        # Waits for both uploads to finish
+        await self.storage.run("noop", lambda: None)
+
+        self.backend.delete_file.assert_called_once_with("transformations/new")
+
+
+class TestUploadStream(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = AsyncStorage(
+            LocalStorage(root=self.tmp.name, base_url="/media"),
+            max_workers=1,
+            max_concurrency=2,
+            timeout=1,
+            stream_workers=1,
+            stream_timeout=0.2,
+        )
+
+    def tearDown(self):
+        self.storage.shutdown()
+        self.tmp.cleanup()
+
+    @staticmethod
+    async def chunks(*parts: bytes):
+        for part in parts:
+            yield part
+
+    async def test_upload_stream(self):
+        parts = (b"\x89PNG\r\n\x1a\n", b"1" * 1000, b"", b"2" * 1000)
+        content = b"".join(parts)
+
+        asset = await self.storage.upload_stream(
+            self.chunks(*parts), folder="photos", max_size=len(content)
+        )
+
+        self.assertEqual(asset["bytes"], len(content))
+        self.assertEqual(asset["sha256"], hashlib.sha256(content).hexdigest())
+        self.assertTrue(asset["public_id"].endswith(".png"))
+        self.assertEqual(
+            self.storage.backend.get_path(asset["public_id"]).read_bytes(), content
+        )
+
+    async def test_upload_stream_too_large(self):
+        with self.assertRaises(UploadTooLarge):
+            await self.storage.upload_stream(
+                self.chunks(b"1" * 1000, b"2" * 1000), folder="photos", max_size=1500
+            )
+
+        self.assertEqual(
+            self.storage.metrics.snapshot()["upload_stream"]["errors"], 1
+        )
+
+    async def test_upload_stream_empty(self):
+        with self.assertRaises(EmptyUpload):
+            await self.storage.upload_stream(
+                self.chunks(b"", b""), folder="photos", max_size=1000
+            )
+
+        # Rejected before taking a stream thread
+        self.assertNotIn("upload_stream", self.storage.metrics.snapshot())
+
+    async def test_stalled_stream(self):
+        async def stalled():
+            yield b"1" * 100
+            await asyncio.sleep(10)
+            yield b"2" * 100
+
+        upload = asyncio.create_task(
+            self.storage.upload_stream(stalled(), folder="photos", max_size=1000)
+        )
+        # The stalled client doesn't hold the thread other calls run on
+        self.assertEqual(await self.storage.run("quick", int, "1"), 1)
+
+        with self.assertRaises(UploadTimeout):
+            await upload
+        self.assertEqual(list((self.storage.backend.root / ".tmp").iterdir()), [])
+
+
+class TestLocalStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.backend = LocalStorage(root=self.tmp.name, base_url="/media")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_backend_must_implement_storage(self):
+        class Partial(StorageBackend):
+            def upload_file(self, file, folder, public_id=None):
+                return {}
+
+        with self.assertRaises(TypeError):
+            Partial()
+
+    def test_identical_uploads_get_their_own_files(self):
+        content = b"\x89PNG\r\n\x1a\n" + b"0" * 100
+
+        first = self.backend.upload_file(io.BytesIO(content), folder="photos")
+        second = self.backend.upload_file(io.BytesIO(content), folder="photos")
+
+        self.assertNotEqual(first["public_id"], second["public_id"])
+        self.assertTrue(first["public_id"].startswith("photos/"))
+        self.assertTrue(first["public_id"].endswith(".png"))
+        self.assertEqual(first["secure_url"], "/media/" + first["public_id"])
+
+        # Deleting one copy leaves the other intact
+        self.assertTrue(self.backend.delete_file(first["public_id"]))
+        self.assertEqual(
+            self.backend.get_path(second["public_id"]).read_bytes(), content
+        )
+
+    def test_failed_upload_leaves_no_temp_file(self):
+        source = MagicMock()
+        source.read.side_effect = OSError("disk error")
+
+        with self.assertRaises(OSError):
+            self.backend.upload_file(source, folder="photos")
+        self.assertEqual(list((self.backend.root / ".tmp").iterdir()), [])
+
+        # The real error surfaces when the temp file can't even be created
+        with patch("tempfile.NamedTemporaryFile", side_effect=OSError("disk full")):
+            with self.assertRaisesRegex(OSError, "disk full"):
+                self.backend.upload_file(io.BytesIO(b"data"), folder="photos")
+
+    def test_upload_from_own_url(self):
+        asset = self.backend.upload_file(io.BytesIO(b"data"), folder="photos")
+
+        copy = self.backend.upload_file(asset["secure_url"], folder="transformations")
+
+        self.assertTrue(copy["public_id"].startswith("transformations/"))
+        self.assertEqual(copy["original_filename"], asset["original_filename"])
+
+    def test_delete_file(self):
+        asset = self.backend.upload_file(io.BytesIO(b"data"), folder="photos")
+
+        self.assertTrue(self.backend.delete_file(asset["public_id"]))
+        self.assertFalse(self.backend.delete_file(asset["public_id"]))
+        self.assertFalse(self.backend.delete_file("../outside"))
+
+
+if __name__ == '__main__':
+    unittest.main()
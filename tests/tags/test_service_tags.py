@@ -1,10 +1,12 @@
 import unittest
 from unittest.mock import AsyncMock, MagicMock
 
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.tags.models import Tag
-from src.tags.service import create_tag, delete_tag, get_tags
+from src.tags.service import create_tag, delete_tag, get_tags, resolve_tags
+from tests.conftest import TestingSession, engine
 
 
 class TestTagsService(unittest.IsolatedAsyncioTestCase):
@@ -49,5 +51,29 @@ class TestTagsService(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(result, None)
 
 
+class TestResolveTags(unittest.IsolatedAsyncioTestCase):
+    async def test_resolve_tags(self):
+        statements = []
+
+        def count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        async with TestingSession() as session:
+            session.add(Tag(name="resolve_existing"))
+            await session.commit()
+
+            names = ["resolve_existing"] + [f"resolve_{i}" for i in range(50)]
+            event.listen(engine.sync_engine, "before_cursor_execute", count)
+            try:
+                tags = await resolve_tags(names + ["resolve_0"], session)
+            finally:
+                event.remove(engine.sync_engine, "before_cursor_execute", count)
+            await session.commit()
+
+        self.assertEqual([tag.name for tag in tags], names)
+        self.assertTrue(all(tag.id for tag in tags))
+        self.assertEqual(len(statements), 2)
+
+
 if __name__ == '__main__':
     unittest.main()
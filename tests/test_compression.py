@@ -0,0 +1,125 @@
+import gzip
+
+import brotli
+import zstandard
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from src.compression import CompressionMiddleware, bytes_saved
+from src.settings import settings
+
+PAYLOAD = {"data": [{"id": i, "description": "photo " * 10} for i in range(100)]}
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware)
+
+
+@app.get("/photos")
+async def photos():
+    return PAYLOAD
+
+
+@app.get("/small")
+async def small():
+    return {"data": []}
+
+
+@app.get("/image")
+async def image():
+    return Response(b"\x89PNG" + b"0" * 4096, media_type="image/png")
+
+
+@app.get("/tagged")
+async def tagged():
+    return PlainTextResponse("x" * 4096, headers={"ETag": '"abc"'})
+
+
+@app.get("/stream")
+async def stream():
+    async def chunks():
+        yield b"a" * 4096
+        yield b"b" * 4096
+
+    return StreamingResponse(chunks(), media_type="text/plain")
+
+
+client = TestClient(app)
+
+
+def test_compresses_large_json():
+    saved = sum(value for _, _, value in bytes_saved.samples())
+
+    response = client.get("/photos", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.json() == PAYLOAD
+    assert sum(value for _, _, value in bytes_saved.samples()) > saved
+
+
+def test_compresses_in_thread_pool(monkeypatch):
+    monkeypatch.setattr(settings, "compression_inline_max_size", 0)
+
+    response = client.get("/photos", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json() == PAYLOAD
+
+
+def test_skips_without_accept_encoding():
+    response = client.get("/photos", headers={"Accept-Encoding": "identity"})
+
+    assert "content-encoding" not in response.headers
+    assert response.json() == PAYLOAD
+
+
+def test_skips_small_and_binary_bodies():
+    for path in ("/small", "/image"):
+        response = client.get(path, headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+
+
+def test_skips_over_cpu_budget(monkeypatch):
+    monkeypatch.setattr(settings, "compression_max_concurrency", 0)
+
+    response = client.get("/photos", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+def test_weakens_etag():
+    response = client.get("/tagged", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == 'W/"abc"'
+
+
+def test_passes_streamed_responses_through():
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.text == "a" * 4096 + "b" * 4096
+
+
+def test_gzip_body_is_valid():
+    with client.stream("GET", "/photos", headers={"Accept-Encoding": "gzip"}) as response:
+        raw = b"".join(response.iter_raw())
+
+    assert gzip.decompress(raw).startswith(b'{"data":')
+
+
+def test_prefers_zstd_then_brotli():
+    for accept_encoding, encoding, decompress in (
+        ("gzip, br, zstd", "zstd", zstandard.ZstdDecompressor().decompress),
+        ("gzip, br", "br", brotli.decompress),
+    ):
+        with client.stream(
+            "GET", "/photos", headers={"Accept-Encoding": accept_encoding}
+        ) as response:
+            raw = b"".join(response.iter_raw())
+
+        assert response.headers["content-encoding"] == encoding
+        assert decompress(raw).startswith(b'{"data":')
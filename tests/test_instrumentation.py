@@ -0,0 +1,39 @@
+import logging
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from src.settings import settings
+
+
+def test_server_timing_header(client):
+    response = client.get("/api/healthchecker")
+
+    assert response.status_code == 200, response.text
+    db_timing = response.headers["Server-Timing"]
+    assert db_timing.startswith("db;dur=")
+    assert db_timing.endswith('desc="1 queries"')
+
+
+def test_slow_request_is_logged(client, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "slow_request_queries", 0)
+
+    with caplog.at_level(logging.WARNING, logger="SQL"):
+        response = client.get("/api/healthchecker")
+
+    assert response.status_code == 200, response.text
+    assert "Slow request GET /api/healthchecker" in caplog.text
+    assert "x1" in caplog.text
+    assert "SELECT 1" in caplog.text
+
+
+def test_failed_statement_releases_its_start_time():
+    engine = create_engine("sqlite://")
+    with engine.connect() as conn:
+        for _ in range(2):
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM missing"))
+        assert conn.info["query_started_at"] == []
+        conn.execute(text("SELECT 1"))
+        assert conn.info["query_started_at"] == []
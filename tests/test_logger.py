@@ -0,0 +1,66 @@
+import json
+import logging
+import unittest
+from unittest.mock import patch
+
+from src.logger import (
+    ErrorSamplingFilter,
+    JsonFormatter,
+    get_logger,
+    queue_handler,
+    start_logging,
+    stop_logging,
+)
+
+
+def make_record(msg, level=logging.ERROR, name="test"):
+    return logging.LogRecord(name, level, __file__, 1, msg, None, None)
+
+
+class TestLogger(unittest.TestCase):
+
+    def test_get_logger_is_idempotent(self):
+        logger = get_logger("Idempotent")
+        get_logger("Idempotent")
+
+        self.assertEqual(logger.handlers.count(queue_handler), 1)
+
+    def test_background_listener(self):
+        handler = logging.Handler()
+        with patch.object(handler, "handle") as handle, patch(
+            "src.logger.listener.handlers", (handler,)
+        ):
+            start_logging()
+            try:
+                get_logger("Background").error("queued")
+            finally:
+                stop_logging()
+
+        handle.assert_called_once()
+        self.assertFalse(queue_handler.listening)
+
+    def test_json_formatter(self):
+        entry = json.loads(JsonFormatter().format(make_record("hello %s")))
+
+        self.assertEqual(entry["level"], "ERROR")
+        self.assertEqual(entry["logger"], "test")
+        self.assertEqual(entry["message"], "hello %s")
+
+    def test_error_sampling(self):
+        sampling = ErrorSamplingFilter(burst=2, window=60)
+
+        with patch("src.logger.time.monotonic", return_value=100):
+            passed = [sampling.filter(make_record("boom")) for _ in range(5)]
+            self.assertTrue(sampling.filter(make_record("info", logging.INFO)))
+            self.assertTrue(sampling.filter(make_record("other")))
+
+        self.assertEqual(passed, [True, True, False, False, False])
+
+        record = make_record("boom")
+        with patch("src.logger.time.monotonic", return_value=161):
+            self.assertTrue(sampling.filter(record))
+        self.assertEqual(record.msg, "boom (suppressed 3 similar messages)")
+
+
+if __name__ == '__main__':
+    unittest.main()
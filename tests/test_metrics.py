@@ -0,0 +1,55 @@
+import pytest
+
+from src.metrics import Metric, Registry
+
+
+def test_histogram_render():
+    registry = Registry()
+    latency = registry.histogram(
+        "latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0)
+    )
+    latency.observe(0.05, route="/a")
+    latency.observe(0.1, route="/a")
+    latency.observe(2.0, route="/a")
+
+    text = registry.render()
+
+    assert "# TYPE latency_seconds histogram" in text
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{route="/a",le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{route="/a"} 3' in text
+
+
+def test_metric_requires_samples():
+    with pytest.raises(TypeError):
+        Metric("untyped", "No samples.")
+
+
+def test_counter_escapes_labels():
+    registry = Registry()
+    counter = registry.counter("requests_total", "Requests.", ("path",))
+    counter.inc(path='a"b')
+    counter.inc(2, path='a"b')
+
+    assert 'requests_total{path="a\\"b"} 3' in registry.render()
+
+
+def test_metrics_endpoint(client):
+    client.get("/api/photos/1")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert (
+        'http_requests_total{method="GET",route="/api/photos/{photo_id}",status="'
+        in text
+    )
+    assert (
+        'http_request_duration_seconds_bucket{method="GET",'
+        'route="/api/photos/{photo_id}",le="+Inf"}' in text
+    )
+    assert 'db_pool_connections{pool="primary",state="checked_out"}' in text
+    assert 'cache_hit_ratio{cache="user"}' in text
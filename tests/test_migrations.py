@@ -0,0 +1,36 @@
+import pytest
+import sqlalchemy as sa
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+from src.migrations import backfill_in_batches
+
+
+def test_backfill_commits_each_range(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'migration.db'}")
+    with engine.begin() as connection:
+        connection.execute(
+            sa.text(
+                "CREATE TABLE items "
+                "(id INTEGER PRIMARY KEY, value INTEGER CHECK (value < 100))"
+            )
+        )
+        connection.execute(
+            sa.text("INSERT INTO items (id, value) VALUES (1, 0), (2, 0), (3, 0), (4, 0)")
+        )
+
+    with engine.connect() as connection:
+        context = MigrationContext.configure(connection)
+        with Operations.context(context), pytest.raises(sa.exc.IntegrityError):
+            with context.begin_transaction():
+                # The range holding id 4 violates the check
+                backfill_in_batches(
+                    "items",
+                    "UPDATE items SET value = id * 30 WHERE id >= :start AND id < :stop",
+                    batch_size=2,
+                )
+
+    with engine.connect() as connection:
+        values = connection.execute(sa.text("SELECT value FROM items ORDER BY id"))
+        # Ranges before the failure were committed on their own
+        assert list(values.scalars()) == [30, 60, 90, 0]
@@ -0,0 +1,28 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+from src.pagination import decode_cursor, next_cursor, next_rank_cursor
+
+
+def make_rows(count: int) -> list:
+    return [SimpleNamespace(created_at=datetime(2024, 1, 1, i), id=i) for i in range(count)]
+
+
+def test_next_cursor():
+    rows, cursor = next_cursor(make_rows(3), 2)
+
+    assert [row.id for row in rows] == [0, 1]
+    assert decode_cursor(cursor) == (datetime(2024, 1, 1, 1), 1)
+    assert next_cursor(make_rows(2), 2)[1] is None
+
+
+def test_next_cursor_empty_page():
+    assert next_cursor(make_rows(1), 0) == ([], None)
+    assert next_cursor([], 20) == ([], None)
+
+
+def test_next_rank_cursor_empty_page():
+    rows = [(row, 0.5) for row in make_rows(1)]
+
+    assert next_rank_cursor(rows, 0) == ([], None)
+    assert next_rank_cursor([], 20) == ([], None)
@@ -0,0 +1,95 @@
+import gzip
+
+import brotli
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from src.static import IMMUTABLE, CachedPage, PrecompressedStaticFiles, precompress
+
+
+def make_client(tmp_path) -> TestClient:
+    (tmp_path / "app-1a2b3c.js").write_text("console.log('hello');\n" * 200)
+    (tmp_path / "index.html").write_text("<html><body>app</body></html>")
+    page = CachedPage(tmp_path / "index.html")
+
+    app = FastAPI()
+    app.mount(
+        "/assets", PrecompressedStaticFiles(directory=tmp_path, immutable=True)
+    )
+
+    @app.get("/")
+    async def root(request: Request):
+        return page.response(request)
+
+    return TestClient(app)
+
+
+def test_precompress_skips_small_and_fresh_files(tmp_path):
+    make_client(tmp_path)
+
+    assert precompress(tmp_path) >= 1
+    assert (tmp_path / "app-1a2b3c.js.gz").exists()
+    assert (tmp_path / "app-1a2b3c.js.br").exists()
+    assert not (tmp_path / "index.html.gz").exists()
+    assert precompress(tmp_path) == 0
+
+
+def test_serves_gzip_variant(tmp_path):
+    client = make_client(tmp_path)
+    precompress(tmp_path)
+
+    response = client.get("/assets/app-1a2b3c.js", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"].startswith("text/javascript")
+    assert response.headers["cache-control"] == IMMUTABLE
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.text == "console.log('hello');\n" * 200
+    assert int(response.headers["content-length"]) == len(
+        (tmp_path / "app-1a2b3c.js.gz").read_bytes()
+    )
+    assert gzip.decompress((tmp_path / "app-1a2b3c.js.gz").read_bytes()) == (
+        b"console.log('hello');\n" * 200
+    )
+
+
+def test_prefers_brotli_variant(tmp_path):
+    client = make_client(tmp_path)
+    precompress(tmp_path)
+
+    with client.stream(
+        "GET", "/assets/app-1a2b3c.js", headers={"Accept-Encoding": "gzip, br"}
+    ) as response:
+        raw = b"".join(response.iter_raw())
+
+    assert response.headers["content-encoding"] == "br"
+    assert brotli.decompress(raw) == b"console.log('hello');\n" * 200
+
+
+def test_serves_identity_without_accept_encoding(tmp_path):
+    client = make_client(tmp_path)
+    precompress(tmp_path)
+
+    response = client.get("/assets/app-1a2b3c.js", headers={"Accept-Encoding": "identity"})
+
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert response.headers["cache-control"] == IMMUTABLE
+
+
+def test_index_etag(tmp_path):
+    client = make_client(tmp_path)
+
+    response = client.get("/")
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "no-cache"
+    etag = response.headers["etag"]
+
+    response = client.get("/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    response = client.get("/", headers={"If-None-Match": '"other"'})
+    assert response.status_code == 200
@@ -0,0 +1,196 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, select, update
+
+from src.dependencies import get_current_user
+from src.main import app
+from src.photos.models import Photo
+from src.uploads import service as uploads_service
+from src.services.storage import storage
+from src.services.storage.local_backend import LocalStorage
+from src.settings import settings
+from src.uploads.models import UploadSession
+from src.uploads.service import get_staging_path, purge_periodically
+from src.user.models import User
+from tests.conftest import TestingSession
+
+CONTENT = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 40
+
+
+@pytest.fixture(scope="module", autouse=True)
+def owner(create_test_database):
+    async def init():
+        async with TestingSession() as session:
+            session.add(User(username="uploader", email="uploader@test.com", password="secret"))
+            await session.commit()
+
+    asyncio.run(init())
+
+
+@pytest.fixture(autouse=True)
+def local_storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "backend", LocalStorage(tmp_path / "media", "/media"))
+    monkeypatch.setattr(settings, "upload_staging_dir", str(tmp_path / "staging"))
+    monkeypatch.setitem(
+        app.dependency_overrides, get_current_user, lambda: User(id=1, username="uploader")
+    )
+    return storage.backend
+
+
+def create_upload(client, size=len(CONTENT)) -> dict:
+    response = client.post(
+        "/api/uploads/",
+        json={"title": "big", "description": "resumed", "tags": "a, b", "size": size},
+    )
+    assert response.status_code == 201, response.text
+    return response.json()["data"]
+
+
+def put_range(client, upload_id, start, end, body=None):
+    return client.put(
+        f"/api/uploads/{upload_id}",
+        content=CONTENT[start : end + 1] if body is None else body,
+        headers={"Content-Range": f"bytes {start}-{end}/{len(CONTENT)}"},
+    )
+
+
+def test_chunked_upload(client, local_storage):
+    upload = create_upload(client)
+    assert upload["received"] == 0
+
+    response = put_range(client, upload["id"], 0, 4999)
+    assert response.status_code == 200, response.text
+    assert response.json()["data"]["received"] == 5000
+
+    # Resent range overlapping what was already received
+    response = put_range(client, upload["id"], 4000, 8999)
+    assert response.json()["data"]["received"] == 9000
+
+    response = client.post(f"/api/uploads/{upload['id']}/finalize")
+    assert response.status_code == 409
+
+    response = put_range(client, upload["id"], 9000, len(CONTENT) - 1)
+    assert response.json()["data"]["received"] == len(CONTENT)
+
+    response = client.post(f"/api/uploads/{upload['id']}/finalize")
+    assert response.status_code == 201, response.text
+    photo = response.json()["data"]
+    assert photo["title"] == "big"
+    assert sorted(tag["name"] for tag in photo["tags"]) == ["a", "b"]
+    assert local_storage.get_path(photo["public_id"]).read_bytes() == CONTENT
+
+    # Finalizing again returns the same photo
+    response = client.post(f"/api/uploads/{upload['id']}/finalize")
+    assert response.json()["data"]["id"] == photo["id"]
+
+    response = client.get(f"/api/uploads/{upload['id']}")
+    assert response.json()["data"]["photo_id"] == photo["id"]
+
+
+def test_partial_body_counts(client):
+    upload = create_upload(client)
+
+    # Body shorter than the range, e.g. a dropped connection
+    response = put_range(client, upload["id"], 0, 4999, body=CONTENT[:3000])
+    assert response.json()["data"]["received"] == 3000
+
+    response = client.get(f"/api/uploads/{upload['id']}")
+    assert response.json()["data"]["received"] == 3000
+
+
+def test_rejects_gaps_and_bad_ranges(client):
+    upload = create_upload(client)
+
+    response = put_range(client, upload["id"], 100, 199)
+    assert response.status_code == 409
+
+    response = client.put(
+        f"/api/uploads/{upload['id']}",
+        content=b"x",
+        headers={"Content-Range": "bytes 0-0/1"},
+    )
+    assert response.status_code == 416
+
+    response = put_range(client, upload["id"], 0, 9, body=CONTENT[:20])
+    assert response.status_code == 400
+
+
+def test_upload_too_large(client, monkeypatch):
+    monkeypatch.setattr(settings, "upload_max_size", 10)
+
+    response = client.post(
+        "/api/uploads/", json={"title": "t", "description": "d", "size": 11}
+    )
+    assert response.status_code == 413
+
+
+def test_delete_upload(client):
+    upload = create_upload(client)
+
+    response = client.delete(f"/api/uploads/{upload['id']}")
+    assert response.status_code == 200, response.text
+
+    response = client.get(f"/api/uploads/{upload['id']}")
+    assert response.status_code == 404
+
+
+def count_photos(title: str) -> int:
+    async def count():
+        async with TestingSession() as session:
+            return await session.scalar(
+                select(func.count()).select_from(Photo).where(Photo.title == title)
+            )
+
+    return asyncio.run(count())
+
+
+def test_failed_finalize_creates_nothing(client, monkeypatch):
+    response = client.post(
+        "/api/uploads/",
+        json={"title": "atomic", "description": "d", "size": len(CONTENT)},
+    )
+    upload = response.json()["data"]
+    put_range(client, upload["id"], 0, len(CONTENT) - 1)
+
+    create_photo = uploads_service.create_photo
+
+    async def crash_after_create(**kwargs):
+        await create_photo(**kwargs)
+        raise RuntimeError("worker died")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(uploads_service, "create_photo", crash_after_create)
+        response = client.post(f"/api/uploads/{upload['id']}/finalize")
+    assert response.status_code == 500
+    assert count_photos("atomic") == 0
+    assert client.get(f"/api/uploads/{upload['id']}").json()["data"]["photo_id"] is None
+
+    for _ in range(2):
+        response = client.post(f"/api/uploads/{upload['id']}/finalize")
+        assert response.status_code == 201, response.text
+    assert count_photos("atomic") == 1
+
+
+def test_purge_periodically(client):
+    upload = create_upload(client)
+    path = get_staging_path(upload["id"])
+    assert path.exists()
+
+    async def run():
+        async with TestingSession() as session:
+            await session.execute(
+                update(UploadSession)
+                .where(UploadSession.id == upload["id"])
+                .values(expires_at=func.datetime("now", "-1 minute"))
+            )
+            await session.commit()
+
+        task = asyncio.create_task(purge_periodically(TestingSession, 0.01))
+        await asyncio.sleep(0.2)
+        task.cancel()
+
+    asyncio.run(run())
+
+    assert not path.exists()
+    assert client.get(f"/api/uploads/{upload['id']}").status_code == 404
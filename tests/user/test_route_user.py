@@ -1,4 +1,4 @@
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest_asyncio
 
@@ -58,10 +58,11 @@ def test_update_user(client, token, user):
 def test_update_avatar(client, token, monkeypatch):
 
     monkeypatch.setattr(
-        "src.user.router.upload_file", MagicMock(return_value={"public_id": "avatar"})
+        "src.user.router.storage.upload_file",
+        AsyncMock(return_value={"public_id": "avatar"}),
     )
     monkeypatch.setattr(
-        "src.user.router.build_url", MagicMock(return_value="test_avatar_url")
+        "src.user.router.storage.build_url", MagicMock(return_value="test_avatar_url")
     )
 
     response = client.patch(
@@ -1,10 +1,12 @@
 import unittest
+from datetime import datetime
 from unittest.mock import AsyncMock, MagicMock, patch
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.comments.models import Comment
 from src.models import Base
+from src.pagination import encode_cursor
 from src.photos.models import Photo
 from src.tags.models import Tag
 from src.user.models import Role, User
@@ -13,6 +15,7 @@ from src.user.service import (
     block_user,
     create_user,
     get_all_users,
+    get_cached_user_by_email,
     get_count_users,
     get_user_by_email,
     get_user_comments,
@@ -23,6 +26,8 @@ from src.user.service import (
     update_role,
     update_token,
     update_user,
+    update_user_stats,
+    user_cache,
 )
 
 
@@ -30,6 +35,7 @@ class TestUserService(unittest.IsolatedAsyncioTestCase):
 
     def setUp(self):
         self.session = AsyncMock(spec=AsyncSession)
+        user_cache.clear()
 
     async def test_get_count_users(self):
         mocked_users = MagicMock()
@@ -98,6 +104,49 @@ class TestUserService(unittest.IsolatedAsyncioTestCase):
         result = await get_user_by_email(email=user.email, db=self.session)
         self.assertIsNone(result)
 
+    async def test_get_cached_user_by_email(self):
+        user = User(
+            id=1,
+            username="test",
+            email="test@example.com",
+            password="testtest",
+            role=Role.USER,
+        )
+        mocked_user = MagicMock()
+        mocked_user.scalar_one_or_none.return_value = user
+        self.session.execute.return_value = mocked_user
+        self.session.merge.side_effect = lambda instance, load: instance
+        hits = user_cache.stats()["hits"]
+
+        first = await get_cached_user_by_email(email=user.email, db=self.session)
+        second = await get_cached_user_by_email(email=user.email, db=self.session)
+
+        self.assertIs(first, user)
+        self.assertEqual(second.id, user.id)
+        self.assertEqual(second.email, user.email)
+        self.session.execute.assert_awaited_once()
+        self.session.merge.assert_awaited_once()
+        self.assertEqual(user_cache.stats()["hits"], hits + 1)
+
+    async def test_update_stats_invalidates_cached_user(self):
+        user = User(id=1, email="test@example.com", count_photos=0)
+        user_cache.set(user.email, user.to_dict())
+        mocked_emails = MagicMock()
+        mocked_emails.scalars.return_value = [user.email]
+        self.session.execute.return_value = mocked_emails
+
+        await update_user_stats(user.id, self.session, photos=1)
+
+        self.assertIsNone(user_cache.get(user.email))
+
+    async def test_update_invalidates_cached_user(self):
+        user = User(id=1, email="test@example.com", blocked=False)
+        user_cache.set(user.email, user.to_dict())
+
+        await block_user(user=user, block=True, db=self.session)
+
+        self.assertIsNone(user_cache.get(user.email))
+
     async def test_update_user(self):
         user = User()
         user_fields = UserUpdateSchema(username="test2", email="test2@example.com")
@@ -168,26 +217,38 @@ class TestUserService(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(result.blocked, False)
 
     async def test_get_all_users(self):
-        users_data =[{"user": User()}, {"user": User()}]
+        users = [User(), User()]
         mocked_users = MagicMock()
-        mocked_users.mappings.return_value.all.return_value = users_data
+        mocked_users.scalars.return_value.all.return_value = users
         self.session.execute.return_value = mocked_users
-        result = await get_all_users(db=self.session)
+        result, cursor = await get_all_users(db=self.session)
         self.assertIsInstance(result, list)
-        self.assertEqual(result, [user_data["user"].to_dict() for user_data in users_data])
+        self.assertEqual(result, [user.to_dict() for user in users])
+        self.assertIsNone(cursor)
+
+    async def test_get_all_users_next_page(self):
+        users = [User(id=i, created_at=datetime(2024, 1, i)) for i in range(1, 4)]
+        mocked_users = MagicMock()
+        mocked_users.scalars.return_value.all.return_value = users
+        self.session.execute.return_value = mocked_users
+        result, cursor = await get_all_users(db=self.session, limit=2)
+        self.assertEqual(len(result), 2)
+        self.assertEqual(cursor, encode_cursor(users[1].created_at, users[1].id))
 
     async def test_get_user_profile(self):
-        user = {"user": User()}
+        user = User(count_photos=2, count_comments=3)
         mocked_user = MagicMock()
-        mocked_user.mappings.return_value.first.return_value = user
+        mocked_user.scalars.return_value.first.return_value = user
         self.session.execute.return_value = mocked_user
-        result = await get_user_profile(username=user["user"].username, db=self.session)
+        result = await get_user_profile(username=user.username, db=self.session)
         self.assertIsInstance(result, dict)
-        self.assertEqual(result, user["user"].to_dict())
-    
+        self.assertEqual(result, user.to_dict())
+        self.assertEqual(result["count_photos"], 2)
+        self.assertEqual(result["count_comments"], 3)
+
     async def test_get_user_profile_not_found(self):
         mocked_user = MagicMock()
-        mocked_user.mappings.return_value.first.return_value = None
+        mocked_user.scalars.return_value.first.return_value = None
         self.session.execute.return_value = mocked_user
         result = await get_user_profile(username="", db=self.session)
         self.assertEqual(result, None)